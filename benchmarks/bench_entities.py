@@ -0,0 +1,141 @@
+"""
+Mede a extração de itens de catálogo (src/processing/entity_extractor.py):
+
+- em lote x linha a linha: `extract_entities` (uma varredura do texto do lote por padrão)
+  e, para comparação, os mesmos padrões aplicados linha a linha em Python, e ainda
+  `Series.str.extract` do pandas (páginas/s, linhas/s e memória do resultado);
+- custo no lote: `process_batch` sobre o corpus sintético (benchmarks/synthetic_corpus.py)
+  com e sem `enable_entities`. O relatório traz o tempo total de cada execução e o tempo
+  da etapa 'entities' em relação ao lote (meta: menos de 5%), medianas de `--repeat`
+  execuções alternadas. O corpus padrão só tem páginas de texto, a extração mais barata:
+  o pior caso para a proporção; com páginas digitalizadas (OCR) a etapa pesa bem menos.
+
+Uso:
+    python benchmarks/bench_entities.py --pages text_only=200 --lines-pages 5000
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pytesseract
+
+from bench_pipeline import bench_process_batch, use_simulated_ocr
+from synthetic_corpus import _catalog_lines, build_corpus, parse_pages
+from src.batch_processor import config as default_config
+from src.processing import entity_extractor as entities
+
+
+def synthetic_pages(count: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    return [(page + 1, "\n".join(_catalog_lines(rng, page, 51))) for page in range(count)]
+
+
+def extract_per_line(pages: list) -> pd.DataFrame:
+    """Referência: o mesmo padrão aplicado linha a linha em Python, registro a registro."""
+    rows = []
+    for page, text in pages:
+        for line_number, line in enumerate(text.split("\n"), start=1):
+            item = entities._LINE.match("\n" + line)
+            if not item.group("part_number"):
+                continue
+            price = item.group("price") or item.group("trailing_price")
+            unit = item.group("unit") or item.group("price_unit") or item.group("trailing_unit")
+            rows.append({
+                "page": page, "line": line_number, "part_number": item.group("part_number"),
+                "description": item.group("description").strip() or None,
+                "dimension": item.group("dimension"),
+                "quantity": int(item.group("quantity")) if item.group("quantity") else None,
+                "unit": unit.lower() if unit else None,
+                "price": float(price.replace(".", "").replace(",", ".")) if price else None,
+            })
+    return pd.DataFrame(rows)
+
+
+def extract_pandas_str(pages: list) -> pd.DataFrame:
+    """Referência: o mesmo padrão via `Series.str.extract` (uma linha do texto por elemento)."""
+    texts = pd.Series([text for _, text in pages], index=[page for page, _ in pages], dtype="string")
+    lines = "\n" + texts.str.split("\n").explode()
+    items = lines.str.extract(entities._LINE).dropna(subset=["part_number"])
+    price = items["price"].fillna(items["trailing_price"])
+    return items.assign(price=pd.to_numeric(price.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)))
+
+
+def bench_extraction(pages: list) -> dict:
+    lines = sum(text.count("\n") + 1 for _, text in pages)
+    report = {}
+    for name, func in (
+        ("batch", entities.extract_entities), ("per_line", extract_per_line), ("pandas_str", extract_pandas_str)
+    ):
+        start = time.perf_counter()
+        frame = func(pages)
+        elapsed = time.perf_counter() - start
+        report[name] = {
+            "seconds": round(elapsed, 3),
+            "pages_per_second": round(len(pages) / elapsed, 1),
+            "lines_per_second": round(lines / elapsed),
+            "items": len(frame),
+            "memory_mb": round(frame.memory_usage(deep=True).sum() / (1024 * 1024), 2),
+        }
+    return report
+
+
+def bench_overhead(corpus: list, config: dict, workdir: Path, repeat: int, worker_initializer=None) -> dict:
+    """Execuções alternadas com e sem a etapa; mediana de cada uma (o tempo do lote varia entre execuções)."""
+    runs = {False: [], True: []}
+    for attempt in range(repeat):
+        for enabled in (False, True):
+            runs[enabled].append(bench_process_batch(
+                corpus, dict(config, enable_entities=enabled), workdir / f"{attempt}_{int(enabled)}",
+                worker_initializer
+            ))
+    without = statistics.median(run["seconds"] for run in runs[False])
+    with_entities = statistics.median(run["seconds"] for run in runs[True])
+    entities_seconds = statistics.median(run["stages"].get("entities", 0.0) for run in runs[True])
+    return {
+        "without_entities_seconds": round(without, 3),
+        "with_entities_seconds": round(with_entities, 3),
+        "entities_stage_seconds": round(entities_seconds, 3),
+        "entities_stage_percent": round(entities_seconds / with_entities * 100, 2),
+        "wall_time_change_percent": round((with_entities - without) / without * 100, 2),
+        "items": runs[True][-1]["counters"].get("entities_extracted", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=parse_pages, default=parse_pages("text_only=100"),
+                        help="corpus do lote: '10' ou 'text_only=100,scanned=10,...'")
+    parser.add_argument("--lines-pages", type=int, default=2000, help="páginas da comparação vetorizada x laço")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções do lote com e sem a etapa")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    worker_initializer = None
+    if shutil.which(pytesseract.pytesseract.tesseract_cmd) is None:
+        use_simulated_ocr()
+        worker_initializer = use_simulated_ocr
+
+    config = dict(
+        default_config, max_workers=args.workers, enable_debug=False, enable_ocr_cache=False,
+        enable_manifest=False, enable_search_index=False, ocr_backend="subprocess", table_format="csv"
+    )
+    report = {"extraction": bench_extraction(synthetic_pages(args.lines_pages, args.seed))}
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(str(Path(tmp) / "corpus"), args.pages, seed=args.seed)
+        report["corpus"] = {item["kind"]: item["pages"] for item in corpus}
+        report["process_batch"] = bench_overhead(corpus, config, Path(tmp), args.repeat, worker_initializer)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Mede o reprocessamento incremental de edições de catálogo (src/utils/page_fingerprints.py):
+
+- full: `extract_text_routed` na edição anterior, sem registro de impressões digitais;
+- first_edition: a mesma edição com o registro vazio (extração completa mais o custo
+  de calcular e guardar as impressões digitais);
+- changed_N: a nova edição, com N páginas trocadas, sobre uma cópia do registro da
+  edição anterior. Só as páginas digitalizadas trocadas devem passar pelo OCR (as de
+  texto são sempre relidas, sem impressão digital), então o tempo deve crescer com N,
+  e não com o total de páginas.
+
+As edições usam páginas 'mixed' do corpus sintético (texto e digitalizadas alternadas);
+as páginas trocadas vêm de outra semente. Sem o Tesseract instalado, o OCR é
+substituído pela carga simulada de bench_pipeline.py.
+
+Uso:
+    python benchmarks/bench_fingerprints.py --pages 60 --changed 0,3,6,15,30
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+import pytesseract
+
+from bench_pipeline import use_simulated_ocr
+from synthetic_corpus import build_pdf
+from src.batch_processor import config as default_config
+from src.extraction.ocr_engine import get_ocr_backend
+from src.extraction.page_router import extract_text_routed
+from src.utils.job_manifest import config_hash
+from src.utils.metrics import metrics, stage_seconds
+from src.utils.page_fingerprints import PageFingerprintStore
+
+
+def new_edition(base: str, replacements: str, changed: int, path: str) -> None:
+    """Copia a edição `base` trocando `changed` páginas, espalhadas pelo documento, pelas de `replacements`."""
+    doc = fitz.open(base)
+    source = fitz.open(replacements)
+    last = doc.page_count - 1
+    for index in sorted({round(i * last / max(changed - 1, 1)) for i in range(changed)}):
+        doc.delete_page(index)
+        doc.insert_pdf(source, from_page=index, to_page=index, start_at=index)
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+    source.close()
+
+
+def timed_run(pdf_path: str, output_dir: str, config: dict, page_store=None) -> dict:
+    metrics.drain()
+    start = time.perf_counter()
+    extract_text_routed(
+        pdf_path, output_dir, config, ocr_backend=get_ocr_backend(config), page_store=page_store
+    )
+    elapsed = time.perf_counter() - start
+    snapshot = metrics.drain()
+    counters = snapshot.get('counters', {})
+    return {
+        "seconds": round(elapsed, 3),
+        "fingerprint_seconds": round(stage_seconds(snapshot).get('fingerprint', 0.0), 3),
+        "ocr_calls": counters.get('ocr_calls', 0),
+        "pages_reused": counters.get('pages_fingerprint_reused', 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=60, help="páginas de cada edição")
+    parser.add_argument("--changed", default="0,3,6,15,30", help="páginas trocadas na nova edição")
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    simulated = shutil.which(pytesseract.pytesseract.tesseract_cmd) is None
+    if simulated:
+        use_simulated_ocr()
+
+    config = dict(default_config, dpi=args.dpi, ocr_backend="subprocess", enable_ocr_cache=False)
+    report = {"pages": args.pages, "dpi": args.dpi, "simulated_ocr": simulated}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base, other = str(tmp / "edicao_1.pdf"), str(tmp / "outra.pdf")
+        build_pdf(base, "mixed", args.pages, seed=args.seed)
+        build_pdf(other, "mixed", args.pages, seed=args.seed + 1)
+
+        report["full"] = timed_run(base, str(tmp / "out"), config)
+        seeded = tmp / "edicao_1.sqlite"
+        store = PageFingerprintStore(str(seeded), config_hash(config))
+        report["first_edition"] = timed_run(base, str(tmp / "out"), config, store)
+        store.close()
+
+        for changed in (int(value) for value in args.changed.split(",")):
+            edition = str(tmp / f"edicao_2_{changed}.pdf")
+            new_edition(base, other, changed, edition)
+            db_path = tmp / f"edicao_2_{changed}.sqlite"
+            shutil.copyfile(seeded, db_path)
+            store = PageFingerprintStore(str(db_path), config_hash(config))
+            report[f"changed_{changed}"] = timed_run(edition, str(tmp / "out"), config, store)
+            store.close()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Compara a latência por página dos motores de OCR (src/extraction/ocr_engine.py).
+
+- subprocess: pytesseract, um processo `tesseract` por imagem (arquivo temporário e
+  recarga dos traineddata a cada chamada);
+- tesserocr: motor persistente no processo, carregado uma única vez.
+
+Motores indisponíveis (Tesseract ou tesserocr não instalados) aparecem no relatório
+como indisponíveis.
+
+Uso:
+    python benchmarks/bench_ocr_backend.py --pages 10 --lang por+eng
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import shutil
+import statistics
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+import pytesseract
+
+from src.extraction.ocr_engine import SubprocessBackend, TesserocrBackend
+
+
+def build_pages(count: int, dpi: int) -> list:
+    """Páginas sintéticas de catálogo em cinza."""
+    pages = []
+    for i in range(count):
+        doc = fitz.open()
+        page = doc.new_page()
+        for y in range(80, 760, 18):
+            page.insert_text((50, y), f"Peça ABC-{1000 + i} Parafuso sextavado M8 x 40 R$ 12,50", fontsize=10)
+        pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        pages.append(np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width).copy())
+        doc.close()
+    return pages
+
+
+def measure(backend, pages: list, config: str) -> dict:
+    # Primeira chamada separada: no motor persistente inclui a carga dos traineddata
+    start = time.perf_counter()
+    backend.image_to_string(pages[0], config=config)
+    first = time.perf_counter() - start
+
+    latencies = []
+    for image in pages[1:] or pages:
+        start = time.perf_counter()
+        backend.image_to_string(image, config=config)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "first_call_ms": round(first * 1000, 1),
+        "median_ms_per_page": round(statistics.median(latencies) * 1000, 1),
+        "mean_ms_per_page": round(statistics.fmean(latencies) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--lang", default="por+eng")
+    args = parser.parse_args()
+
+    config = f"--oem 3 --psm 6 -l {args.lang}"
+    pages = build_pages(args.pages, args.dpi)
+    report = {"pages": args.pages, "dpi": args.dpi, "config": config, "backends": {}}
+
+    if shutil.which(pytesseract.pytesseract.tesseract_cmd):
+        report["backends"]["subprocess"] = measure(SubprocessBackend(), pages, config)
+    else:
+        report["backends"]["subprocess"] = "indisponível (Tesseract não encontrado)"
+
+    try:
+        backend = TesserocrBackend()
+    except ImportError:
+        report["backends"]["tesserocr"] = "indisponível (tesserocr não instalado)"
+    else:
+        try:
+            report["backends"]["tesserocr"] = measure(backend, pages, config)
+        finally:
+            backend.close()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
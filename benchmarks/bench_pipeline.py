@@ -0,0 +1,247 @@
+"""
+Mede o pipeline completo sobre o corpus sintético (benchmarks/synthetic_corpus.py):
+
+- classify: `PDFClassifier.classify` em cada arquivo;
+- extratores: texto, OCR, misto, roteado por página e tabelas, cada um em cada arquivo;
+- process_batch: o lote completo (pools, agendamento por páginas e escrita), com o
+  tempo por etapa do resumo de métricas (src/utils/metrics.py).
+
+O relatório (JSON) traz páginas/s, pico de memória (RSS) e o tempo por etapa, além do
+commit atual; com `--baseline` as páginas/s são comparadas com um relatório anterior.
+Sem o Tesseract instalado, o OCR é substituído por uma redução de ruído do OpenCV
+(como em bench_worker_sizing.py), e o relatório indica isso.
+
+Uso:
+    python benchmarks/bench_pipeline.py --pages 10 --output bench.json
+    python benchmarks/bench_pipeline.py --pages text_only=100,scanned=10 --baseline bench.json
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import pytesseract
+
+from synthetic_corpus import CORPUS_KINDS, build_corpus, parse_pages
+from src.batch_processor import config as default_config, process_batch
+from src.classification.pdf_classifier import PDFClassifier
+from src.extraction.mixed_extractor import extract_text_mixed
+from src.extraction.ocr_processor import extract_text_from_images
+from src.extraction.page_router import extract_text_routed
+from src.extraction.table_extractor import extract_tables_to_dataset
+from src.extraction.text_extractor import extract_and_save_text
+from src.utils.document_context import PDFDocumentContext
+from src.utils.memory import peak_rss_mb as process_peak_rss_mb
+from src.utils.metrics import metrics, stage_seconds
+
+
+def _simulated_ocr(image, config=None) -> str:
+    # OCR simulado: carga de CPU paralelizada pelo OpenCV
+    gray = np.asarray(image.convert("L")) if hasattr(image, "convert") else np.asarray(image)
+    cv2.fastNlMeansDenoising(gray, h=10)
+    return "ABC-1000 Parafuso sextavado M8 x 40 R$ 12,50"
+
+
+def use_simulated_ocr() -> None:
+    """Substitui o OCR do pytesseract pelo simulado; também é o initializer dos workers do lote."""
+    pytesseract.image_to_string = _simulated_ocr
+
+
+def peak_rss_mb() -> dict:
+    """
+    Pico de RSS do processo (src/utils/memory.py) e do maior worker já encerrado
+    (ru_maxrss dos filhos, só onde o módulo `resource` existe).
+    """
+    self_mb = process_peak_rss_mb()
+    report = {"self": round(self_mb, 1) if self_mb is not None else None, "children": None}
+    try:
+        import resource
+    except ImportError:
+        return report
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / (1024 * 1024)
+    report["children"] = round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale, 1)
+    return report
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def timed(func, pages: int) -> dict:
+    """Executa `func()` e mede o tempo, as páginas/s e as etapas registradas em `metrics`."""
+    metrics.drain()
+    start = time.perf_counter()
+    output = func()
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(pages / elapsed, 2) if elapsed > 0 else 0.0,
+        "stages": stage_seconds(metrics.drain()),
+        "output": output,
+    }
+
+
+def bench_classify(corpus: list, config: dict) -> dict:
+    classifier = PDFClassifier(config)
+    results = {}
+    for item in corpus:
+        result = timed(lambda: classifier.classify(item["path"]), item["pages"])
+        result["pdf_type"] = result.pop("output")
+        results[item["kind"]] = result
+    return results
+
+
+def bench_extractors(corpus: list, config: dict, output_dir: str) -> dict:
+    """
+    Cada extrator em cada arquivo, com o documento aberto por um PDFDocumentContext como
+    no lote. 'output' indica se o extrator gerou um arquivo (ex.: o de texto não gera nada
+    em páginas digitalizadas).
+    """
+    extractors = {
+        "text": lambda path, context: extract_and_save_text(path, output_dir, context=context),
+        "ocr": lambda path, context: extract_text_from_images(path, output_dir, context=context),
+        "mixed": lambda path, context: extract_text_mixed(
+            path, output_dir, config["min_text_length"], config["ocr_language"], config["dpi"], context=context
+        ),
+        "routed": lambda path, context: extract_text_routed(path, output_dir, config, context=context),
+        "tables": lambda path, context: extract_tables_to_dataset(path, output_dir, context=context, table_format="csv"),
+    }
+
+    def run(extractor, path):
+        with PDFDocumentContext(path, config) as context:
+            return bool(extractor(path, context))
+
+    return {
+        name: {item["kind"]: timed(lambda: run(extractor, item["path"]), item["pages"]) for item in corpus}
+        for name, extractor in extractors.items()
+    }
+
+
+def bench_process_batch(corpus: list, config: dict, workdir: Path, worker_initializer=None) -> dict:
+    """
+    Executa o lote num diretório isolado (as pastas de saída do projeto são relativas).
+    `worker_initializer` roda em cada worker (ex.: `use_simulated_ocr`, que precisa ser
+    reaplicado nos processos criados por spawn).
+    """
+    input_dir = workdir / "data" / "input" / "pending"
+    input_dir.mkdir(parents=True)
+    for item in corpus:
+        shutil.copy(item["path"], input_dir)
+    metrics_dir = workdir / "metrics"
+    run_config = dict(config, enable_metrics=True, metrics_dir=str(metrics_dir), log_file=str(workdir / "bench.log"))
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        start = time.perf_counter()
+        process_batch(
+            str(input_dir), str(workdir / "data" / "input" / "processed"), run_config,
+            worker_initializer=worker_initializer
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+    summary = json.loads((metrics_dir / "run_summary.json").read_text(encoding="utf-8"))
+    pages = sum(item["pages"] for item in corpus)
+    return {
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(pages / elapsed, 2),
+        "status": summary["status"],
+        "stages": stage_seconds(summary["metrics"]),
+        "counters": summary["metrics"]["counters"],
+        "per_file": summary["per_file"],
+    }
+
+
+def compare(report: dict, baseline_path: str) -> dict:
+    """Variação de páginas/s em relação a um relatório anterior (negativo = mais lento)."""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    measured = [("process_batch", report.get("process_batch"), baseline.get("process_batch"))]
+    for kind, result in report.get("classify", {}).items():
+        measured.append((f"classify.{kind}", result, baseline.get("classify", {}).get(kind)))
+    for name, by_kind in report.get("extractors", {}).items():
+        for kind, result in by_kind.items():
+            measured.append((f"{name}.{kind}", result, baseline.get("extractors", {}).get(name, {}).get(kind)))
+
+    changes = {}
+    for key, result, previous in measured:
+        if result and previous and previous.get("pages_per_second"):
+            before = previous["pages_per_second"]
+            changes[key] = round((result["pages_per_second"] - before) / before * 100, 1)
+    return {"baseline_commit": baseline.get("commit"), "pages_per_second_change_percent": changes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=parse_pages, default=parse_pages("10"),
+                        help="páginas por tipo: '10' ou 'text_only=50,scanned=10,mixed=20,tables=5'")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--dpi", type=int, default=150, help="resolução da rasterização para OCR")
+    parser.add_argument("--workers", type=int, default=None, help="max_workers do process_batch")
+    parser.add_argument("--skip", default="", help="etapas a pular: classify,extractors,process_batch")
+    parser.add_argument("--output", help="grava o relatório JSON neste arquivo")
+    parser.add_argument("--baseline", help="relatório anterior para comparar páginas/s")
+    args = parser.parse_args()
+    skip = set(filter(None, args.skip.split(",")))
+
+    real_tesseract = shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+    worker_initializer = None
+    if not real_tesseract:
+        use_simulated_ocr()
+        worker_initializer = use_simulated_ocr
+
+    # Sem cache, manifesto nem imagens de depuração: cada execução faz todo o trabalho
+    config = dict(
+        default_config, dpi=args.dpi, max_workers=args.workers, enable_debug=False,
+        enable_ocr_cache=False, enable_manifest=False, ocr_backend="subprocess"
+    )
+
+    report = {
+        "commit": git_commit(),
+        "corpus": {kind: args.pages.get(kind, 0) for kind in CORPUS_KINDS},
+        "seed": args.seed,
+        "dpi": args.dpi,
+        "real_tesseract": real_tesseract,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        corpus = build_corpus(os.path.join(tmp, "corpus"), args.pages, seed=args.seed, dpi=args.dpi)
+        report["corpus_seconds"] = round(time.perf_counter() - start, 3)
+        if "classify" not in skip:
+            report["classify"] = bench_classify(corpus, config)
+        if "extractors" not in skip:
+            report["extractors"] = bench_extractors(corpus, config, os.path.join(tmp, "out"))
+        if "process_batch" not in skip:
+            report["process_batch"] = bench_process_batch(
+                corpus, config, Path(tmp) / "batch", worker_initializer
+            )
+    report["peak_rss_mb"] = peak_rss_mb()
+    if not real_tesseract:
+        report["note"] = "OCR simulado com cv2.fastNlMeansDenoising (Tesseract não encontrado)."
+    if args.baseline:
+        report["comparison"] = compare(report, args.baseline)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
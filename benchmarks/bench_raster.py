@@ -0,0 +1,118 @@
+"""
+Mede a rasterização para o OCR antes e depois do caminho em cinza sem cópia
+(`render_gray` em src/utils/document_context.py), por página:
+
+- mixed_rgb (antes, extract_text_mixed): pixmap RGB, `Image.frombytes` a partir de
+  `pix.samples`, `np.array` no pré-processamento e `cv2.cvtColor` para cinza;
+- ocr_rgb (antes, ocr_pages/roteamento): pixmap RGB, `np.frombuffer(pix.samples)`,
+  `np.array` no pré-processamento e `cv2.cvtColor`;
+- gray_view (depois): pixmap em cinza exposto como array NumPy sobre o próprio buffer
+  do MuPDF (`render_gray`), usado direto pelo pré-processamento.
+
+Para cada caminho: tempo até o array em cinza, bytes alocados pelo Python/NumPy
+(tracemalloc), bytes do pixmap do MuPDF (fora do tracemalloc) e o tempo com o
+pré-processamento completo de `image_analyzer` e de `ocr_processor`.
+
+Uso:
+    python benchmarks/bench_raster.py --pages 10 --dpi 300
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+from synthetic_corpus import build_pdf
+from src.classification import image_analyzer
+from src.extraction import ocr_processor
+from src.utils.document_context import render_gray
+
+
+def mixed_rgb(page: fitz.Page, dpi: int):
+    pix = page.get_pixmap(dpi=dpi)
+    image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    gray = cv2.cvtColor(np.array(image), cv2.COLOR_BGR2GRAY)
+    return gray, pix.width * pix.height * pix.n
+
+
+def ocr_rgb(page: fitz.Page, dpi: int):
+    pix = page.get_pixmap(dpi=dpi)
+    image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    gray = cv2.cvtColor(np.array(image), cv2.COLOR_BGR2GRAY)
+    return gray, pix.width * pix.height * pix.n
+
+
+def gray_view(page: fitz.Page, dpi: int):
+    image = render_gray(page, dpi)
+    return image, image.nbytes
+
+
+def measure(doc: fitz.Document, func, dpi: int) -> dict:
+    seconds, allocated, peak = [], [], []
+    for page in doc:
+        tracemalloc.start()
+        start = time.perf_counter()
+        gray, pixmap_bytes = func(page, dpi)
+        seconds.append(time.perf_counter() - start)
+        current, page_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocated.append(current)
+        peak.append(page_peak)
+        del gray
+    return {
+        "ms_per_page": round(statistics.median(seconds) * 1000, 2),
+        "python_alive_mb": round(statistics.median(allocated) / 2 ** 20, 2),
+        "python_peak_mb": round(statistics.median(peak) / 2 ** 20, 2),
+        "pixmap_mb": round(pixmap_bytes / 2 ** 20, 2),
+    }
+
+
+def measure_preprocess(doc: fitz.Document, func, preprocess, dpi: int) -> float:
+    seconds = []
+    for page in doc:
+        start = time.perf_counter()
+        gray, _ = func(page, dpi)
+        preprocess(gray)
+        seconds.append(time.perf_counter() - start)
+    return round(statistics.median(seconds) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--kind", default="scanned", choices=("scanned", "text_only", "mixed"))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    report = {"pages": args.pages, "dpi": args.dpi, "kind": args.kind}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "catalogo.pdf")
+        build_pdf(path, args.kind, args.pages, seed=args.seed)
+        with fitz.open(path) as doc:
+            # Aquece o MuPDF (decodificação das imagens embutidas fica em cache)
+            for page in doc:
+                render_gray(page, args.dpi)
+            for name, func in (("mixed_rgb", mixed_rgb), ("ocr_rgb", ocr_rgb), ("gray_view", gray_view)):
+                report[name] = measure(doc, func, args.dpi)
+                report[name]["with_image_analyzer_preprocess_ms"] = measure_preprocess(
+                    doc, func, image_analyzer.preprocess_image, args.dpi
+                )
+                report[name]["with_ocr_processor_preprocess_ms"] = measure_preprocess(
+                    doc, func, ocr_processor.preprocess_image, args.dpi
+                )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Mede a indexação e as consultas do índice de busca (src/processing/search_index.py).
+
+Gera páginas sintéticas de catálogo (lista de peças com códigos, descrições e preços),
+indexa em documentos de `--pages-per-doc` páginas e mede:
+
+- indexação: páginas/s e tamanho do arquivo SQLite;
+- consultas: latência mediana e p95 (ms) da busca textual com termos comuns (presentes
+  em quase todas as páginas: pior caso do ranking bm25), com um termo raro, com prefixo
+  e do índice de códigos de peça (exata e por prefixo).
+
+Uso:
+    python benchmarks/bench_search_index.py --pages 200000 --queries 200
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from src.processing.search_index import SearchIndex
+
+ITEMS = ("Parafuso sextavado", "Porca zincada", "Arruela lisa", "Rolamento blindado", "Correia dentada",
+         "Mangueira hidráulica", "Retentor", "Abraçadeira", "Filtro de óleo", "Junta de vedação")
+PREFIXES = ("ABC", "HTD", "RLM", "XYZ", "MGR", "FLT", "JVD", "PRF")
+
+
+def page_text(rng: random.Random, lines: int = 40) -> str:
+    rows = []
+    for _ in range(lines):
+        code = f"{rng.choice(PREFIXES)}-{rng.randint(1000, 99999)}"
+        rows.append(
+            f"{code} {rng.choice(ITEMS)} M{rng.randint(4, 24)} x {rng.randint(10, 120)} "
+            f"R$ {rng.uniform(0.5, 500):.2f}".replace(".", ",")
+        )
+    return "\n".join(rows)
+
+
+def percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def measure_queries(func, queries: list) -> dict:
+    latencies, hits = [], 0
+    for query in queries:
+        start = time.perf_counter()
+        hits += len(func(query))
+        latencies.append(time.perf_counter() - start)
+    return dict(percentiles(latencies), mean_hits=round(hits / len(queries), 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=20000)
+    parser.add_argument("--pages-per-doc", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "index.sqlite")
+        index = SearchIndex(db_path)
+
+        start = time.perf_counter()
+        for first in range(0, args.pages, args.pages_per_doc):
+            count = min(args.pages_per_doc, args.pages - first)
+            pages = [(number, page_text(rng)) for number in range(1, count + 1)]
+            index.add_pages(f"catalogo_{first // args.pages_per_doc:05d}.txt", pages, pdf_type="text_only")
+        build_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        index.optimize()
+        optimize_seconds = time.perf_counter() - start
+
+        stats = index.stats()
+        parts = [f"{rng.choice(PREFIXES)}-{rng.randint(1000, 99999)}" for _ in range(args.queries)]
+        words = [f"{rng.choice(ITEMS).split()[0]} M{rng.randint(4, 24)}" for _ in range(args.queries)]
+        report = {
+            "pages": stats["pages"],
+            "documents": stats["documents"],
+            "distinct_part_numbers": stats["part_numbers"],
+            "build": {
+                "seconds": round(build_seconds, 2),
+                "pages_per_second": round(args.pages / build_seconds, 1),
+                "optimize_seconds": round(optimize_seconds, 2),
+                "index_mb": round(os.path.getsize(db_path) / (1024 * 1024), 1),
+            },
+            "queries": {
+                "text_common": measure_queries(lambda q: index.search(q, limit=20), words),
+                "text_rare": measure_queries(lambda q: index.search(q.split("-")[1], limit=20), parts),
+                "text_prefix": measure_queries(lambda q: index.search(q.split()[0][:4] + "*", limit=20), words),
+                "part_exact": measure_queries(lambda q: index.find_part(q), parts),
+                "part_prefix": measure_queries(lambda q: index.find_part(q[:6], prefix=True), parts),
+            },
+        }
+        index.close()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
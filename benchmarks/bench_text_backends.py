@@ -0,0 +1,70 @@
+"""
+Mede o tempo por página de cada backend de texto (src/extraction/text_extractor.py).
+
+A ordem de TEXT_BACKENDS segue estes números: o backend mais rápido lê todas as
+páginas e os seguintes só releem as páginas com nota de qualidade baixa.
+
+Uso:
+    python benchmarks/bench_text_backends.py --pages 100
+    python benchmarks/bench_text_backends.py --pdf data/input/pending/catalogo.pdf
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from src.extraction.text_extractor import TEXT_BACKENDS, score_page_text
+
+
+def build_text_pdf(path: str, pages: int) -> None:
+    """PDF sintético de catálogo com camada de texto."""
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        for y in range(60, 780, 14):
+            page.insert_text((40, y), f"Peça ABC-{1000 + i} Parafuso sextavado M8 x 40 zincado R$ 12,50", fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def measure(backend_class, pdf_path: str) -> dict:
+    start = time.perf_counter()
+    backend = backend_class(pdf_path)
+    try:
+        texts = [backend.page_text(i) or '' for i in range(backend.page_count)]
+    finally:
+        backend.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "ms_per_page": round(elapsed * 1000 / max(len(texts), 1), 2),
+        "mean_quality": round(sum(score_page_text(text) for text in texts) / max(len(texts), 1), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--pdf", help="PDF real a medir (padrão: catálogo sintético)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp, "catalogo.pdf")
+            build_text_pdf(pdf_path, args.pages)
+        report = {
+            "pdf": args.pdf or f"sintético ({args.pages} páginas)",
+            "backends": {backend_class.name: measure(backend_class, pdf_path) for backend_class in TEXT_BACKENDS},
+        }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
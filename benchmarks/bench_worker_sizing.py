@@ -0,0 +1,126 @@
+"""
+Mede páginas por segundo do OCR com diferentes tamanhos de pool e threads por worker.
+
+Cada configuração "WxT" usa W processos, cada um limitado a T threads OpenMP/OpenCV
+(OMP_THREAD_LIMIT e cv2.setNumThreads, como em src/utils/resources.py). A configuração
+"Wx0" não limita as threads, reproduzindo o comportamento anterior (superinscrição).
+Sem o Tesseract instalado, o OCR é substituído por uma redução de ruído do OpenCV,
+que também usa o pool de threads do OpenCV.
+
+Uso:
+    python benchmarks/bench_worker_sizing.py --pages 32 --settings 1x1,4x1,2x2,4x0
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+import pytesseract
+
+from src.extraction.ocr_processor import OCR_CONFIG, preprocess_image
+from src.utils.resources import cpu_budget, limit_worker_threads
+
+
+def build_scanned_pdf(path: str, pages: int) -> None:
+    """PDF sintético com páginas digitalizadas (imagem em 200 DPI com texto e ruído)."""
+    rng = np.random.default_rng(7)
+    doc = fitz.open()
+    for i in range(pages):
+        src = fitz.open()
+        page = src.new_page()
+        for y in range(80, 760, 18):
+            page.insert_text((50, y), f"Peça ABC-{1000 + i} Parafuso sextavado M8 x 40 R$ 12,50", fontsize=10)
+        pix = page.get_pixmap(dpi=200, colorspace=fitz.csGRAY)
+        gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+        noisy = np.clip(gray * 0.8 + 30 + rng.normal(0, 12, gray.shape), 0, 255).astype(np.uint8)
+        _, png = cv2.imencode(".png", noisy)
+        doc.new_page().insert_image(fitz.Rect(0, 0, 595, 842), stream=png.tobytes())
+        src.close()
+    doc.save(path)
+    doc.close()
+
+
+def _init(threads: int) -> None:
+    if threads > 0:
+        limit_worker_threads(threads)
+
+
+def ocr_page(pdf_path: str, page_index: int, dpi: int, real_tesseract: bool) -> int:
+    with fitz.open(pdf_path) as doc:
+        pix = doc[page_index].get_pixmap(dpi=dpi)
+    image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    processed = preprocess_image(cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+    if real_tesseract:
+        return len(pytesseract.image_to_string(processed, config=OCR_CONFIG))
+    # OCR simulado: carga de CPU paralelizada pelo OpenCV
+    return int(cv2.fastNlMeansDenoising(processed, h=10).mean())
+
+
+def run_setting(pdf_path: str, pages: int, dpi: int, workers: int, threads: int, real_tesseract: bool) -> dict:
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init, initargs=(threads,)) as executor:
+        # Aquece os workers antes de medir
+        for future in [executor.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+        start = time.perf_counter()
+        list(executor.map(
+            ocr_page, [pdf_path] * pages, range(pages), [dpi] * pages, [real_tesseract] * pages
+        ))
+        elapsed = time.perf_counter() - start
+
+    result = {
+        "workers": workers,
+        "threads_per_worker": threads or "sem limite",
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(pages / elapsed, 2),
+    }
+    if hasattr(os, "getloadavg"):
+        result["load_1min"] = round(os.getloadavg()[0], 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=32)
+    parser.add_argument("--dpi", type=int, default=200)
+    cores = cpu_budget({})
+    parser.add_argument(
+        "--settings", default=f"1x1,{cores}x1,{max(1, cores // 2)}x2,{cores}x0",
+        help="lista de WORKERSxTHREADS (THREADS=0 não limita as threads)"
+    )
+    args = parser.parse_args()
+
+    real_tesseract = shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+    settings = [tuple(int(v) for v in item.split("x")) for item in args.settings.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "scan.pdf")
+        build_scanned_pdf(pdf_path, args.pages)
+        results = [
+            run_setting(pdf_path, args.pages, args.dpi, workers, threads, real_tesseract)
+            for workers, threads in settings
+        ]
+
+    report = {
+        "pages": args.pages,
+        "dpi": args.dpi,
+        "cpu_cores": cores,
+        "real_tesseract": real_tesseract,
+        "results": results,
+    }
+    if not real_tesseract:
+        report["note"] = "OCR simulado com cv2.fastNlMeansDenoising (Tesseract não encontrado)."
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
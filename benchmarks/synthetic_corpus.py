@@ -0,0 +1,165 @@
+"""
+Gera um corpus sintético e determinístico de catálogos em PDF, sem rede nem arquivos
+externos (somente PyMuPDF, NumPy e OpenCV):
+
+- text_only: páginas com camada de texto (lista de peças);
+- scanned: texto renderizado e rasterizado em cinza, com ruído e inclinação;
+- mixed: páginas de texto intercaladas com páginas digitalizadas;
+- tables: tabelas de preços desenhadas com réguas e cabeçalho.
+
+A mesma semente e o mesmo número de páginas geram sempre o mesmo conteúdo, para
+comparar execuções de commits diferentes.
+
+Uso:
+    python benchmarks/synthetic_corpus.py data/benchmark/corpus --pages 20
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+from typing import Dict, List
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+
+CORPUS_KINDS = ("text_only", "scanned", "mixed", "tables")
+PAGE_RECT = fitz.Rect(0, 0, 595, 842)  # A4 em pontos
+
+
+def _catalog_lines(rng: np.random.Generator, page: int, count: int) -> List[str]:
+    items = ("Parafuso sextavado", "Porca zincada", "Arruela lisa", "Rolamento", "Correia dentada", "Mangueira")
+    lines = []
+    for _ in range(count):
+        code = f"ABC-{int(rng.integers(1000, 9999))}"
+        item = items[int(rng.integers(len(items)))]
+        size = f"M{int(rng.integers(4, 24))} x {int(rng.integers(10, 120))}"
+        price = f"R$ {rng.uniform(0.5, 500):.2f}".replace(".", ",")
+        lines.append(f"{code} {item} {size} {price} (pág. {page + 1})")
+    return lines
+
+
+def _add_text_page(doc: fitz.Document, rng: np.random.Generator, page_index: int) -> None:
+    page = doc.new_page(width=PAGE_RECT.width, height=PAGE_RECT.height)
+    page.insert_text((40, 50), f"Catálogo de peças - seção {page_index + 1}", fontsize=14)
+    for y, line in zip(range(80, 800, 14), _catalog_lines(rng, page_index, 51)):
+        page.insert_text((40, y), line, fontsize=9)
+
+
+def _scanned_png(rng: np.random.Generator, page_index: int, dpi: int) -> bytes:
+    """Renderiza uma página de texto em cinza e a degrada como uma digitalização."""
+    src = fitz.open()
+    page = src.new_page(width=PAGE_RECT.width, height=PAGE_RECT.height)
+    for y, line in zip(range(60, 800, 18), _catalog_lines(rng, page_index, 41)):
+        page.insert_text((50, y), line, fontsize=10)
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+    src.close()
+
+    angle = float(rng.uniform(-3, 3))
+    height, width = gray.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    skewed = cv2.warpAffine(gray, matrix, (width, height), borderValue=255)
+    noisy = np.clip(skewed * 0.8 + 30 + rng.normal(0, 12, skewed.shape), 0, 255).astype(np.uint8)
+    _, png = cv2.imencode(".png", noisy)
+    return png.tobytes()
+
+
+def _add_scanned_page(doc: fitz.Document, rng: np.random.Generator, page_index: int, dpi: int) -> None:
+    page = doc.new_page(width=PAGE_RECT.width, height=PAGE_RECT.height)
+    page.insert_image(PAGE_RECT, stream=_scanned_png(rng, page_index, dpi))
+
+
+def _add_table_page(doc: fitz.Document, rng: np.random.Generator, page_index: int) -> None:
+    page = doc.new_page(width=PAGE_RECT.width, height=PAGE_RECT.height)
+    columns = (40, 120, 330, 420, 555)
+    header = ("Código", "Descrição", "Qtd.", "Preço (R$)")
+    row_height = 18
+    top = 60
+    rows = 38
+    for r in range(rows + 2):
+        y = top + r * row_height
+        page.draw_line((columns[0], y), (columns[-1], y), width=0.6)
+    for x in columns:
+        page.draw_line((x, top), (x, top + (rows + 1) * row_height), width=0.6)
+    for c, title in enumerate(header):
+        page.insert_text((columns[c] + 4, top + 13), title, fontsize=9)
+    for r in range(rows):
+        y = top + (r + 1) * row_height + 13
+        values = (
+            f"ABC-{int(rng.integers(1000, 9999))}",
+            f"Parafuso M{int(rng.integers(4, 24))} x {int(rng.integers(10, 120))}",
+            str(int(rng.integers(1, 500))),
+            f"{rng.uniform(0.5, 500):.2f}".replace(".", ","),
+        )
+        for c, value in enumerate(values):
+            page.insert_text((columns[c] + 4, y), value, fontsize=9)
+
+
+def build_pdf(path: str, kind: str, pages: int, seed: int = 7, dpi: int = 150) -> None:
+    """Gera um PDF sintético do tipo `kind` (ver CORPUS_KINDS) com `pages` páginas."""
+    if kind not in CORPUS_KINDS:
+        raise ValueError(f"Tipo de corpus desconhecido: {kind}")
+    rng = np.random.default_rng([seed, CORPUS_KINDS.index(kind)])
+    doc = fitz.open()
+    for i in range(pages):
+        if kind == "text_only" or (kind == "mixed" and i % 2 == 0):
+            _add_text_page(doc, rng, i)
+        elif kind == "tables":
+            _add_table_page(doc, rng, i)
+        else:
+            _add_scanned_page(doc, rng, i, dpi)
+    # Sem data de criação/ID aleatório: o arquivo depende só da semente
+    doc.set_metadata({})
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def build_corpus(output_dir: str, pages: Dict[str, int], seed: int = 7, dpi: int = 150) -> List[Dict]:
+    """
+    Gera um PDF por tipo em `output_dir`. `pages` informa o número de páginas de cada
+    tipo (tipos ausentes ou com 0 páginas são omitidos).
+
+    :return: Um registro por arquivo: 'path', 'kind' e 'pages'.
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    corpus = []
+    for kind in CORPUS_KINDS:
+        count = pages.get(kind, 0)
+        if count <= 0:
+            continue
+        path = output / f"{kind}.pdf"
+        build_pdf(str(path), kind, count, seed=seed, dpi=dpi)
+        corpus.append({"path": str(path), "kind": kind, "pages": count})
+    return corpus
+
+
+def parse_pages(value: str) -> Dict[str, int]:
+    """'20' (todas as categorias) ou 'text_only=50,scanned=10,...'."""
+    if "=" not in value:
+        return {kind: int(value) for kind in CORPUS_KINDS}
+    pages = {kind: 0 for kind in CORPUS_KINDS}
+    for item in value.split(","):
+        kind, count = item.split("=")
+        if kind not in CORPUS_KINDS:
+            raise argparse.ArgumentTypeError(f"Tipo de corpus desconhecido: {kind}")
+        pages[kind] = int(count)
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("output_dir")
+    parser.add_argument("--pages", type=parse_pages, default=parse_pages("10"),
+                        help="páginas por tipo: '10' ou 'text_only=50,scanned=10,mixed=20,tables=5'")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--dpi", type=int, default=150, help="resolução das páginas digitalizadas")
+    args = parser.parse_args()
+    print(json.dumps(build_corpus(args.output_dir, args.pages, args.seed, args.dpi), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import asyncio
+import json
+import re
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from src.api.jobs import Job, JobManager, JobQueueFull
+from src.batch_processor import config as default_config
+from src.utils.logger import log_listener, setup_logger
+from src.utils.metrics import metrics, prometheus_text
+
+logger = setup_logger(__name__)
+
+DEFAULT_UPLOAD_DIR = "data/input/api"
+DEFAULT_INPUT_DIR = "data/input/pending"
+DEFAULT_MAX_UPLOAD_MB = 200
+RETRY_AFTER_SECONDS = 5
+# Folga para cabeçalhos e delimitadores do multipart ao comparar o Content-Length com o limite
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class RegisterRequest(BaseModel):
+    path: str
+
+
+def _upload_name(job: Job, filename: str) -> str:
+    """Nome do arquivo recebido: id do job + nome sanitizado (uploads homônimos não colidem)."""
+    stem = re.sub(r'[^\w\-]', '', re.sub(r'\s+', '_', Path(filename).stem)) or "documento"
+    return f"{job.id[:12]}_{stem}.pdf"
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Arquivo maior que {max_bytes // (1024 * 1024)} MB")
+
+
+class _MultipartUpload:
+    """
+    Recebe o corpo multipart em blocos, à medida que chegam (sem o spool do Starlette), e
+    grava a parte `file` direto em `destination(nome_do_arquivo)`, abortando (413) assim
+    que ela passa de `max_bytes`. As demais partes são ignoradas.
+    """
+
+    def __init__(self, boundary: bytes, destination: Callable[[str], Path], max_bytes: int):
+        self.destination = destination
+        self.max_bytes = max_bytes
+        self.path: Optional[Path] = None
+        self.written = 0
+        self._output = None
+        self._in_file = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b''
+        self._value = b''
+        self._parser = MultipartParser(boundary, {
+            'on_part_begin': self._part_begin,
+            'on_header_field': lambda data, start, end: self._append('_field', data[start:end]),
+            'on_header_value': lambda data, start, end: self._append('_value', data[start:end]),
+            'on_header_end': self._header_end,
+            'on_headers_finished': self._headers_finished,
+            'on_part_data': self._part_data,
+            'on_part_end': self._part_end,
+        })
+
+    def _append(self, name: str, data: bytes) -> None:
+        setattr(self, name, getattr(self, name) + data)
+
+    def _part_begin(self) -> None:
+        self._headers = {}
+
+    def _header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b''
+
+    def _headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b'content-disposition', b''))
+        if options.get(b'name') != b'file' or self.path is not None:
+            return
+        self.path = self.destination(options.get(b'filename', b'').decode('utf-8', errors='replace'))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._output = open(self.path, 'wb')
+        self._in_file = True
+
+    def _part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._in_file:
+            return
+        self.written += end - start
+        if self.written > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        self._output.write(data[start:end])
+
+    def _part_end(self) -> None:
+        if self._in_file:
+            self._output.close()
+            self._in_file = False
+
+    def write(self, chunk: bytes) -> None:
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as e:
+            raise HTTPException(status_code=400, detail=f"Corpo multipart inválido: {e}")
+
+    def finish(self) -> Path:
+        """Fim do corpo: confere que a parte `file` chegou e é um PDF."""
+        self._parser.finalize()
+        if self.path is None:
+            raise HTTPException(status_code=400, detail="Envie o PDF no campo 'file'")
+        self._part_end()
+        with open(self.path, 'rb') as saved:
+            header = saved.read(5)
+        if header != b'%PDF-':
+            raise HTTPException(status_code=400, detail="O arquivo enviado não é um PDF")
+        return self.path
+
+    def abort(self) -> None:
+        """Upload recusado ou interrompido: nada do arquivo parcial fica no disco."""
+        if self._output is not None:
+            self._output.close()
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+
+def create_app(config: Dict = None, executor=None) -> FastAPI:
+    """
+    API assíncrona de extração:
+
+    - POST /jobs (upload multipart `file`) e POST /jobs/register (PDF já presente em
+      `api_input_dir`) criam um job e respondem 202 com o id; com `api_max_jobs` jobs
+      em andamento respondem 429 (Retry-After). O upload é recusado antes de o corpo
+      ser lido (fila cheia, ou Content-Length acima de `api_max_upload_mb`: 413) e, sem
+      Content-Length, interrompido assim que o arquivo passa do limite;
+    - GET /jobs/{id}: status e resultado; GET /jobs/{id}/pages: fluxo NDJSON com os
+      eventos do job (status e o texto de cada página assim que fica pronto);
+    - GET /metrics: métricas no formato do Prometheus.
+
+    `executor` substitui o pool de processos (usado nos testes).
+    """
+    config = config if config is not None else default_config
+    manager = JobManager(config, executor=executor)
+    upload_dir = Path(config.get('api_upload_dir', DEFAULT_UPLOAD_DIR))
+    input_dir = Path(config.get('api_input_dir', DEFAULT_INPUT_DIR)).resolve()
+    max_upload_bytes = int(config.get('api_max_upload_mb', DEFAULT_MAX_UPLOAD_MB) * 1024 * 1024)
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        with log_listener(config):
+            manager.start()
+            try:
+                yield
+            finally:
+                await manager.close()
+
+    app = FastAPI(title="Catálogos PDF", lifespan=lifespan)
+    app.state.jobs = manager
+
+    @app.exception_handler(JobQueueFull)
+    async def _queue_full(_request: Request, exc: JobQueueFull):
+        return JSONResponse(
+            status_code=429, content={'detail': f"Fila cheia: {exc}"},
+            headers={'Retry-After': str(RETRY_AFTER_SECONDS)}
+        )
+
+    def _get_job(job_id: str) -> Job:
+        job = manager.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job não encontrado")
+        return job
+
+    @app.post("/jobs", status_code=202)
+    async def upload_job(request: Request):
+        # O corpo é lido aqui, em blocos: tipo, tamanho declarado e vaga na fila são
+        # conferidos antes do primeiro byte, e com a fila cheia nada é recebido nem gravado
+        content_type, options = parse_options_header(request.headers.get('content-type', ''))
+        if content_type != b'multipart/form-data' or not options.get(b'boundary'):
+            raise HTTPException(status_code=400, detail="Envie o PDF como multipart/form-data no campo 'file'")
+        declared = request.headers.get('content-length', '')
+        if declared.isdigit() and int(declared) > max_upload_bytes + MULTIPART_OVERHEAD_BYTES:
+            raise _too_large(max_upload_bytes)
+        job = manager.create_job("documento.pdf")
+
+        def destination(filename: str) -> Path:
+            job.filename = filename or job.filename
+            return upload_dir / _upload_name(job, job.filename)
+
+        upload = _MultipartUpload(options[b'boundary'], destination, max_upload_bytes)
+        try:
+            async for chunk in request.stream():
+                await asyncio.to_thread(upload.write, chunk)
+            destination_path = await asyncio.to_thread(upload.finish)
+        except BaseException:
+            upload.abort()
+            manager.discard(job)
+            raise
+        manager.start_job(job, destination_path)
+        logger.info(f"🌐 Job {job.id} criado para {job.filename}.")
+        return job.summary()
+
+    @app.post("/jobs/register", status_code=202)
+    async def register_job(request: RegisterRequest):
+        path = Path(request.path)
+        path = (path if path.is_absolute() else input_dir / path).resolve()
+        if not path.is_relative_to(input_dir):
+            raise HTTPException(status_code=400, detail=f"Somente arquivos em {input_dir} podem ser registrados")
+        if path.suffix.lower() != '.pdf' or not path.is_file():
+            raise HTTPException(status_code=404, detail="PDF não encontrado")
+        if any(job.path == str(path) and not job.finished for job in manager.jobs.values()):
+            raise HTTPException(status_code=409, detail="Este PDF já está em processamento")
+        job = manager.create_job(path.name)
+        manager.start_job(job, path)
+        logger.info(f"🌐 Job {job.id} registrado para {path}.")
+        return job.summary()
+
+    @app.get("/jobs")
+    async def list_jobs():
+        return [job.summary() for job in manager.jobs.values()]
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str):
+        return _get_job(job_id).summary()
+
+    @app.get("/jobs/{job_id}/pages")
+    async def job_pages(job_id: str):
+        job = _get_job(job_id)
+
+        async def ndjson():
+            async for event in job.stream():
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def prometheus_metrics():
+        # Métricas do próprio processo da API (finalização dos documentos) entram no total
+        manager.metrics.merge(metrics.drain(), pages=False)
+        return prometheus_text(manager.metrics.snapshot(), manager.gauges())
+
+    @app.get("/health")
+    async def health():
+        return {'status': 'ok', 'jobs_active': manager.active, 'jobs_limit': manager.max_jobs}
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("uvicorn não está instalado: pip install uvicorn")
+    uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,308 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.batch_processor import (
+    classificar_pdf, finalizar_pdf_paginado_no_worker, mover_para_erros, processar_pdf
+)
+from src.extraction.page_scheduler import (
+    ROUTED_SPLITTABLE_TYPES, SPLITTABLE_TYPES, split_page_ranges, timed_page_range
+)
+from src.processing.search_index import index_result, read_text_pages
+from src.utils.logger import setup_logger
+from src.utils.metrics import Metrics
+from src.utils.resources import create_pool, pool_size
+
+logger = setup_logger(__name__)
+
+DEFAULT_PAGE_CHUNK_SIZE = 4
+DEFAULT_KEEP_FINISHED = 1000
+ACTIVE_STATUSES = ('receiving', 'queued', 'classifying', 'extracting')
+
+
+class JobQueueFull(Exception):
+    """Limite de jobs em andamento atingido (a API responde 429)."""
+
+
+@dataclass
+class Job:
+    """
+    Um PDF enviado à API. Os eventos ('status', 'page', 'document', 'done', 'failed')
+    ficam em `events`, em ordem, e cada assinante do fluxo lê a partir do início.
+
+    O texto das páginas só fica em memória enquanto o job está em andamento: ao terminar,
+    sai dos eventos e `stream` o lê do .txt de saída (ver `_with_stored_text`).
+    """
+
+    id: str
+    filename: str
+    path: Optional[str] = None
+    status: str = 'receiving'
+    pdf_type: Optional[str] = None
+    page_count: int = 0
+    pages_done: int = 0
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    events: List[Dict] = field(default_factory=list)
+    changed: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    async def publish(self, event: Dict) -> None:
+        async with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    async def set_status(self, status: str, **details) -> None:
+        self.status = status
+        if self.finished:
+            self.finished_at = time.time()
+            self._drop_texts()
+        await self.publish(dict(event='status' if not self.finished else status, status=status, **details))
+
+    def _drop_texts(self) -> None:
+        """
+        Retira o texto dos eventos de um job concluído. A lista é substituída (e não
+        alterada): assinantes que já leram um trecho continuam com o texto em mãos.
+        """
+        self.events = [
+            {key: value for key, value in event.items() if key != 'text'} if 'text' in event else event
+            for event in self.events
+        ]
+
+    def _stored_pages(self) -> Dict[int, str]:
+        """Texto por página do .txt de saída (página 0: texto inteiro, sem mapa de páginas)."""
+        output_path = (self.result or {}).get('output_path')
+        if not output_path or not Path(output_path).exists():
+            return {}
+        return dict(read_text_pages(output_path))
+
+    @staticmethod
+    def _with_stored_text(event: Dict, pages: Dict[int, str], sent_document: bool) -> Optional[Dict]:
+        """
+        Evento de página/documento de um job concluído com o texto do .txt de saída. Sem o
+        mapa de páginas, a primeira página vira um evento 'document' com o texto inteiro e
+        as demais são omitidas (None).
+        """
+        if event['event'] == 'document':
+            return dict(event, text="\n".join(pages[number] for number in sorted(pages)))
+        if event['page'] in pages:
+            return dict(event, text=pages[event['page']])
+        if 0 in pages:
+            return None if sent_document else {'event': 'document', 'text': pages[0]}
+        return event
+
+    async def stream(self):
+        """Eventos já publicados e, em seguida, os novos, até o evento final do job."""
+        index = 0
+        pages = None
+        sent_document = False
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: len(self.events) > index)
+                pending = self.events[index:]
+            for event in pending:
+                if event['event'] in ('page', 'document') and 'text' not in event:
+                    if pages is None:
+                        pages = await asyncio.to_thread(self._stored_pages)
+                    event = self._with_stored_text(event, pages, sent_document)
+                    if event is None:
+                        continue
+                    sent_document = sent_document or event['event'] == 'document'
+                yield event
+                if event['event'] in ('done', 'failed'):
+                    return
+            index += len(pending)
+
+    def summary(self) -> Dict:
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'status': self.status,
+            'pdf_type': self.pdf_type,
+            'page_count': self.page_count,
+            'pages_done': self.pages_done,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+
+def _page_event(page_number: int, item) -> Dict:
+    """Página de um bloco: registro do roteador (dict) ou texto (extração sem roteamento)."""
+    if isinstance(item, dict):
+        return {'event': 'page', 'page': item['page'], 'route': item.get('route'), 'text': item['text']}
+    return {'event': 'page', 'page': page_number, 'text': item}
+
+
+class JobManager:
+    """
+    Executa os jobs da API no pool de processos do lote (o mesmo `create_pool` de OCR),
+    mantendo classificação e OCR fora do event loop.
+
+    - Documentos divisíveis (ver `page_scheduler`) são extraídos em blocos de
+      `api_page_chunk_size` páginas; as páginas de cada bloco são publicadas assim que
+      ele termina, e o texto completo é salvo e o PDF movido como no lote.
+    - Demais tipos (ex.: 'tables') passam por `processar_pdf` e publicam o texto inteiro.
+    - Contrapressão: no máximo `api_max_jobs` jobs em andamento (padrão: 2x o pool);
+      acima disso `create_job` levanta JobQueueFull.
+    """
+
+    def __init__(self, config: Dict, executor: Executor = None):
+        self.config = config
+        self.max_jobs = config.get('api_max_jobs') or pool_size(config, 'ocr') * 2
+        self.chunk_size = config.get('api_page_chunk_size', DEFAULT_PAGE_CHUNK_SIZE)
+        self.keep_finished = config.get('api_keep_finished_jobs', DEFAULT_KEEP_FINISHED)
+        self.jobs: Dict[str, Job] = {}
+        self.metrics = Metrics()
+        self.pages_total = 0
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._tasks = set()
+
+    def start(self) -> None:
+        if self._executor is None:
+            # Importado aqui: o inicializador vem do serviço de observação (workers aquecidos)
+            from src.watch_service import _aquecer_worker
+            self._executor = create_pool(self.config, 'ocr', initializer=_aquecer_worker, initargs=(self.config,))
+        logger.info(f"🌐 API pronta: até {self.max_jobs} job(s) em andamento.")
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None and self._owns_executor:
+            await asyncio.to_thread(self._executor.shutdown, True)
+
+    @property
+    def active(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status in ACTIVE_STATUSES)
+
+    def create_job(self, filename: str) -> Job:
+        """Reserva uma vaga para um job novo (antes de receber o arquivo)."""
+        if self.active >= self.max_jobs:
+            raise JobQueueFull(f"{self.active} job(s) em andamento (limite {self.max_jobs})")
+        job = Job(id=uuid.uuid4().hex, filename=filename)
+        self.jobs[job.id] = job
+        self._prune()
+        return job
+
+    def discard(self, job: Job) -> None:
+        """Libera a vaga de um job cujo arquivo não chegou a ser recebido."""
+        self.jobs.pop(job.id, None)
+
+    def start_job(self, job: Job, pdf_path: str) -> None:
+        job.path = str(pdf_path)
+        job.status = 'queued'
+        job.events.append({'event': 'status', 'status': 'queued'})
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _prune(self) -> None:
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda item: item.finished_at)[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job.id]
+
+    async def _call(self, func, *args):
+        return await asyncio.wrap_future(self._executor.submit(func, *args))
+
+    def _splittable(self, pdf_type: Optional[str]) -> bool:
+        types = ROUTED_SPLITTABLE_TYPES if self.config.get('page_routing', True) else SPLITTABLE_TYPES
+        return pdf_type in types
+
+    async def _run(self, job: Job) -> None:
+        try:
+            await job.set_status('classifying')
+            info = await self._call(classificar_pdf, job.path, self.config)
+            self.metrics.merge(info.pop('metrics', None), pages=False)
+            job.pdf_type = info['pdf_type']
+            job.page_count = info['page_count']
+
+            await job.set_status('extracting', pdf_type=job.pdf_type, page_count=job.page_count)
+            if self._splittable(job.pdf_type) and job.page_count > 0:
+                result = await self._run_chunks(job)
+            else:
+                result = await self._call(processar_pdf, job.path, self.config, job.pdf_type)
+                self.metrics.merge(result.pop('metrics', None), pages=False)
+                if result.get('output_path'):
+                    text = await asyncio.to_thread(Path(result['output_path']).read_text, encoding='utf-8')
+                    await job.publish({'event': 'document', 'text': text})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            try:
+                result = await asyncio.to_thread(mover_para_erros, Path(job.path), e)
+            except Exception as move_error:
+                # O job precisa terminar como 'failed' mesmo que o PDF não possa ser movido
+                logger.error(f"❌ Job {job.id}: falha ao mover {job.path} para erros: {move_error}")
+                result = {'path': job.path, 'status': 'failed', 'error': str(e)}
+
+        job.result = result
+        try:
+            await asyncio.to_thread(index_result, result, self.config)
+        except Exception as e:
+            logger.warning(f"⚠️ Job {job.id}: resultado não indexado: {e}")
+        if result.get('status') == 'failed':
+            job.error = result.get('error')
+            await job.set_status('failed', error=job.error)
+        else:
+            await job.set_status('done', result=result)
+        logger.info(f"🌐 Job {job.id} ({job.filename}) concluído: {job.status}.")
+
+    async def _run_chunks(self, job: Job) -> Dict:
+        """Extrai os blocos de páginas em paralelo e publica cada bloco ao terminar."""
+        ranges = split_page_ranges(job.page_count, self.chunk_size)
+
+        async def run_chunk(index: int, first_page: int, last_page: int):
+            pages, seconds, chunk_metrics = await self._call(
+                timed_page_range, job.path, job.pdf_type, first_page, last_page, self.config
+            )
+            return index, first_page, pages, seconds, chunk_metrics
+
+        tasks = [asyncio.ensure_future(run_chunk(i, first, last)) for i, (first, last) in enumerate(ranges)]
+        chunks: Dict[int, List] = {}
+        seconds_total = 0.0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, first_page, pages, seconds, chunk_metrics = await finished
+                self.metrics.merge(chunk_metrics, pages=False)
+                seconds_total += seconds
+                chunks[index] = pages
+                for offset, item in enumerate(pages):
+                    await job.publish(_page_event(first_page + offset, item))
+                job.pages_done += len(pages)
+                self.pages_total += len(pages)
+        except BaseException:
+            # Blocos que ainda não começaram não precisam mais rodar
+            for task in tasks:
+                task.cancel()
+            raise
+
+        pages_text = [item for index in sorted(chunks) for item in chunks[index]]
+        result = await self._call(
+            finalizar_pdf_paginado_no_worker, job.path, job.pdf_type, pages_text, self.config,
+            {'extract': seconds_total}
+        )
+        self.metrics.merge(result.pop('metrics', None), pages=False)
+        return result
+
+    def gauges(self) -> Dict[str, float]:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            'api_jobs_active': self.active,
+            'api_jobs_limit': self.max_jobs,
+            'api_jobs_done': statuses.get('done', 0),
+            'api_jobs_failed': statuses.get('failed', 0),
+            'api_pages_streamed': self.pages_total,
+        }
@@ -5,15 +5,34 @@ sys.path.append(str(Path(__file__).parent.parent))
 import os
 import shutil
 import argparse
-from typing import Dict
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import heapq
+import itertools
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from src.classification.pdf_classifier import PDFClassifier
 from src.utils.file_utils import move_file
-from src.utils.logger import setup_logger
+from src.utils.document_context import PDFDocumentContext
+from src.utils.debug_images import get_debug_writer
+from src.utils.ocr_cache import get_ocr_cache
+from src.utils.page_fingerprints import get_page_store
+from src.extraction.ocr_engine import get_ocr_backend
+from src.utils.job_manifest import DEFAULT_MANIFEST_PATH, JobManifest, config_hash
+from src.utils.logger import log_listener, setup_logger
+from src.utils.metrics import DEFAULT_METRICS_DIR, RunSummary, metrics, span, write_run_summary
+from src.utils.resources import create_pool, pool_shares, pool_size
 from src.extraction.text_extractor import extract_and_save_text
-from src.extraction.ocr_processor import extract_text_from_images
+from src.extraction.ocr_processor import extract_text_from_images, save_ocr_text
 from src.classification.table_detector import has_tables_in_pdf
-from src.extraction.mixed_extractor import extract_text_mixed
+from src.extraction.mixed_extractor import extract_text_mixed, save_mixed_text
+from src.extraction.table_extractor import extract_tables_to_dataset
+from src.extraction.page_router import extract_text_routed, save_routed_text
+from src.processing.entity_extractor import DEFAULT_ENTITIES_DIR, extract_entities_to_dataset
+from src.processing.search_index import index_result
+from src.extraction.page_scheduler import (
+    ROUTED_SPLITTABLE_TYPES, SPLITTABLE_TYPES, CostModel, PageAssembler, TaskPlanner, log_plan, timed_page_range
+)
 
 poppler_path = Path("libs/poppler-24.08.0/Library/bin").resolve()
 os.environ["PATH"] += os.pathsep + str(poppler_path)
@@ -25,19 +44,72 @@ config = {
     'dpi': 300,
     'enable_ocr': True,
     'quarantine_unprocessable': True,
-    'enable_debug': True
+    'enable_debug': False,            # amostra das páginas pré-processadas do OCR em debug_dir (PNG reduzido)
+    'debug_dir': 'data/output/debug_images',
+    'debug_every_n_pages': 10,        # grava a 1ª página de cada N (0 = só as de baixa confiança)
+    'debug_low_confidence': True,     # grava também as páginas em que o OCR reconheceu pouco texto
+    'fast_classification': True,      # decide pela estrutura do PDF antes de qualquer OCR
+    'page_routing': True,             # decide texto/OCR página a página em todos os documentos
+    'max_workers': None,              # teto de processos por pool (None = pelo orçamento abaixo)
+    'cpu_budget': None,               # núcleos disponíveis ao lote (None = todos os visíveis)
+    'memory_budget_mb': None,         # memória disponível ao lote (None = 80% da livre)
+    'text_workers': None,             # pool de extração de texto (None = pelo orçamento)
+    'ocr_workers': None,              # pool de OCR (None = núcleos / threads, limitado pela memória)
+    'ocr_threads_per_worker': 1,      # threads OpenMP do Tesseract e do OpenCV por worker de OCR
+    'ocr_pool_share': 0.5,            # fração da CPU e da memória do lote para o pool de OCR (o resto vai ao de texto)
+    'ocr_backend': 'auto',            # 'tesserocr' (motor persistente), 'subprocess' ou 'auto'
+    'table_format': 'auto',           # tabelas estruturadas: 'parquet', 'csv' ou 'auto' (Parquet se houver pyarrow)
+    'enable_entities': True,          # itens de catálogo (código, descrição, medida, unidade, preço) no formato de table_format
+    'entities_dir': 'data/output/entities',
+    'page_chunk_size': 16,            # páginas por tarefa ao dividir documentos grandes
+    'parallel_page_threshold': 32,    # documentos de OCR acima disso são divididos em blocos
+    'small_file_batch_seconds': 2.0,  # arquivos com custo estimado menor são agrupados em lotes (0 desativa)
+    'max_batch_files': 32,            # arquivos por lote de arquivos pequenos
+    'tasks_per_worker': 2,            # tarefas enviadas a cada pool por worker (o resto espera em ordem de custo)
+    'worker_document_cache_mb': 256,  # PDFs até este tamanho ficam abertos no worker entre blocos de páginas
+    'enable_ocr_cache': True,         # cache de OCR por hash de imagem/página
+    'ocr_cache_path': 'data/interim/ocr_cache.sqlite',
+    'ocr_cache_max_mb': 512,
+    'enable_page_fingerprints': True, # páginas já vistas (outra edição do catálogo) reutilizam o texto guardado
+    'page_fingerprint_path': 'data/interim/page_fingerprints.sqlite',
+    'page_fingerprint_max_age_days': 365,
+    'enable_manifest': True,          # pula arquivos já processados e retoma execuções interrompidas
+    'manifest_path': 'data/interim/job_manifest.sqlite',
+    'watch_poll_interval': 1.0,       # modo --watch: intervalo da varredura sem watchdog (s)
+    'watch_settle_seconds': 0.2,      # modo --watch: tempo com tamanho estável antes de despachar
+    'watch_max_queue': None,          # modo --watch: arquivos em andamento (None = 2x workers)
+    'log_level': 'INFO',              # 'DEBUG' inclui o detalhe por página (OCR, pré-processamento)
+    'log_format': 'text',             # 'text' ou 'json' (uma linha JSON por registro)
+    'log_file': 'data/output/processing.log',
+    'log_max_mb': 20,                 # rotação do log (0 desativa)
+    'log_backup_count': 5,
+    'enable_metrics': True,           # resumo da execução (JSON) e métricas Prometheus ao fim do lote
+    'metrics_dir': 'data/output/metrics',
+    'api_max_jobs': None,             # API: jobs em andamento antes de responder 429 (None = 2x o pool de OCR)
+    'api_page_chunk_size': 4,         # API: páginas por bloco (cada bloco é publicado no fluxo ao terminar)
+    'api_upload_dir': 'data/input/api',
+    'api_input_dir': 'data/input/pending',  # API: única pasta aceita por POST /jobs/register
+    'api_max_upload_mb': 200,
+    'enable_search_index': True,      # índice de busca (FTS5 por página e códigos de peça) atualizado a cada arquivo
+    'search_index_path': 'data/interim/search_index.sqlite'
 }
 
 logger = setup_logger(__name__)
 
+# Tipos cuja extração roda OCR (vão para o pool de OCR)
+OCR_TYPES = ('image_only', 'mixed')
+# Tipos extraídos pelo roteador por página quando `page_routing` está ativo
+ROUTED_TYPES = ('text_only', 'image_only', 'mixed', 'tables')
+
 def reset_test_environment():
     # 1. Limpar arquivos txt extraídos
     output_text_path = Path("data/output/text")
     if output_text_path.exists():
         for subdir in output_text_path.iterdir():
             if subdir.is_dir():
-                for file in subdir.glob("*.txt"):
-                    file.unlink()
+                for pattern in ("*.txt", "*.pages.json"):
+                    for file in subdir.glob(pattern):
+                        file.unlink()
     
     # 2. Mover arquivos de volta para pending
     processed_path = Path("data/input/processed")
@@ -49,60 +121,286 @@ def reset_test_environment():
                 shutil.move(str(pdf_file), str(pending_path / pdf_file.name))
     logger.info("🧹 Ambiente de teste resetado com sucesso!")
 
-def processar_pdf(pdf_file_path: str, config: Dict) -> None:
-    from time import sleep
+def _classificar(pdf_file: Path, config: Dict, context: PDFDocumentContext) -> str:
+    classifier = PDFClassifier(config)
+    with span('classify'):
+        pdf_type = classifier.classify(str(pdf_file), context=context)
+
+    # Os sinais de tabela já saem da análise estrutural da classificação (mesma passada)
+    pages = classifier.get_last_analysis().get('pages') or []
+    table_hints = [p['table_hint'] for p in pages] if pages and all('table_hint' in p for p in pages) else None
+    with span('table_detection'):
+        has_tables = has_tables_in_pdf(
+            str(pdf_file), pages_to_sample=config.get('pages_to_sample', 3), context=context, table_hints=table_hints
+        )
+    if has_tables:
+        logger.info(f"Tabela detectada em: {pdf_file.name}")
+        pdf_type = 'tables'
+    return pdf_type
+
+def _diretorio_extracao(pdf_type: str) -> Path:
+    extraction_dir = Path("data/output/text") / pdf_type
+    extraction_dir.mkdir(parents=True, exist_ok=True)
+    return extraction_dir
+
+def mover_para_erros(pdf_file: Path, error: Exception) -> Dict:
+    """Registra a falha, move o PDF para a pasta de erros e devolve o resultado 'failed'."""
+    logger.error(f"❌ Falha crítica ao processar {pdf_file.name}: {str(error)}")
+    error_dir = Path("data/input/processed") / "errors"
+    error_dir.mkdir(parents=True, exist_ok=True)
+    move_file(str(pdf_file), str(error_dir / pdf_file.name))
+    return {'path': str(pdf_file), 'status': 'failed', 'error': str(error)}
+
+def _finalizar_pdf(pdf_file: Path, pdf_type: str, txt_path: str, config: Dict) -> Optional[Path]:
+    """Move o PDF conforme o resultado. Retorna o novo caminho do PDF, ou None se ele não foi movido."""
+    filename = pdf_file.name
+    if not txt_path:
+        logger.warning(f"⚠️ Falha ao salvar texto extraído de {filename}")
+        return None
+
+    logger.info(f"✅ Texto extraído salvo em: {txt_path}")
+
+    output_base_path = Path("data/input/processed")
+    if pdf_type == 'unprocessable' and config.get('quarantine_unprocessable', False):
+        quarantine_dir = output_base_path / "quarantine"
+        quarantine_dir.mkdir(parents=True, exist_ok=True)
+        move_file(str(pdf_file), str(quarantine_dir / filename))
+        return quarantine_dir / filename
+
+    destination_dir = output_base_path / pdf_type
+    destination_dir.mkdir(parents=True, exist_ok=True)
+    destination = destination_dir / filename
+    move_file(str(pdf_file), str(destination))
+    logger.info(f"📂 Arquivo {filename} classificado como {pdf_type} e movido para {destination}")
+    return destination
+
+def _resultado(pdf_file: Path, pdf_type: str, extractor: str, txt_path: str, destination, timings: Dict) -> Dict:
+    """Resumo do processamento de um arquivo, registrado no manifesto do lote."""
+    return {
+        'path': str(pdf_file),
+        'status': 'done' if txt_path else 'no_text',
+        'pdf_type': pdf_type,
+        'extractor': extractor,
+        'output_path': txt_path or None,
+        'destination': str(destination) if destination else None,
+        'timings': timings,
+    }
+
+def _extrair_entidades(txt_path: Optional[str], config: Dict, timings: Dict) -> Optional[str]:
+    """Itens de catálogo do texto salvo (ver src/processing/entity_extractor.py)."""
+    if not txt_path or not config.get('enable_entities', True):
+        return None
+    start_time = time.time()
+    entities_path = extract_entities_to_dataset(
+        txt_path, config.get('entities_dir', DEFAULT_ENTITIES_DIR), table_format=config.get('table_format', 'auto')
+    )
+    timings['entities'] = time.time() - start_time
+    return entities_path
+
+def classificar_pdf(pdf_file_path: str, config: Dict) -> Dict:
+    """
+    Classifica o PDF sem extrair o texto. Usado pelo lote para planejar a divisão
+    de documentos grandes em blocos de páginas.
+    """
+    pdf_file = Path(pdf_file_path)
+    try:
+        start_time = time.time()
+        with PDFDocumentContext(str(pdf_file), config) as context:
+            pdf_type = _classificar(pdf_file, config, context)
+            return {
+                'path': str(pdf_file), 'pdf_type': pdf_type, 'page_count': context.page_count,
+                'classify_seconds': time.time() - start_time, 'metrics': metrics.drain()
+            }
+    except Exception as e:
+        # A falha é tratada (e o arquivo movido para errors) em processar_pdf
+        logger.warning(f"⚠️ Falha ao classificar {pdf_file.name} para o planejamento: {e}")
+        return {'path': str(pdf_file), 'pdf_type': None, 'page_count': 0, 'metrics': metrics.drain()}
+
+def processar_pdf(pdf_file_path: str, config: Dict, pdf_type: str = None) -> Dict:
+    """
+    Classifica (se `pdf_type` não for informado), extrai o texto e move o PDF processado.
+    Retorna o resumo do processamento (status, tipo, extrator, saída e tempos), com as
+    métricas registradas no worker durante o arquivo em 'metrics'.
+    """
     pdf_file = Path(pdf_file_path)
     filename = pdf_file.name
+    timings = {}
     try:
-        classifier = PDFClassifier(config)
-        pdf_type = classifier.classify(str(pdf_file))
+        # O PDF é aberto uma única vez e compartilhado por classificação, tabelas e extração.
+        # O contexto é fechado antes de mover o arquivo (no Windows o handle aberto bloqueia o move).
+        with PDFDocumentContext(str(pdf_file), config) as context:
+            if pdf_type is None:
+                start_time = time.time()
+                pdf_type = _classificar(pdf_file, config, context)
+                timings['classify'] = time.time() - start_time
+
+            page_count = context.page_count
+            extraction_dir = _diretorio_extracao(pdf_type)
+            ocr_cache = get_ocr_cache(config)
+            ocr_backend = get_ocr_backend(config)
+            debug_writer = get_debug_writer(config)
+            page_store = get_page_store(config)
+
+            start_time = time.time()
+            txt_path = None
+            tables_path = None
+            extractor = None
+            if config.get('page_routing', True) and pdf_type in ROUTED_TYPES:
+                # A classificação só define a pasta de destino; cada página escolhe texto ou OCR
+                extractor = 'extract_text_routed'
+                txt_path = extract_text_routed(
+                    str(pdf_file), output_dir=str(extraction_dir), config=config, context=context,
+                    ocr_cache=ocr_cache, ocr_backend=ocr_backend, debug_writer=debug_writer, page_store=page_store
+                )
+            elif pdf_type == 'text_only':
+                extractor = 'extract_and_save_text'
+                txt_path = extract_and_save_text(str(pdf_file), output_dir=str(extraction_dir), context=context)
+            elif pdf_type == 'image_only':
+                extractor = 'extract_text_from_images'
+                txt_path = extract_text_from_images(
+                    str(pdf_file), output_dir=str(extraction_dir), context=context,
+                    ocr_cache=ocr_cache, ocr_backend=ocr_backend, debug_writer=debug_writer
+                )
+            elif pdf_type == 'mixed':
+                extractor = 'extract_text_mixed'
+                txt_path = extract_text_mixed(
+                    str(pdf_file), output_dir=str(extraction_dir), context=context,
+                    ocr_cache=ocr_cache, ocr_backend=ocr_backend, page_store=page_store
+                )
+            elif pdf_type == 'tables':
+                extractor = 'extract_and_save_text'
+                txt_path = extract_and_save_text(str(pdf_file), output_dir=str(extraction_dir), context=context)
+            else:
+                logger.warning(f"⚠️ Tipo de PDF '{pdf_type}' não reconhecido: {filename}")
+            timings['extract'] = time.time() - start_time
+
+            if pdf_type == 'tables':
+                # Além do texto, as tabelas vão para um conjunto de dados com colunas tipadas
+                table_start = time.time()
+                tables_path = extract_tables_to_dataset(
+                    str(pdf_file), output_dir="data/output/tables", context=context,
+                    table_format=config.get('table_format', 'auto')
+                )
+                timings['tables'] = time.time() - table_start
 
-        if has_tables_in_pdf(str(pdf_file)):
-            logger.info(f"Tabela detectada em: {filename}")
-            pdf_type = 'tables'
+        entities_path = _extrair_entidades(txt_path, config, timings)
 
-        text_output_base = Path("data/output/text")
-        extraction_dir = text_output_base / pdf_type
-        extraction_dir.mkdir(parents=True, exist_ok=True)
+        if ocr_cache is not None:
+            stats = ocr_cache.stats()
+            logger.info(
+                f"Cache de OCR após {filename}: {stats['hits']} acertos, {stats['misses']} faltas "
+                f"({stats['hit_rate']:.0%})."
+            )
 
-        txt_path = None
-        if pdf_type == 'text_only':
-            txt_path = extract_and_save_text(str(pdf_file), output_dir=str(extraction_dir))
+        destination = _finalizar_pdf(pdf_file, pdf_type, txt_path, config)
+        result = _resultado(pdf_file, pdf_type, extractor, txt_path, destination, timings)
+        result['page_count'] = page_count
+        if tables_path:
+            result['tables_path'] = tables_path
+        if entities_path:
+            result['entities_path'] = entities_path
+    except Exception as e:
+        result = mover_para_erros(pdf_file, e)
+    result['metrics'] = metrics.drain()
+    return result
+
+def processar_lote(pdf_file_paths: List[str], config: Dict, pdf_type: str = None) -> List[Dict]:
+    """
+    Processa em sequência, no mesmo worker, um lote de arquivos pequenos do mesmo tipo.
+    Retorna um resumo por arquivo, na ordem de `pdf_file_paths`.
+    """
+    return [processar_pdf(pdf_file_path, config, pdf_type) for pdf_file_path in pdf_file_paths]
+
+def finalizar_pdf_paginado(
+    pdf_file_path: str, pdf_type: str, pages_text: List, config: Dict, timings: Dict = None
+) -> Dict:
+    """
+    Salva o texto reunido dos blocos de páginas de um documento grande e move o PDF.
+    Com `page_routing`, `pages_text` traz os registros por página do roteador.
+    `timings` recebe o tempo somado dos blocos (registrado no manifesto).
+    """
+    pdf_file = Path(pdf_file_path)
+    try:
+        extraction_dir = _diretorio_extracao(pdf_type)
+        if config.get('page_routing', True):
+            extractor = 'extract_pages_routed'
+            txt_path = save_routed_text(str(pdf_file), str(extraction_dir), pages_text)
         elif pdf_type == 'image_only':
-            txt_path = extract_text_from_images(str(pdf_file), output_dir=str(extraction_dir))
-        elif pdf_type == 'mixed':
-            txt_path = extract_text_mixed(str(pdf_file), output_dir=str(extraction_dir))
-        elif pdf_type == 'tables':
-            txt_path = extract_and_save_text(str(pdf_file), output_dir=str(extraction_dir))
+            extractor = 'ocr_pages'
+            txt_path = save_ocr_text(str(pdf_file), str(extraction_dir), pages_text)
         else:
-            logger.warning(f"⚠️ Tipo de PDF '{pdf_type}' não reconhecido: {filename}")
+            extractor = 'extract_pages_mixed'
+            txt_path = save_mixed_text(str(pdf_file), str(extraction_dir), pages_text)
+        timings = dict(timings or {})
+        entities_path = _extrair_entidades(txt_path, config, timings)
+        destination = _finalizar_pdf(pdf_file, pdf_type, txt_path, config)
+        result = _resultado(pdf_file, pdf_type, extractor, txt_path, destination, timings)
+        result['page_count'] = len(pages_text)
+        if entities_path:
+            result['entities_path'] = entities_path
+        return result
+    except Exception as e:
+        return mover_para_erros(pdf_file, e)
 
-        if not txt_path:
-            logger.warning(f"⚠️ Falha ao salvar texto extraído de {filename}")
-            return
+def finalizar_pdf_paginado_no_worker(
+    pdf_file_path: str, pdf_type: str, pages_text: List, config: Dict, timings: Dict = None
+) -> Dict:
+    """
+    `finalizar_pdf_paginado` num worker do pool, com as métricas do worker no resultado.
+    Mantém a escrita do texto e a extração de itens fora do processo principal, que só
+    distribui as tarefas e registra os resultados.
+    """
+    result = finalizar_pdf_paginado(pdf_file_path, pdf_type, pages_text, config, timings)
+    result['metrics'] = metrics.drain()
+    return result
 
-        logger.info(f"✅ Texto extraído salvo em: {txt_path}")
+def filtrar_ja_processados(pdf_files: List[Path], manifest: JobManifest, config: Dict) -> Tuple[List[Path], Dict]:
+    """
+    Consulta o manifesto: arquivos já concluídos com o mesmo conteúdo e config são
+    apenas movidos para a pasta do tipo registrado; os demais são marcados como
+    'running' e devolvidos para processamento (junto com o hash de cada um).
+    """
+    cfg_hash = config_hash(config)
+    pending = []
+    hashes = {}
+    skipped = 0
+    with manifest.batch():
+        for pdf in pdf_files:
+            content_hash = manifest.file_hash(pdf)
+            record = manifest.completed(content_hash, cfg_hash)
+            if record is not None:
+                destination = _finalizar_pdf(pdf, record['pdf_type'], record['output_path'], config)
+                if destination is not None:
+                    manifest.remember_path(pdf, destination)
+                skipped += 1
+                continue
+            manifest.mark_running(content_hash, cfg_hash, pdf)
+            hashes[str(pdf)] = content_hash
+            pending.append(pdf)
 
-        output_base_path = Path("data/input/processed")
-        if pdf_type == 'unprocessable' and config.get('quarantine_unprocessable', False):
-            quarantine_dir = output_base_path / "quarantine"
-            quarantine_dir.mkdir(parents=True, exist_ok=True)
-            move_file(str(pdf_file), str(quarantine_dir / filename))
-            return
+    if skipped:
+        logger.info(f"⏭️ {skipped} arquivo(s) já processado(s) com o mesmo conteúdo e config foram pulados.")
+    return pending, hashes
 
-        destination_dir = output_base_path / pdf_type
-        destination_dir.mkdir(parents=True, exist_ok=True)
-        destination = destination_dir / filename
-        move_file(str(pdf_file), str(destination))
-        logger.info(f"📂 Arquivo {filename} classificado como {pdf_type} e movido para {destination}")
+def _indexador(config: Dict):
+    """
+    Thread única que atualiza o índice de busca fora do laço de despacho (uma escrita por
+    vez no SQLite); sem `enable_search_index`, um contexto vazio (None).
+    """
+    if not config.get('enable_search_index', False):
+        return nullcontext()
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='search-index')
 
-    except Exception as e:
-        logger.error(f"❌ Falha crítica ao processar {filename}: {str(e)}")
-        error_dir = Path("data/input/processed") / "errors"
-        error_dir.mkdir(parents=True, exist_ok=True)
-        move_file(str(pdf_file), str(error_dir / filename))
+def process_batch(input_dir: str, output_base_dir: str, config: Dict, worker_initializer: Optional[Callable] = None):
+    """
+    Processa todos os PDFs de `input_dir`. `worker_initializer` é executado em cada
+    worker dos pools ao iniciar (ex.: benchmarks que substituem o OCR).
+    """
+    # Logs de todos os workers passam por uma fila e são gravados só pelo listener
+    with log_listener(config):
+        _process_batch(input_dir, output_base_dir, config, worker_initializer)
 
-def process_batch(input_dir: str, output_base_dir: str, config: Dict):
+def _process_batch(input_dir: str, output_base_dir: str, config: Dict, worker_initializer: Optional[Callable] = None):
     logger.info("Iniciando processamento em lote...")
 
     input_dir_path = Path(input_dir)
@@ -115,28 +413,208 @@ def process_batch(input_dir: str, output_base_dir: str, config: Dict):
         logger.warning("Nenhum arquivo PDF encontrado para processar!")
         return
 
-    pdf_files.sort(key=lambda x: x.stat().st_size, reverse=True)  # Ordena por tamanho (maior primeiro)
+    manifest = None
+    hashes = {}
+    if config.get('enable_manifest', True):
+        manifest = JobManifest(config.get('manifest_path', DEFAULT_MANIFEST_PATH))
+        pdf_files, hashes = filtrar_ja_processados(pdf_files, manifest, config)
+        if not pdf_files:
+            logger.info("✅ Nada a processar: todos os arquivos já constam no manifesto.")
+            manifest.close()
+            return
+    cfg_hash = config_hash(config)
+    # Custo por página de cada tipo medido nas execuções anteriores (padrões sem histórico)
+    cost_model = CostModel.from_history(manifest.cost_samples()) if manifest is not None else CostModel()
+    summary = RunSummary()
 
-    with ProcessPoolExecutor() as executor:
-        futures = {executor.submit(processar_pdf, str(pdf), config): pdf for pdf in pdf_files}
-        total = len(futures)
-        for i, future in enumerate(as_completed(futures), 1):
-            try:
-                future.result()
-                print(f"✅ [{i}/{total}] Finalizado: {futures[future].name}")
-            except Exception as e:
-                print(f"❌ Erro ao processar {futures[future].name}: {e}")
+    def registrar(pdf_path: str, result: Dict) -> None:
+        summary.add_result(pdf_path, result)
+        # O índice de busca é atualizado no processo principal, um arquivo por vez, na
+        # thread do indexador: o laço segue despachando enquanto o FTS grava
+        if indexer is not None:
+            indexer.submit(index_result, result, config)
+        if manifest is None or pdf_path not in hashes:
+            return
+        manifest.mark_finished(hashes[pdf_path], cfg_hash, result)
+        if result.get('destination'):
+            manifest.remember_path(pdf_path, result['destination'])
+
+    # Só a classificação segue o tamanho em bytes; a extração é ordenada pelo modelo de custo
+    pdf_files.sort(key=lambda x: x.stat().st_size, reverse=True)
+
+    # Pools separados: extração de texto (barata, muitos workers) e OCR (pesado, limitado
+    # para que workers x threads do Tesseract/OpenCV não ultrapassem os núcleos). Os dois
+    # rodam ao mesmo tempo, então dividem entre si os orçamentos de CPU e memória.
+    shares = pool_shares(config)
+    with create_pool(config, 'text', initializer=worker_initializer, share=shares['text']) as text_executor, \
+            create_pool(config, 'ocr', initializer=worker_initializer, share=shares['ocr']) as ocr_executor, \
+            _indexador(config) as indexer:
+        # A classificação (barata) de cada arquivo vai para o pool de texto; assim que um
+        # arquivo é classificado, suas tarefas (arquivo inteiro, blocos de páginas dos
+        # documentos grandes ou lotes de arquivos pequenos) entram na fila do seu pool, sem
+        # esperar pelos demais. O pool de OCR começa com o primeiro documento digitalizado.
+        classifying = {text_executor.submit(classificar_pdf, str(pdf), config): str(pdf) for pdf in pdf_files}
+        planner = TaskPlanner(
+            chunk_size=config.get('page_chunk_size', 16),
+            split_threshold=config.get('parallel_page_threshold', 32),
+            splittable_types=ROUTED_SPLITTABLE_TYPES if config.get('page_routing', True) else SPLITTABLE_TYPES,
+            cost_model=cost_model,
+            batch_seconds=config.get('small_file_batch_seconds', 2.0),
+            max_batch_files=config.get('max_batch_files', 32)
+        )
+        planned: List = []
+        # Tarefas prontas de cada pool, maior custo estimado primeiro (LPT). Cada pool recebe
+        # só algumas tarefas por worker, para que uma tarefa cara classificada depois ainda
+        # passe à frente das baratas já na fila
+        executors = {'text': text_executor, 'ocr': ocr_executor}
+        ready: Dict[str, List] = {'text': [], 'ocr': []}
+        in_flight = {'text': 0, 'ocr': 0}
+        limits = {
+            kind: pool_size(config, kind, share=shares[kind]) * config.get('tasks_per_worker', 2)
+            for kind in executors
+        }
+        sequence = itertools.count()
+
+        def enfileirar(tasks) -> None:
+            for task in tasks:
+                planned.append(task)
+                # Blocos de páginas só existem em documentos grandes e podem conter páginas de OCR
+                kind = 'ocr' if task.pdf_type in OCR_TYPES or task.is_chunk else 'text'
+                heapq.heappush(ready[kind], (-task.cost, next(sequence), task))
+
+        def despachar() -> None:
+            for kind, executor in executors.items():
+                while ready[kind] and in_flight[kind] < limits[kind]:
+                    _, _, task = heapq.heappop(ready[kind])
+                    if task.pdf_path in failed_files:
+                        continue
+                    if task.is_chunk:
+                        future = executor.submit(
+                            timed_page_range, task.pdf_path, task.pdf_type, task.first_page, task.last_page, config
+                        )
+                    elif task.is_batch:
+                        future = executor.submit(processar_lote, list(task.batch_paths), config, task.pdf_type)
+                    else:
+                        future = executor.submit(processar_pdf, task.pdf_path, config, task.pdf_type)
+                    futures[future] = (kind, task)
+                    in_flight[kind] += 1
+                    pending.add(future)
 
+        futures: Dict = {}
+        assembler = PageAssembler()
+        chunk_seconds: Dict[str, float] = {}
+        # Documentos em blocos já remontados, finalizados (texto e itens) no pool de texto
+        finalizing: Dict = {}
+        failed_files = set()
+        finished = 0
+        total = len(pdf_files)
+        pending = set(classifying)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in classifying:
+                    pdf_path = classifying.pop(future)
+                    try:
+                        item = future.result()
+                    except Exception as e:
+                        registrar(pdf_path, {'status': 'failed', 'error': str(e)})
+                        finished += 1
+                        print(f"❌ Erro ao classificar {Path(pdf_path).name}: {e}")
+                    else:
+                        summary.add_metrics(item['path'], item.pop('metrics', None))
+                        enfileirar(planner.add(item))
+                    if not classifying:
+                        enfileirar(planner.flush())
+                        log_plan(planned)
+                    continue
+
+                if future in finalizing:
+                    pdf_path = finalizing.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = mover_para_erros(Path(pdf_path), e)
+                    registrar(pdf_path, result)
+                    finished += 1
+                    print(f"✅ [{finished}/{total}] Finalizado: {Path(pdf_path).name}")
+                    continue
+
+                kind, task = futures.pop(future)
+                in_flight[kind] -= 1
+                name = Path(task.pdf_path).name
+                if task.pdf_path in failed_files:
+                    continue
+                try:
+                    result = future.result()
+                    if task.is_batch:
+                        for pdf_path, item in zip(task.batch_paths, result):
+                            registrar(pdf_path, item)
+                            finished += 1
+                            print(f"✅ [{finished}/{total}] Finalizado: {Path(pdf_path).name}")
+                        continue
+                    if task.is_chunk:
+                        chunk_pages, seconds, chunk_metrics = result
+                        summary.add_metrics(task.pdf_path, chunk_metrics)
+                        chunk_seconds[task.pdf_path] = chunk_seconds.get(task.pdf_path, 0.0) + seconds
+                        pages_text = assembler.add(task, chunk_pages)
+                        if pages_text is None:
+                            continue
+                        finalize = text_executor.submit(
+                            finalizar_pdf_paginado_no_worker, task.pdf_path, task.pdf_type, pages_text, config,
+                            {'extract': chunk_seconds.pop(task.pdf_path)}
+                        )
+                        finalizing[finalize] = task.pdf_path
+                        pending.add(finalize)
+                        continue
+                    registrar(task.pdf_path, result)
+                    finished += 1
+                    print(f"✅ [{finished}/{total}] Finalizado: {name}")
+                except Exception as e:
+                    if task.is_chunk:
+                        # Blocos restantes do mesmo documento: os da fila local não são mais
+                        # despachados e os já enviados que ainda não começaram são cancelados
+                        failed_files.add(task.pdf_path)
+                        assembler.discard(task.pdf_path)
+                        for other, (_, other_task) in futures.items():
+                            if other_task.pdf_path == task.pdf_path:
+                                other.cancel()
+                        registrar(task.pdf_path, mover_para_erros(Path(task.pdf_path), e))
+                    elif task.is_batch:
+                        for pdf_path in task.batch_paths:
+                            registrar(pdf_path, {'status': 'failed', 'error': str(e)})
+                        finished += len(task.batch_paths) - 1
+                    else:
+                        registrar(task.pdf_path, {'status': 'failed', 'error': str(e)})
+                    finished += 1
+                    print(f"❌ Erro ao processar {name}: {e}")
+            despachar()
+
+    if manifest is not None:
+        manifest.close()
+    if config.get('enable_metrics', True):
+        run = summary.finish()
+        write_run_summary(run, config.get('metrics_dir', DEFAULT_METRICS_DIR))
+        logger.info(
+            f"⏱️ {run['files']} arquivo(s), {run['pages']} página(s) em {run['wall_seconds']:.1f}s "
+            f"({run['pages_per_second']:.2f} páginas/s)."
+        )
     logger.info("✅ Processamento em lote concluído!")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--reset", action="store_true", help="Reseta ambiente de teste antes de executar")
+    parser.add_argument("--watch", action="store_true", help="Mantém o serviço observando a pasta de entrada")
     args = parser.parse_args()
 
     if args.reset:
         reset_test_environment()
 
+    if args.watch:
+        from src.watch_service import run_watch_service
+        print("⭐ Serviço de observação iniciado! (Ctrl+C ou SIGTERM para encerrar)")
+        run_watch_service(input_dir="data/input/pending", config=config)
+        sys.exit(0)
+
     print("⭐ Script iniciado!")
     input_dir = "data/input/pending"
     output_dir = "data/input/processed"
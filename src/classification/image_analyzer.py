@@ -1,4 +1,3 @@
-import pytesseract
 import cv2
 import numpy as np
 import time
@@ -8,94 +7,251 @@ from pdf2image import convert_from_path
 import fitz  # PyMuPDF
 import hashlib
 from src.utils.logger import setup_logger
+from src.utils.ocr_cache import cached_ocr
+from src.extraction.ocr_engine import get_ocr_backend
 
 logger = setup_logger(__name__)
 
+# Versão do pré-processamento; faz parte da chave do cache de OCR
+PREPROCESS_VERSION = "2"
+
+# Opções padrão do pipeline (podem ser sobrescritas em `preprocess_image(..., options=...)`)
+DEFAULT_PREPROCESS_OPTIONS = {
+    # Largura da cópia reduzida usada para estimar ruído e inclinação
+    'analysis_width': 1000,
+    # 'auto' aplica o filtro bilateral só se o ruído estimado passar de `noise_threshold`;
+    # 'always' reproduz o comportamento anterior; 'never' desliga o filtro
+    'denoise': 'auto',
+    'noise_threshold': 5.0,
+    # Inclinações menores que `min_skew_angle` (em graus) não são corrigidas; linhas
+    # além de `max_skew_angle` da horizontal não entram na estimativa
+    'min_skew_angle': 0.1,
+    'max_skew_angle': 15.0,
+    'deskew': True,
+    # 'lines' estima a inclinação na cópia reduzida (ver `estimate_skew_angle`); 'legacy'
+    # usa a estimativa anterior, sobre a imagem binarizada em resolução original
+    'skew_method': 'lines',
+}
+
+# Reproduz o pré-processamento anterior, inclusive a estimativa de inclinação sobre todos
+# os segmentos (que gira páginas com ruído ou em 300 DPI em ±45°/±90°)
+LEGACY_PREPROCESS_OPTIONS = {'denoise': 'always', 'skew_method': 'legacy', 'min_skew_angle': 0.0}
+
 def get_adaptive_block_size(width: int) -> int:
     block_size = width // 40
     if block_size % 2 == 0:
         block_size += 1
     return max(11, block_size)
 
-def preprocess_image(image):
+def _to_gray(image_np: np.ndarray) -> np.ndarray:
+    """Aceita imagens em cinza (2-D), BGR ou BGRA."""
+    if image_np.ndim == 2:
+        return image_np
+    if image_np.shape[2] == 4:
+        return cv2.cvtColor(image_np, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+
+def estimate_noise(gray: np.ndarray) -> float:
+    """Desvio-padrão do ruído pelo estimador de Immerkær (kernel laplaciano 3x3)."""
+    h, w = gray.shape[:2]
+    kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+    response = cv2.filter2D(gray.astype(np.float32), -1, kernel)
+    return float(np.sqrt(np.pi / 2) * np.abs(response[1:-1, 1:-1]).sum() / (6 * max(1, (w - 2) * (h - 2))))
+
+def estimate_skew_angle(gray: np.ndarray, max_angle: float = 15.0) -> float:
+    """
+    Ângulo mediano (em graus) das linhas de texto quase horizontais detectadas por
+    HoughLinesP. Os caracteres são unidos horizontalmente antes da transformada, para
+    que cada linha de texto vire um segmento longo; os parâmetros são escalados pela
+    largura, para uso na cópia reduzida da página.
+    """
+    width = gray.shape[1]
+    thresh = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV,
+        get_adaptive_block_size(width), 2
+    )
+    smear = cv2.dilate(thresh, np.ones((1, max(3, width // 60)), np.uint8))
+    edges = cv2.Canny(smear, 50, 150, apertureSize=3)
+    lines = cv2.HoughLinesP(
+        edges, 1, np.pi / 720,
+        threshold=max(30, width // 10), minLineLength=max(30, width // 6), maxLineGap=max(5, width // 100)
+    )
+    if lines is None:
+        return 0.0
+    # OpenCV 4 devolve (N, 1, 4) e OpenCV 5, (N, 4)
+    segments = lines.reshape(-1, 4).astype(np.float64)
+    angles = np.degrees(np.arctan2(segments[:, 3] - segments[:, 1], segments[:, 2] - segments[:, 0]))
+    # Segmentos verticais (bordas de tabelas, figuras) não indicam a inclinação do texto
+    angles = (angles + 90.0) % 180.0 - 90.0
+    angles = angles[np.abs(angles) <= max_angle]
+    return float(np.median(angles)) if angles.size else 0.0
+
+def estimate_skew_angle_legacy(binary: np.ndarray) -> float:
+    """Estimativa anterior: ângulo mediano de todos os segmentos de HoughLinesP na imagem binarizada."""
+    edges = cv2.Canny(binary, 50, 150, apertureSize=3)
+    lines = cv2.HoughLinesP(edges, 1, np.pi / 180, threshold=100, minLineLength=30, maxLineGap=5)
+    if lines is None:
+        return 0.0
+    segments = lines.reshape(-1, 4).astype(np.float64)
+    return float(np.median(np.degrees(np.arctan2(segments[:, 3] - segments[:, 1], segments[:, 2] - segments[:, 0]))))
+
+def preprocess_image(image, options: dict = None, timings: dict = None):
+    """
+    Prepara a imagem para OCR: filtro bilateral (quando há ruído), CLAHE, mediana,
+    limiarização adaptativa, abertura morfológica e correção de inclinação.
+
+    Ruído e inclinação são estimados numa cópia reduzida (`analysis_width`); só os
+    filtros que produzem a imagem final rodam na resolução original, e a rotação é
+    omitida quando o ângulo é desprezível. `LEGACY_PREPROCESS_OPTIONS` reproduz o
+    resultado anterior. Se `timings` for informado, recebe o tempo de cada etapa
+    executada, em segundos.
+    """
+    opts = dict(DEFAULT_PREPROCESS_OPTIONS, **(options or {}))
+    stage_times = {}
+
+    def stage(name, start):
+        stage_times[name] = stage_times.get(name, 0.0) + time.perf_counter() - start
+
     try:
-        start_time = time.time()
-        image_np = np.array(image)
-        gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
-        bilateral = cv2.bilateralFilter(gray, d=9, sigmaColor=75, sigmaSpace=75)
+        start_time = time.perf_counter()
+        t = time.perf_counter()
+        gray = _to_gray(np.asarray(image))
+        stage('gray', t)
+
+        t = time.perf_counter()
+        width = gray.shape[1]
+        factor = min(1.0, opts['analysis_width'] / max(1, width))
+        small = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA) if factor < 1.0 else gray
+        stage('downscale', t)
+
+        t = time.perf_counter()
+        noise = estimate_noise(small)
+        denoise = opts['denoise'] == 'always' or (opts['denoise'] == 'auto' and noise > opts['noise_threshold'])
+        stage('noise_estimate', t)
+
+        angle = 0.0
+        legacy_skew = opts['skew_method'] == 'legacy'
+        if opts['deskew'] and not legacy_skew:
+            t = time.perf_counter()
+            angle = estimate_skew_angle(small, opts['max_skew_angle'])
+            stage('skew_estimate', t)
+
+        # Etapas omitidas (filtro bilateral, rotação) não aparecem em `timings`
+        filtered = gray
+        if denoise:
+            t = time.perf_counter()
+            filtered = cv2.bilateralFilter(gray, d=9, sigmaColor=75, sigmaSpace=75)
+            stage('bilateral', t)
+
+        t = time.perf_counter()
         clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(bilateral)
-        background_removed = cv2.medianBlur(enhanced, 3)
-        block_size = get_adaptive_block_size(image_np.shape[1])
+        background_removed = cv2.medianBlur(clahe.apply(filtered), 3)
+        stage('clahe_median', t)
+
+        t = time.perf_counter()
         thresh = cv2.adaptiveThreshold(
             background_removed, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY, block_size, 2
+            cv2.THRESH_BINARY, get_adaptive_block_size(width), 2
         )
-        kernel_open = np.ones((2, 2), np.uint8)
-        morph = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel_open)
-        edges = cv2.Canny(morph, 50, 150, apertureSize=3)
-        lines = cv2.HoughLinesP(edges, 1, np.pi / 180, threshold=100, minLineLength=30, maxLineGap=5)
-
-        if lines is not None:
-            angles = []
-            for line in lines:
-                for x1, y1, x2, y2 in line:
-                    angle = np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi
-                    angles.append(angle)
-            median_angle = np.median(angles)
+        morph = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+        stage('threshold_morph', t)
+
+        if opts['deskew'] and legacy_skew:
+            t = time.perf_counter()
+            angle = estimate_skew_angle_legacy(morph)
+            stage('skew_estimate', t)
+
+        if abs(angle) >= opts['min_skew_angle']:
+            t = time.perf_counter()
             (h, w) = morph.shape
-            center = (w // 2, h // 2)
-            M = cv2.getRotationMatrix2D(center, median_angle, 1.0)
+            M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
             morph = cv2.warpAffine(morph, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+            stage('rotate', t)
 
-        end_time = time.time()
-        logger.info(f"Pré-processamento concluído em {end_time - start_time:.2f}s")
+        if timings is not None:
+            for name, seconds in stage_times.items():
+                timings[name] = timings.get(name, 0.0) + seconds
+        detail = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in stage_times.items())
+        logger.debug(
+            f"Pré-processamento concluído em {time.perf_counter() - start_time:.2f}s "
+            f"(ruído {noise:.1f}, inclinação {angle:.2f}°; {detail})"
+        )
         return morph
 
     except Exception as e:
         logger.error(f"Erro no pré-processamento da imagem: {str(e)}")
         return image
 
-def extract_ocr_relevant_images(pdf_path: str, min_size: tuple = (400, 400), pages_to_sample: int = 3):
+def _collect_relevant_images(page_indexes, get_images, extract_image, min_size: tuple) -> list:
+    relevant_images = []
+    for page_index in page_indexes:
+        images = get_images(page_index)
+        for img_index, img_info in enumerate(images):
+            xref = img_info[0]
+            base_image = extract_image(xref)
+            image_bytes = base_image["image"]
+            img = Image.open(io.BytesIO(image_bytes)).convert("L")
+            width, height = img.size
+            if width < min_size[0] or height < min_size[1]:
+                continue
+            img_np = np.array(img)
+            if np.mean(img_np) > 245 or np.mean(img_np) < 10:
+                continue
+            hash_digest = hashlib.md5(img_np.tobytes()).hexdigest()
+            relevant_images.append((img, hash_digest))
+    return relevant_images
+
+def extract_ocr_relevant_images(
+    pdf_path: str, min_size: tuple = (400, 400), pages_to_sample: int = 3, context=None, page_indexes=None
+):
     relevant_images = []
     try:
-        with fitz.open(pdf_path) as doc:
-            for page_index in range(min(pages_to_sample, len(doc))):
-                page = doc[page_index]
-                images = page.get_images(full=True)
-                for img_index, img_info in enumerate(images):
-                    xref = img_info[0]
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    img = Image.open(io.BytesIO(image_bytes)).convert("L")
-                    width, height = img.size
-                    if width < min_size[0] or height < min_size[1]:
-                        continue
-                    img_np = np.array(img)
-                    if np.mean(img_np) > 245 or np.mean(img_np) < 10:
-                        continue
-                    hash_digest = hashlib.md5(img_np.tobytes()).hexdigest()
-                    relevant_images.append((img, hash_digest))
+        if context is not None:
+            if page_indexes is None:
+                page_indexes = range(min(pages_to_sample, context.page_count))
+            relevant_images = _collect_relevant_images(
+                page_indexes, context.page_images, context.extract_image, min_size
+            )
+        else:
+            with fitz.open(pdf_path) as doc:
+                if page_indexes is None:
+                    page_indexes = range(min(pages_to_sample, len(doc)))
+                relevant_images = _collect_relevant_images(
+                    page_indexes, lambda i: doc[i].get_images(full=True), doc.extract_image, min_size
+                )
     except FileNotFoundError:
         logger.error(f"Arquivo não encontrado: {pdf_path}")
     except Exception as e:
         logger.error(f"Erro ao extrair imagens do PDF {pdf_path}: {str(e)}")
     return relevant_images
 
-def has_text_in_images(pdf_path: str, pages_to_sample: int = 1) -> bool:
+def has_text_in_images(
+    pdf_path: str, pages_to_sample: int = 1, context=None, ocr_cache=None, page_indexes=None, ocr_backend=None
+) -> bool:
+    """
+    Verifica, via OCR, se as imagens relevantes das primeiras páginas contêm texto.
+    `page_indexes` (0-based) restringe a sondagem a páginas específicas.
+    """
     try:
         start_time = time.time()
-        relevant_images = extract_ocr_relevant_images(pdf_path, pages_to_sample=pages_to_sample)
+        relevant_images = extract_ocr_relevant_images(
+            pdf_path, pages_to_sample=pages_to_sample, context=context, page_indexes=page_indexes
+        )
         detected_texts = []
         min_text_length = 15
+        ocr_backend = ocr_backend or get_ocr_backend()
 
         for i, (img, img_hash) in enumerate(relevant_images):
-            processed_img = preprocess_image(img)
             custom_config = r'--oem 3 --psm 6 -l por+eng'
-            text = pytesseract.image_to_string(processed_img, config=custom_config).strip()
+            # Imagens repetidas (logos, diagramas) são reconhecidas uma única vez
+            text = cached_ocr(
+                ocr_cache, img_hash, custom_config,
+                lambda: ocr_backend.image_to_string(preprocess_image(img), config=custom_config),
+                preprocess_version=PREPROCESS_VERSION, backend=ocr_backend.name
+            ).strip()
             if len(text) > min_text_length:
                 detected_texts.append(text)
-            logger.info(f"Imagem relevante {i+1}: Extraído {len(text)} caracteres.")
+            logger.debug(f"Imagem relevante {i+1}: Extraído {len(text)} caracteres.")
 
         end_time = time.time()
         if detected_texts:
@@ -1,46 +1,79 @@
+import time
 import fitz  # PyMuPDF
 import PyPDF2
 from typing import Literal
 from src.utils.logger import setup_logger
+from src.utils.document_context import PDFDocumentContext
 from src.classification.text_analyzer import has_selectable_text
 from src.classification.image_analyzer import has_text_in_images
+from src.classification.structure_analyzer import analyze_document_structure
 from src.classification.table_detector import has_tables_in_pdf
+from src.utils.ocr_cache import get_ocr_cache
+from src.extraction.ocr_engine import get_ocr_backend
 
 logger = setup_logger(__name__)
 
 PDFType = Literal['text_only', 'image_only', 'mixed', 'tables', 'unprocessable']
 
 class PDFClassifier:
+    """
+    Classificador em níveis:
+
+    1. `structure`: sinais estruturais do PyMuPDF (camada de texto, cobertura de imagens,
+       fontes, camada invisível de OCR), sem OCR.
+    2. `ocr_probe`: OCR de sondagem apenas nas páginas que o nível 1 não decidiu.
+
+    Com `fast_classification` desabilitado (ou se o PDF não puder ser analisado
+    estruturalmente), usa diretamente as verificações completas (`full`).
+    `last_analysis` informa qual nível decidiu e o tempo de cada nível.
+    """
+
     def __init__(self, config: dict):
         self.config = config
-        self.last_analysis = {
-            'file': None,
+        self.last_analysis = self._empty_analysis(None)
+
+    @staticmethod
+    def _empty_analysis(pdf_name):
+        return {
+            'file': pdf_name,
             'text_selectable': False,
             'image_has_text': False,
             'error': None,
-            'enhanced_check': False
+            'enhanced_check': False,
+            'tier': None,
+            'tier_timings': {},
+            'pages': [],
         }
 
-    def classify(self, pdf_path: str) -> PDFType:
+    def get_last_analysis(self) -> dict:
+        return self.last_analysis
+
+    def classify(self, pdf_path: str, context=None) -> PDFType:
+        """
+        Classifica o PDF. Se um `PDFDocumentContext` for informado, as verificações
+        reaproveitam o documento já aberto em vez de reabri-lo.
+        """
         pdf_name = pdf_path.split("/")[-1]
         logger.info(f"📂 Iniciando classificação do PDF: {pdf_name}")
 
-        self.last_analysis = {
-            'file': pdf_name,
-            'text_selectable': False,
-            'image_has_text': False,
-            'error': None,
-            'enhanced_check': False
-        }
+        self.last_analysis = self._empty_analysis(pdf_name)
 
         try:
-            has_text = has_selectable_text(pdf_path, threshold=self.config.get("text_threshold", 0.7))
-            has_image = has_text_in_images(pdf_path, sample_pages=self.config.get("pages_to_sample", 3))
+            signals = None
+            if self.config.get("fast_classification", True):
+                signals = self._tiered_signals(pdf_path, context)
 
+            if signals is None:
+                signals = self._full_signals(pdf_path, context)
+
+            has_text, has_image = signals
             self.last_analysis['text_selectable'] = has_text
             self.last_analysis['image_has_text'] = has_image
 
-            logger.info(f"🔎 Verificação combinada - Texto selecionável: {has_text}, Texto em imagens: {has_image}")
+            logger.info(
+                f"🔎 Verificação combinada ({self.last_analysis['tier']}) - "
+                f"Texto selecionável: {has_text}, Texto em imagens: {has_image}"
+            )
 
             if has_text and has_image:
                 logger.info(f"✅ {pdf_name} classificado como: mixed")
@@ -60,3 +93,72 @@ class PDFClassifier:
             self.last_analysis['error'] = error_msg
             logger.error(f"🚨 Erro ao classificar {pdf_name}: {str(e)}")
             return "unprocessable"
+
+    def _full_signals(self, pdf_path: str, context) -> tuple:
+        """Verificações completas: camada de texto + OCR das imagens das primeiras páginas."""
+        start_time = time.time()
+        has_text = has_selectable_text(
+            pdf_path, threshold=self.config.get("text_threshold", 0.7), context=context
+        )
+        has_image = has_text_in_images(
+            pdf_path, pages_to_sample=self.config.get("pages_to_sample", 3), context=context,
+            ocr_cache=get_ocr_cache(self.config), ocr_backend=get_ocr_backend(self.config)
+        )
+        self.last_analysis['tier'] = 'full'
+        self.last_analysis['tier_timings']['full'] = time.time() - start_time
+        return has_text, has_image
+
+    def _tiered_signals(self, pdf_path: str, context):
+        """
+        Nível 1 (estrutura) e, se necessário, nível 2 (OCR só nas páginas indecisas).
+        Retorna None se a análise estrutural não for possível.
+        """
+        owns_context = context is None
+        try:
+            if owns_context:
+                context = PDFDocumentContext(pdf_path, self.config)
+            structure = analyze_document_structure(
+                context,
+                pages_to_sample=self.config.get("pages_to_sample", 3),
+                min_text_length=self.config.get("min_text_length", 15)
+            )
+        except Exception as e:
+            logger.info(f"Análise estrutural indisponível para {pdf_path} ({e}); usando verificação completa.")
+            if owns_context and context is not None:
+                context.close()
+            return None
+
+        try:
+            pages = structure['pages']
+            self.last_analysis['pages'] = pages
+            self.last_analysis['tier_timings']['structure'] = structure['elapsed']
+            if not pages:
+                self.last_analysis['tier'] = 'structure'
+                return False, False
+
+            # Mesma regra de has_selectable_text: fração de páginas com camada de texto
+            text_pages = sum(
+                1 for p in pages
+                if p['decision'] == 'text' or p['text_chars'] >= self.config.get("min_text_length", 15)
+            )
+            has_text = (text_pages / len(pages)) >= self.config.get("text_threshold", 0.7)
+            has_image = any(p['decision'] == 'image' for p in pages)
+
+            undecided = structure['undecided_pages']
+            if has_image or not undecided:
+                self.last_analysis['tier'] = 'structure'
+                return has_text, has_image
+
+            # Nível 2: OCR de sondagem apenas nas páginas indecisas
+            start_time = time.time()
+            self.last_analysis['enhanced_check'] = True
+            has_image = has_text_in_images(
+                pdf_path, context=context, ocr_cache=get_ocr_cache(self.config), page_indexes=undecided,
+                ocr_backend=get_ocr_backend(self.config)
+            )
+            self.last_analysis['tier'] = 'ocr_probe'
+            self.last_analysis['tier_timings']['ocr_probe'] = time.time() - start_time
+            return has_text, has_image
+        finally:
+            if owns_context:
+                context.close()
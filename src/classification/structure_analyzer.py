@@ -0,0 +1,109 @@
+import time
+from typing import Dict, List, Literal
+
+import fitz  # PyMuPDF
+from src.classification.table_detector import table_prefilter
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PageDecision = Literal['text', 'image', 'blank', 'undecided']
+
+# Fração da página coberta por imagens a partir da qual ela é tratada como digitalizada
+SCANNED_PAGE_COVERAGE = 0.5
+# Abaixo disso as imagens são consideradas decorativas (logos, ícones)
+MINOR_IMAGE_COVERAGE = 0.3
+# Abaixo disso a página não tem imagens relevantes
+NO_IMAGE_COVERAGE = 0.05
+
+
+def page_image_coverage(page: fitz.Page) -> float:
+    """Fração da página coberta por imagens (sem decodificá-las)."""
+    page_area = abs(page.rect.get_area()) or 1.0
+    covered_area = 0.0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info['bbox']) & page.rect
+        if not bbox.is_empty:
+            covered_area += abs(bbox.get_area())
+    return min(1.0, covered_area / page_area)
+
+
+def analyze_page_structure(page: fitz.Page, page_text: str = None) -> Dict:
+    """
+    Coleta sinais estruturais baratos de uma página, sem renderizar nem executar OCR:
+    caracteres da camada de texto (visíveis e invisíveis), cobertura de imagens, fontes
+    e o sinal de tabela do pré-filtro de réguas (`table_hint`).
+
+    :param page: Página PyMuPDF.
+    :param page_text: Texto já extraído da página (ex.: cache do PDFDocumentContext).
+    """
+    if page_text is None:
+        page_text = page.get_text("text")
+
+    # Texto com modo de renderização 3 (invisível) é a camada típica de PDFs já OCRizados
+    invisible_chars = 0
+    try:
+        for span in page.get_texttrace():
+            if span.get('type') == 3:
+                invisible_chars += len(span.get('chars', ()))
+    except Exception:
+        pass
+
+    return {
+        'text_chars': len(page_text.strip()),
+        'invisible_chars': invisible_chars,
+        'image_coverage': page_image_coverage(page),
+        'font_count': len(page.get_fonts()),
+        'table_hint': table_prefilter(page),
+    }
+
+
+def classify_page_structure(stats: Dict, min_text_length: int = 15) -> PageDecision:
+    """
+    Decide o tipo da página apenas pelos sinais estruturais.
+
+    - 'text': camada de texto suficiente e imagens pequenas, ou camada invisível de OCR.
+    - 'image': página digitalizada (imagem cobrindo a maior parte e sem texto).
+    - 'blank': sem texto e sem imagens relevantes.
+    - 'undecided': só um OCR de sondagem consegue dizer se as imagens contêm texto.
+    """
+    has_text_layer = stats['text_chars'] >= min_text_length
+    coverage = stats['image_coverage']
+
+    if stats['invisible_chars'] >= min_text_length:
+        return 'text'
+    if has_text_layer:
+        return 'text' if coverage < MINOR_IMAGE_COVERAGE else 'undecided'
+    if stats['font_count'] > 0 and stats['text_chars'] > 0:
+        # Fontes presentes mas quase nenhum texto extraível (ex.: codificação quebrada)
+        return 'undecided'
+    if coverage >= SCANNED_PAGE_COVERAGE:
+        return 'image'
+    if coverage < NO_IMAGE_COVERAGE:
+        return 'blank'
+    return 'undecided'
+
+
+def analyze_document_structure(context, pages_to_sample: int = 3, min_text_length: int = 15) -> Dict:
+    """
+    Primeiro nível da classificação: analisa as primeiras páginas pelo contexto compartilhado.
+
+    :return: dicionário com as estatísticas e decisões por página, os índices das páginas
+             indecisas e o tempo gasto.
+    """
+    start_time = time.time()
+    pages: List[Dict] = []
+
+    for page_index in range(min(pages_to_sample, context.page_count)):
+        stats = analyze_page_structure(context.page(page_index), context.page_text(page_index))
+        stats['page'] = page_index + 1
+        stats['decision'] = classify_page_structure(stats, min_text_length)
+        pages.append(stats)
+
+    elapsed = time.time() - start_time
+    undecided = [p['page'] - 1 for p in pages if p['decision'] == 'undecided']
+    logger.info(
+        f"Análise estrutural de {context.pdf_path}: "
+        f"{[p['decision'] for p in pages]} em {elapsed:.3f}s"
+    )
+    return {'pages': pages, 'undecided_pages': undecided, 'elapsed': elapsed}
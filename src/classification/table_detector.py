@@ -1,50 +1,187 @@
+import fitz  # PyMuPDF
+import numpy as np
 import pdfplumber
 import time
+from typing import List, Literal, Optional
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-def has_tables_in_pdf(pdf_path: str, pages_to_sample: int = 3) -> bool:
+TableHint = Literal['none', 'table', 'ambiguous']
+
+# Comprimento mínimo (pt) de um traço para contar como régua de tabela
+MIN_RULING_LENGTH = 15.0
+# Tolerância (pt) para considerar um traço horizontal/vertical e para cruzamentos
+RULING_TOLERANCE = 2.0
+# Cruzamentos de réguas a partir dos quais a grade é tratada como tabela (3 x 3)
+MIN_GRID_INTERSECTIONS = 9
+# Palavras dentro da grade para confirmar que ela contém dados
+MIN_WORDS_IN_GRID = 4
+
+
+def _ruling_segments(page: fitz.Page):
+    """Réguas horizontais (y, x0, x1) e verticais (x, y0, y1) dos desenhos vetoriais da página."""
+    horizontal, vertical = [], []
+
+    def add(x0, y0, x1, y1):
+        if abs(y1 - y0) <= RULING_TOLERANCE and abs(x1 - x0) >= MIN_RULING_LENGTH:
+            horizontal.append(((y0 + y1) / 2, min(x0, x1), max(x0, x1)))
+        elif abs(x1 - x0) <= RULING_TOLERANCE and abs(y1 - y0) >= MIN_RULING_LENGTH:
+            vertical.append(((x0 + x1) / 2, min(y0, y1), max(y0, y1)))
+
+    for path in page.get_drawings():
+        for item in path.get('items', ()):
+            if item[0] == 'l':
+                add(item[1].x, item[1].y, item[2].x, item[2].y)
+            elif item[0] == 're':
+                r = item[1]
+                # Retângulos finos são réguas; os demais contribuem com as quatro bordas
+                # (como no pdfplumber, que usa as bordas dos retângulos como linhas)
+                add(r.x0, r.y0, r.x1, r.y0)
+                if r.height > RULING_TOLERANCE:
+                    add(r.x0, r.y1, r.x1, r.y1)
+                add(r.x0, r.y0, r.x0, r.y1)
+                if r.width > RULING_TOLERANCE:
+                    add(r.x1, r.y0, r.x1, r.y1)
+    return np.array(horizontal).reshape(-1, 3), np.array(vertical).reshape(-1, 3)
+
+
+def table_prefilter(page: fitz.Page) -> TableHint:
+    """
+    Sinal barato de tabela a partir dos desenhos vetoriais (PyMuPDF), sem o pdfplumber.
+
+    - 'none': não há réguas suficientes para formar uma tabela de 2 x 2 células
+      (o localizador do pdfplumber, baseado em linhas, não encontraria nenhuma).
+    - 'table': grade com pelo menos 3 x 3 cruzamentos e texto dentro dela.
+    - 'ambiguous': réguas presentes, mas sem grade clara; precisa do localizador completo.
+    """
+    horizontal, vertical = _ruling_segments(page)
+    if len(horizontal) < 3 or len(vertical) < 3:
+        return 'none'
+
+    # Cruzamentos entre todas as réguas horizontais e verticais (vetorizado)
+    hy, hx0, hx1 = horizontal[:, 0:1], horizontal[:, 1:2], horizontal[:, 2:3]
+    vx, vy0, vy1 = vertical[:, 0], vertical[:, 1], vertical[:, 2]
+    crosses = (
+        (vx >= hx0 - RULING_TOLERANCE) & (vx <= hx1 + RULING_TOLERANCE)
+        & (hy >= vy0 - RULING_TOLERANCE) & (hy <= vy1 + RULING_TOLERANCE)
+    )
+    if crosses.sum() < MIN_GRID_INTERSECTIONS:
+        return 'ambiguous'
+
+    rows, cols = np.nonzero(crosses)
+    grid = fitz.Rect(vx[cols].min(), hy[rows, 0].min(), vx[cols].max(), hy[rows, 0].max())
+    words_in_grid = sum(1 for w in page.get_text("words") if fitz.Rect(w[:4]).intersects(grid))
+    return 'table' if words_in_grid >= MIN_WORDS_IN_GRID else 'ambiguous'
+
+
+def _valid_tables(page) -> list:
+    """Tabelas do pdfplumber, sem as pequenas ou irrelevantes."""
+    return [table for table in page.extract_tables() if len(table) > 1 and any(len(row) > 1 for row in table)]
+
+
+def _count_tables(pdf, pdf_path: str, pages_to_sample: int) -> int:
+    total_pages = len(pdf.pages)
+    pages_to_sample = min(pages_to_sample, total_pages)
+
+    detected_tables = 0  # Contador de tabelas válidas
+
+    for i, page in enumerate(pdf.pages[:pages_to_sample]):
+        filtered_tables = _valid_tables(page)
+
+        if filtered_tables:
+            detected_tables += len(filtered_tables)
+            logger.info(f"Tabelas detectadas na página {i+1} do arquivo {pdf_path}.")
+
+    return detected_tables
+
+
+def _first_table_page(get_plumber, pdf_path: str, hints: List[TableHint]) -> Optional[int]:
+    """
+    Percorre as páginas amostradas usando os sinais do pré-filtro e chama o localizador
+    do pdfplumber apenas nas ambíguas. Retorna o índice da primeira página com tabela.
+    """
+    for i, hint in enumerate(hints):
+        if hint == 'table':
+            logger.info(f"Tabela detectada na página {i+1} de {pdf_path} pelo pré-filtro de réguas.")
+            return i
+        if hint == 'ambiguous' and _valid_tables(get_plumber().pages[i]):
+            logger.info(f"Tabelas detectadas na página {i+1} do arquivo {pdf_path}.")
+            return i
+    return None
+
+def has_tables_in_pdf(pdf_path: str, pages_to_sample: int = 3, context=None, table_hints=None) -> bool:
     """
     Verifica se há tabelas em um PDF analisando as primeiras páginas.
-    
+
+    Cada página passa primeiro pelo pré-filtro de réguas (`table_prefilter`); o
+    `extract_tables()` do pdfplumber só roda nas páginas ambíguas, e a busca para na
+    primeira tabela confirmada. Se o pré-filtro não puder ser aplicado, todas as
+    páginas amostradas passam pelo pdfplumber.
+
     Args:
         pdf_path (str): Caminho do arquivo PDF.
         pages_to_sample (int): Número de páginas a analisar.
-    
+        context (PDFDocumentContext, opcional): Contexto já aberto; evita reabrir o PDF.
+        table_hints (list, opcional): Sinais do pré-filtro já calculados na passada de
+            classificação (`analyze_document_structure`), um por página.
+
     Returns:
         bool: True se tabelas forem detectadas, False caso contrário.
     """
     try:
         start_time = time.time()
 
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            pages_to_sample = min(pages_to_sample, total_pages)
+        if table_hints is None:
+            table_hints = _prefilter_pages(pdf_path, pages_to_sample, context)
+        else:
+            table_hints = list(table_hints)[:pages_to_sample]
 
-            detected_tables = 0  # Contador de tabelas válidas
+        if table_hints is not None:
+            plumber = {}
 
-            for i, page in enumerate(pdf.pages[:pages_to_sample]):
-                tables = page.extract_tables()
+            def get_plumber():
+                if context is not None:
+                    return context.plumber
+                if 'pdf' not in plumber:
+                    plumber['pdf'] = pdfplumber.open(pdf_path)
+                return plumber['pdf']
 
-                # Filtragem de tabelas pequenas ou irrelevantes
-                filtered_tables = [
-                    table for table in tables if len(table) > 1 and any(len(row) > 1 for row in table)
-                ]
+            try:
+                table_page = _first_table_page(get_plumber, pdf_path, table_hints)
+            finally:
+                if 'pdf' in plumber:
+                    plumber['pdf'].close()
+            detected_tables = 0 if table_page is None else 1
+            checked = sum(1 for hint in table_hints if hint == 'ambiguous')
+            logger.info(f"Pré-filtro de tabelas em {pdf_path}: {table_hints} ({checked} página(s) no pdfplumber).")
+        elif context is not None:
+            detected_tables = _count_tables(context.plumber, pdf_path, pages_to_sample)
+        else:
+            with pdfplumber.open(pdf_path) as pdf:
+                detected_tables = _count_tables(pdf, pdf_path, pages_to_sample)
 
-                if filtered_tables:
-                    detected_tables += len(filtered_tables)
-                    logger.info(f"Tabelas detectadas na página {i+1} do arquivo {pdf_path}.")
+        end_time = time.time()
 
-            end_time = time.time()
-            
-            if detected_tables > 0:
-                logger.info(f"Tabelas confirmadas em {pdf_path}. Total: {detected_tables} tabelas. Tempo: {end_time - start_time:.2f}s")
-                return True
-            else:
-                logger.warning(f"Nenhuma tabela encontrada em {pdf_path}. Tempo: {end_time - start_time:.2f}s")
-                return False
+        if detected_tables > 0:
+            logger.info(f"Tabelas confirmadas em {pdf_path}. Total: {detected_tables} tabelas. Tempo: {end_time - start_time:.2f}s")
+            return True
+        else:
+            logger.warning(f"Nenhuma tabela encontrada em {pdf_path}. Tempo: {end_time - start_time:.2f}s")
+            return False
 
     except Exception as e:
         logger.error(f"Erro ao detectar tabelas em {pdf_path}: {str(e)}")
         return False
+
+
+def _prefilter_pages(pdf_path: str, pages_to_sample: int, context=None) -> Optional[List[TableHint]]:
+    """Sinais do pré-filtro das primeiras páginas, ou None se o PDF não puder ser lido pelo PyMuPDF."""
+    try:
+        if context is not None:
+            return [table_prefilter(context.page(i)) for i in range(min(pages_to_sample, context.page_count))]
+        with fitz.open(pdf_path) as doc:
+            return [table_prefilter(doc[i]) for i in range(min(pages_to_sample, len(doc)))]
+    except Exception as e:
+        logger.info(f"Pré-filtro de tabelas indisponível para {pdf_path} ({e}); usando o pdfplumber.")
+        return None
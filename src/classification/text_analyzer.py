@@ -1,7 +1,15 @@
 import PyPDF2
 
-def has_selectable_text(pdf_path: str, threshold: float = 0.7) -> bool:
+def has_selectable_text(pdf_path: str, threshold: float = 0.7, context=None) -> bool:
     """Verifica se o PDF contém texto selecionável"""
+    if context is not None:
+        # Reaproveita o documento já aberto no contexto compartilhado
+        sample = range(min(3, context.page_count))
+        if not sample:
+            return False
+        text_pages = sum(1 for i in sample if context.page_text(i).strip())
+        return (text_pages / len(sample)) >= threshold
+
     with open(pdf_path, 'rb') as file:
         reader = PyPDF2.PdfReader(file)
         text_pages = 0
@@ -1,18 +1,23 @@
 # src/extraction/mixed_extractor.py
 
-import os
 import re
 from pathlib import Path
 
-import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
-
-from src.classification.image_analyzer import preprocess_image
+from src.classification.image_analyzer import PREPROCESS_VERSION, preprocess_image
+from src.extraction.ocr_engine import get_ocr_backend
+from src.utils.document_context import PDFDocumentContext
+from src.utils.file_utils import discard_page_map, write_text_atomic
 from src.utils.logger import setup_logger
+from src.utils.memory import RasterMemoryTracker
+from src.utils.metrics import incr, span
+from src.utils.ocr_cache import cached_ocr, image_hash
+from src.utils.page_fingerprints import match_known_pages
 
 logger = setup_logger(__name__)
 
+# Versão dos registros do extrator misto no registro de impressões digitais (só o texto)
+FINGERPRINT_VERSION = f"mixed-{PREPROCESS_VERSION}"
+
 def sanitize_filename(filename: str) -> str:
     """
     Sanitiza o nome do arquivo removendo espaços e caracteres especiais.
@@ -21,79 +26,190 @@ def sanitize_filename(filename: str) -> str:
     sanitized = re.sub(r'[^\w\-]', '', sanitized)
     return sanitized
 
+def _extract_pages_mixed(
+    context: PDFDocumentContext,
+    pdf_path: str,
+    text_threshold: int,
+    ocr_language: str,
+    dpi: int,
+    page_indexes=None,
+    ocr_cache=None,
+    ocr_backend=None,
+    page_store=None
+) -> list:
+    """
+    Aplica a decisão texto direto/OCR em cada página do contexto e retorna os textos em ordem.
+    `page_indexes` (0-based) restringe o processamento a um intervalo de páginas.
+    Com `page_store`, páginas que iriam para o OCR e têm impressão digital conhecida
+    reutilizam o texto guardado (as de texto direto não recebem impressão digital).
+    """
+    pages_text = []
+    memory = RasterMemoryTracker()
+    ocr_backend = ocr_backend or get_ocr_backend()
+    if page_indexes is None:
+        page_indexes = range(context.page_count)
+    ocr_indexes = [index for index in page_indexes if len(context.page_text(index).strip()) < text_threshold]
+    fingerprints, known = match_known_pages(context, ocr_indexes, page_store, FINGERPRINT_VERSION)
+
+    for page_index in page_indexes:
+        if page_index in known:
+            pages_text.append(known[page_index]['text'])
+            continue
+
+        # Extração direta com PyMuPDF (texto em cache no contexto)
+        page_text = context.page_text(page_index).strip()
+
+        if len(page_text) < text_threshold:
+            # Se o texto extraído for insuficiente, renderiza a página em cinza (vista sobre o pixmap)
+            with span('rasterize', page=page_index + 1):
+                image = context.page_gray(page_index, dpi=dpi)
+            page_digest = image_hash(image) if ocr_cache is not None else None
+            memory.hold(image)
+
+            # Configuração para OCR
+            custom_config = r'--oem 3 --psm 6 -l ' + ocr_language
+
+            def _ocr():
+                # Aplica o pré-processamento da imagem
+                with span('preprocess', page=page_index + 1):
+                    processed_image = preprocess_image(image)
+                memory.hold(processed_image)
+                incr('ocr_calls')
+                try:
+                    with span('ocr', page=page_index + 1):
+                        return ocr_backend.image_to_string(processed_image, config=custom_config)
+                finally:
+                    memory.release(processed_image)
+
+            ocr_text = cached_ocr(
+                ocr_cache, page_digest, custom_config, _ocr, dpi=dpi, preprocess_version=PREPROCESS_VERSION,
+                backend=ocr_backend.name
+            ).strip()
+
+            logger.debug(
+                f"OCR aplicado na página {page_index + 1} de {pdf_path}. "
+                f"Texto extraído: {len(ocr_text)} caracteres."
+            )
+            page_text = ocr_text
+            incr('ocr_pages')
+            memory.release(image)
+            del image
+        else:
+            logger.debug(
+                f"Extração direta aplicada na página {page_index + 1} de {pdf_path}. "
+                f"Texto extraído: {len(page_text)} caracteres."
+            )
+
+        pages_text.append(page_text)
+
+    if page_store is not None:
+        page_store.remember(Path(pdf_path).name, (
+            (page_index, fingerprints[page_index], {'text': pages_text[position]})
+            for position, page_index in enumerate(page_indexes)
+            if page_index in fingerprints and page_index not in known
+        ), FINGERPRINT_VERSION)
+
+    if memory.peak_bytes:
+        logger.info(f"Extração mista de {pdf_path} concluída ({memory.summary()}).")
+    return pages_text
+
+def extract_pages_mixed(
+    pdf_path: str,
+    first_page: int,
+    last_page: int,
+    text_threshold: int = 15,
+    ocr_language: str = 'por+eng',
+    dpi: int = 300,
+    ocr_cache=None,
+    ocr_backend=None,
+    page_store=None,
+    context: PDFDocumentContext = None
+) -> list:
+    """
+    Extrai o texto de um intervalo de páginas (1-based, inclusivo) de um PDF misto.
+    Tarefa independente usada pelo agendador por páginas (`page_scheduler`); sem
+    `context`, abre (e fecha) o próprio.
+    """
+    if context is None:
+        with PDFDocumentContext(pdf_path, max_cached_pixmaps=0) as context:
+            return extract_pages_mixed(
+                pdf_path, first_page, last_page, text_threshold, ocr_language, dpi,
+                ocr_cache=ocr_cache, ocr_backend=ocr_backend, page_store=page_store, context=context
+            )
+    last_page = min(last_page, context.page_count)
+    page_indexes = range(first_page - 1, last_page)
+    return _extract_pages_mixed(
+        context, pdf_path, text_threshold, ocr_language, dpi, page_indexes,
+        ocr_cache=ocr_cache, ocr_backend=ocr_backend, page_store=page_store
+    )
+
+def save_mixed_text(pdf_path: str, output_dir: str, pages_text: list) -> str:
+    """Combina os textos das páginas e salva o .txt com nome sanitizado. Retorna None se não houver texto."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sanitized_filename = f"{sanitize_filename(Path(pdf_path).stem)}.txt"
+    output_path = output_dir / sanitized_filename
+
+    combined_text = "\n".join(pages_text).strip()
+
+    if not combined_text:
+        logger.warning(f"⚠️ Nenhum texto extraído de {pdf_path}.")
+        return None
+
+    write_text_atomic(output_path, combined_text, errors='replace')
+    discard_page_map(output_path)
+    logger.info(f"📂 Texto extraído salvo em {output_path}")
+    return str(output_path)
+
 def extract_text_mixed(
     pdf_path: str,
     output_dir: str,
     text_threshold: int = 15,
     ocr_language: str = 'por+eng',
-    dpi: int = 300
+    dpi: int = 300,
+    context: PDFDocumentContext = None,
+    ocr_cache=None,
+    ocr_backend=None,
+    page_store=None
 ) -> str:
     """
     Extrai texto de um PDF misto.
-    
+
     Para cada página:
       - Tenta extrair o texto diretamente com PyMuPDF.
       - Se o texto extraído for menor que `text_threshold`, converte a página para imagem,
         aplica pré-processamento e executa OCR.
-      
+
     Os textos de todas as páginas são combinados e salvos em um arquivo .txt.
-    
+
     :param pdf_path: Caminho para o arquivo PDF.
     :param output_dir: Diretório onde o arquivo .txt será salvo.
     :param text_threshold: Limiar mínimo de caracteres para considerar a extração direta suficiente.
     :param ocr_language: Idiomas a serem utilizados pelo Tesseract (ex.: 'por+eng').
     :param dpi: Resolução para conversão da página em imagem.
+    :param context: PDFDocumentContext opcional; reaproveita o PDF já aberto na classificação.
+    :param ocr_cache: OCRCache opcional; páginas já reconhecidas não passam de novo pelo OCR.
+    :param ocr_backend: Motor de OCR (padrão: o motor persistente do processo, ver `ocr_engine`).
+    :param page_store: PageFingerprintStore opcional; páginas já vistas em outra edição do
+                       catálogo reutilizam o texto guardado em vez de passar pela extração/OCR.
     :return: Caminho para o arquivo .txt com o texto extraído ou None em caso de falha.
     """
     try:
-        output_dir = Path(output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        sanitized_filename = f"{sanitize_filename(Path(pdf_path).stem)}.txt"
-        output_path = output_dir / sanitized_filename
-
-        # Abre o PDF usando PyMuPDF
-        doc = fitz.open(pdf_path)
-        full_text = []
-
-        for page in doc:
-            # Extração direta com PyMuPDF
-            page_text = page.get_text("text").strip()
-            
-            if len(page_text) < text_threshold:
-                # Se o texto extraído for insuficiente, converte a página para imagem
-                pix = page.get_pixmap(dpi=dpi)
-                image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                
-                # Aplica o pré-processamento da imagem
-                processed_image = preprocess_image(image)
-                
-                # Configuração para OCR
-                custom_config = r'--oem 3 --psm 6 -l ' + ocr_language
-                ocr_text = pytesseract.image_to_string(processed_image, config=custom_config).strip()
-                
-                logger.info(
-                    f"OCR aplicado na página {page.number + 1} de {pdf_path}. "
-                    f"Texto extraído: {len(ocr_text)} caracteres."
-                )
-                page_text = ocr_text
-            else:
-                logger.info(
-                    f"Extração direta aplicada na página {page.number + 1} de {pdf_path}. "
-                    f"Texto extraído: {len(page_text)} caracteres."
-                )
-            
-            full_text.append(page_text)
-        
-        combined_text = "\n".join(full_text).strip()
-        
-        if not combined_text:
-            logger.warning(f"⚠️ Nenhum texto extraído de {pdf_path}.")
-            return None
-        
-        with open(output_path, 'w', encoding='utf-8', errors='replace') as f:
-            f.write(combined_text)
-        logger.info(f"📂 Texto extraído salvo em {output_path}")
-        return str(output_path)
+        # Reaproveita o documento do contexto ou abre o PDF usando PyMuPDF
+        owns_context = context is None
+        if owns_context:
+            context = PDFDocumentContext(pdf_path, max_cached_pixmaps=0)
+
+        try:
+            full_text = _extract_pages_mixed(
+                context, pdf_path, text_threshold, ocr_language, dpi,
+                ocr_cache=ocr_cache, ocr_backend=ocr_backend, page_store=page_store
+            )
+        finally:
+            if owns_context:
+                context.close()
+
+        return save_mixed_text(pdf_path, output_dir, full_text)
     except Exception as e:
         logger.error(f"Erro ao extrair texto misto de {pdf_path}: {e}")
         return None
@@ -0,0 +1,200 @@
+import os
+import re
+import shlex
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_BACKEND = "auto"
+
+# Instâncias por processo: o motor fica carregado durante toda a vida do worker
+_backends: Dict[str, "OCRBackend"] = {}
+
+
+def parse_tesseract_config(config: str) -> Tuple[str, int, int, str]:
+    """
+    Separa idioma, psm e oem de uma string de configuração do Tesseract
+    (ex.: "--oem 3 --psm 6 -l por+eng"). Retorna também as opções restantes.
+    """
+    lang = re.search(r"-l\s+(\S+)", config)
+    psm = re.search(r"--psm\s+(\d+)", config)
+    oem = re.search(r"--oem\s+(\d+)", config)
+    rest = re.sub(r"(-l|--psm|--oem)\s+\S+", "", config).strip()
+    return (
+        lang.group(1) if lang else "eng",
+        int(psm.group(1)) if psm else 3,
+        int(oem.group(1)) if oem else 3,
+        rest,
+    )
+
+
+def tesseract_variables(options: str) -> Tuple[Tuple[Tuple[str, str], ...], Tuple[str, ...]]:
+    """
+    Converte as opções restantes de `parse_tesseract_config` em variáveis do Tesseract:
+    `-c nome=valor` e `--dpi N` (variável `user_defined_dpi`). Retorna as variáveis e as
+    opções que não têm equivalente na API.
+    """
+    variables = []
+    unsupported = []
+    tokens = shlex.split(options)
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ("-c", "--dpi") and i + 1 < len(tokens):
+            value = tokens[i + 1]
+            i += 2
+        elif token.startswith("-c") and "=" in token:
+            token, value = "-c", token[2:]
+            i += 1
+        else:
+            # Opção sem suporte, com o valor que vier em seguida (ex.: "--user-words arquivo")
+            i += 1
+            if token.startswith("-") and i < len(tokens) and not tokens[i].startswith("-"):
+                token = f"{token} {tokens[i]}"
+                i += 1
+            unsupported.append(token)
+            continue
+        if token == "--dpi":
+            variables.append(("user_defined_dpi", value))
+        elif "=" in value:
+            variables.append(tuple(value.split("=", 1)))
+        else:
+            unsupported.append(f"-c {value}")
+    return tuple(variables), tuple(unsupported)
+
+
+def _to_pil(image) -> Image.Image:
+    """Converte array NumPy (como o pytesseract faz) ou retorna a imagem PIL."""
+    if isinstance(image, np.ndarray):
+        return Image.fromarray(image)
+    return image
+
+
+class OCRBackend:
+    """Interface dos motores de OCR: `image_to_string(imagem, config)` e `close()`."""
+
+    name = "base"
+
+    def image_to_string(self, image, config: str) -> str:
+        raise NotImplementedError
+
+    def warm_up(self, config: str) -> None:
+        """Carrega antecipadamente o que for necessário para `config` (ex.: idiomas)."""
+
+    def close(self) -> None:
+        pass
+
+
+class SubprocessBackend(OCRBackend):
+    """
+    Motor padrão: `pytesseract.image_to_string`, que grava a imagem num arquivo
+    temporário e executa um processo `tesseract` por chamada.
+    """
+
+    name = "subprocess"
+
+    def image_to_string(self, image, config: str) -> str:
+        return pytesseract.image_to_string(image, config=config)
+
+
+class TesserocrBackend(OCRBackend):
+    """
+    Motor persistente via API C do Tesseract (`tesserocr`). Um `PyTessBaseAPI` por
+    combinação de idioma/psm/oem é criado na primeira chamada e reaproveitado: os
+    traineddata são carregados uma vez por worker e as imagens são passadas em memória.
+
+    As demais opções da configuração (`-c nome=valor`, `--dpi`) viram `SetVariable` e
+    fazem parte da chave do motor, para que variáveis de uma configuração não vazem para
+    outra. Opções sem equivalente na API são ignoradas com um aviso.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self):
+        # Importado aqui (e não no topo) para que o OpenMP do Tesseract seja inicializado
+        # no worker, depois de OMP_THREAD_LIMIT ter sido definido
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._apis = {}
+        self._warned = set()
+        self._tessdata = self._find_tessdata()
+
+    @staticmethod
+    def _find_tessdata() -> Optional[str]:
+        if os.getenv("TESSDATA_PREFIX"):
+            return os.getenv("TESSDATA_PREFIX")
+        # Instalação configurada por configure_tesseract (ex.: Windows): tessdata ao lado do executável
+        candidate = Path(pytesseract.pytesseract.tesseract_cmd).parent / "tessdata"
+        return str(candidate) if candidate.is_dir() else None
+
+    def _api(self, config: str):
+        lang, psm, oem, rest = parse_tesseract_config(config)
+        variables, unsupported = tesseract_variables(rest)
+        for option in unsupported:
+            if option not in self._warned:
+                self._warned.add(option)
+                logger.warning(f"⚠️ Opção do Tesseract sem suporte no tesserocr, ignorada: {option}")
+
+        key = (lang, psm, oem, variables)
+        if key not in self._apis:
+            kwargs = {"lang": lang, "psm": psm, "oem": oem}
+            if self._tessdata:
+                kwargs["path"] = self._tessdata
+            api = self._tesserocr.PyTessBaseAPI(**kwargs)
+            for name, value in variables:
+                if not api.SetVariable(name, value):
+                    logger.warning(f"⚠️ Variável do Tesseract desconhecida, ignorada: {name}={value}")
+            self._apis[key] = api
+            logger.info(f"Motor Tesseract carregado no processo {os.getpid()} ({lang}, psm {psm}).")
+        return self._apis[key]
+
+    def warm_up(self, config: str) -> None:
+        self._api(config)
+
+    def image_to_string(self, image, config: str) -> str:
+        api = self._api(config)
+        if isinstance(image, np.ndarray) and image.ndim == 2 and image.dtype == np.uint8:
+            # Cinza de 8 bits: sem PIL nem codificação da imagem. SetImageBytes só aceita
+            # `bytes`, então os pixels são copiados uma vez (tobytes, em ordem C)
+            height, width = image.shape
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+        else:
+            api.SetImage(_to_pil(image))
+        return api.GetUTF8Text()
+
+    def close(self) -> None:
+        for api in self._apis.values():
+            api.End()
+        self._apis.clear()
+
+
+def get_ocr_backend(config: Dict = None) -> OCRBackend:
+    """
+    Retorna o motor de OCR do processo atual conforme `ocr_backend` do config:
+    'tesserocr', 'subprocess' ou 'auto' (tesserocr quando instalado, senão subprocess).
+    """
+    name = (config or {}).get("ocr_backend", DEFAULT_BACKEND)
+    if name in _backends:
+        return _backends[name]
+
+    backend = None
+    if name in ("auto", "tesserocr"):
+        try:
+            backend = TesserocrBackend()
+        except ImportError:
+            if name == "tesserocr":
+                logger.warning("⚠️ tesserocr não está instalado; usando o Tesseract por subprocesso.")
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao iniciar o tesserocr ({e}); usando o Tesseract por subprocesso.")
+    if backend is None:
+        backend = SubprocessBackend()
+
+    _backends[name] = backend
+    return backend
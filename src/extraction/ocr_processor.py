@@ -5,7 +5,14 @@ from pdf2image import convert_from_path
 import cv2
 import numpy as np
 from dotenv import load_dotenv
+from src.classification.image_analyzer import DEFAULT_PREPROCESS_OPTIONS, estimate_noise
+from src.utils.file_utils import discard_page_map, write_text_atomic
 from src.utils.logger import setup_logger
+from src.utils.memory import RasterMemoryTracker
+from src.utils.metrics import incr, span
+from src.utils.ocr_cache import image_hash
+from src.extraction.ocr_engine import get_ocr_backend
+from src.extraction.text_extractor import MIN_PAGE_QUALITY, score_page_text
 
 # Carrega variáveis de ambiente do .env (se existir)
 load_dotenv()
@@ -16,9 +23,24 @@ log_path = Path("data/output/processing.log")
 # Configura o logger
 logger = setup_logger(__name__, log_file=log_path)
 
+
+def ocr_config_for(language: str) -> str:
+    """Opções do Tesseract usadas pelo OCR de páginas para os idiomas informados (ex.: 'por+eng')."""
+    return f"--psm 6 -l {language}"
+
+
 # Configurações padrão do OCR
-OCR_CONFIG = "--psm 6 -l por+eng"
+OCR_CONFIG = ocr_config_for("por+eng")
 MIN_TEXT_LENGTH = 10
+# Páginas rasterizadas por chamada ao Poppler (limita a memória de imagens por worker)
+RASTER_WINDOW = 4
+# Versão do pré-processamento; faz parte da chave do cache de OCR
+PREPROCESS_VERSION = "3"
+# Limiares do estimador de qualidade (página limpa dispensa redução de ruído), medidos na
+# cópia reduzida da página: ruído 4 nessa escala corresponde a ~6 na resolução original
+MAX_CLEAN_NOISE_SIGMA = 4.0
+MIN_CLEAN_CONTRAST = 80.0
+QUALITY_PROBE_WIDTH = DEFAULT_PREPROCESS_OPTIONS['analysis_width']
 
 
 def configure_tesseract():
@@ -60,16 +82,35 @@ def configure_tesseract():
 configure_tesseract()
 
 
+def estimate_image_quality(gray: np.ndarray) -> dict:
+    """
+    Estima ruído e contraste da página sem executar OCR.
+
+    Ruído (`image_analyzer.estimate_noise`) e contraste (diferença entre os percentis 99
+    e 1) são calculados na mesma cópia reduzida da página, sem buffers na resolução original.
+    """
+    w = gray.shape[1]
+    scale = min(1.0, QUALITY_PROBE_WIDTH / max(1, w))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+    low, high = np.percentile(small, (1, 99))
+    return {'noise_sigma': estimate_noise(small), 'contrast': float(high - low)}
+
+
 def preprocess_image(image):
-    """Melhora a imagem para OCR."""
+    """
+    Melhora a imagem para OCR.
+
+    A decisão entre usar a página em escala de cinza ou aplicar redução de ruído e
+    limiarização é feita por `estimate_image_quality`, sem uma passada extra do Tesseract.
+    """
     try:
-        # Converte a imagem para escala de cinza
-        gray = cv2.cvtColor(np.array(image), cv2.COLOR_BGR2GRAY)
+        # Converte a imagem para escala de cinza (arrays em cinza são usados sem cópia)
+        image_np = np.asarray(image)
+        gray = image_np if image_np.ndim == 2 else cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
 
-        # Testa OCR com a imagem em escala de cinza antes de pré-processar
-        raw_text = pytesseract.image_to_string(gray, config=OCR_CONFIG)
-        if len(raw_text.strip()) > 20:
-            return gray  # Se já funcionar bem, não é necessário mais processamento
+        quality = estimate_image_quality(gray)
+        if quality['noise_sigma'] <= MAX_CLEAN_NOISE_SIGMA and quality['contrast'] >= MIN_CLEAN_CONTRAST:
+            return gray  # Página limpa: não é necessário mais processamento
 
         # Caso contrário, aplica melhoria na imagem
         denoised = cv2.fastNlMeansDenoising(gray, h=15)  # Redução de ruído mais suave
@@ -82,58 +123,174 @@ def preprocess_image(image):
         return image
 
 
-def extract_text_from_images(pdf_path: str, output_dir: str) -> str:
-    """Extrai texto de PDFs com imagens usando OCR."""
-    try:
-        # Garante que a pasta de saída existe
-        output_dir_path = Path(output_dir)
-        output_dir_path.mkdir(parents=True, exist_ok=True)
+def iter_page_images(
+    pdf_path: str,
+    dpi: int = 300,
+    context=None,
+    first_page: int = None,
+    last_page: int = None,
+    window: int = RASTER_WINDOW
+):
+    """
+    Gera (número_da_página, imagem) renderizando poucas páginas por vez, em vez de
+    materializar o documento inteiro em memória. `first_page`/`last_page` são 1-based
+    e inclusivos, como no pdf2image.
 
-        # Cria o diretório para imagens de debug (uma única vez)
-        debug_dir = output_dir_path / "debug_images"
-        debug_dir.mkdir(exist_ok=True)
+    Com um PDFDocumentContext, cada página é renderizada individualmente pelo PyMuPDF,
+    direto em escala de cinza (o único canal usado pelo pré-processamento), e entregue
+    como array sobre o buffer do pixmap, sem cópia (ver `render_gray`). Sem contexto,
+    usa o Poppler em janelas de `window` páginas (`first_page`/`last_page` do pdf2image).
+    """
+    page_number = first_page or 1
 
-        # Converte o PDF para imagens com DPI configurado
-        images = convert_from_path(pdf_path, dpi=300)
-        if not images:
-            logger.error(f"Falha na conversão de {pdf_path} para imagens. Verifique o Poppler.")
-            return ""
+    if context is not None:
+        end = min(last_page or context.page_count, context.page_count)
+        for page_index in range(page_number - 1, end):
+            with span('rasterize', page=page_index + 1):
+                image = context.page_gray(page_index, dpi=dpi)
+            yield page_index + 1, image
+        return
 
-        extracted_texts = []
+    window = max(1, window)
+    while last_page is None or page_number <= last_page:
+        window_end = page_number + window - 1
+        if last_page is not None:
+            window_end = min(window_end, last_page)
+        with span('rasterize'):
+            images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=window_end)
+        for offset, image in enumerate(images):
+            yield page_number + offset, image
+        # Uma janela incompleta indica o fim do documento
+        if len(images) < window_end - page_number + 1:
+            return
+        page_number = window_end + 1
+        del images
 
-        for i, img in enumerate(images):
-            processed_img = preprocess_image(img)
-            text = pytesseract.image_to_string(processed_img, config=OCR_CONFIG).strip()
 
-            if len(text) < MIN_TEXT_LENGTH:
-                logger.warning(
-                    f"OCR extraiu pouco texto na página {i+1} de {pdf_path}. Pode haver problemas na imagem."
-                )
+def ocr_pages(
+    pdf_path: str,
+    first_page: int = None,
+    last_page: int = None,
+    dpi: int = 300,
+    context=None,
+    debug_writer=None,
+    window: int = RASTER_WINDOW,
+    ocr_cache=None,
+    ocr_backend=None,
+    ocr_config: str = OCR_CONFIG
+) -> list:
+    """
+    Aplica OCR num intervalo de páginas (1-based, inclusivo) e retorna os textos em ordem.
+    Sem intervalo, processa o documento inteiro.
 
-            extracted_texts.append(text)
+    As páginas são renderizadas, pré-processadas, reconhecidas e descartadas uma janela
+    por vez (ver `iter_page_images`); o pico de memória é registrado no log ao final.
+    Com `ocr_cache`, páginas cujo raster já foi reconhecido não passam de novo pelo OCR.
+    `ocr_backend` escolhe o motor de OCR (padrão: o motor persistente do processo) e
+    `ocr_config` as opções do Tesseract (idiomas; ver `ocr_config_for`), que também
+    entram na chave do cache. Com `debug_writer` (ver `src.utils.debug_images`), uma amostra das páginas
+    pré-processadas é gravada em segundo plano.
 
-            # Salva a imagem processada para fins de debug
-            debug_image_path = debug_dir / f"page_{i+1}_processed.jpg"
-            cv2.imwrite(str(debug_image_path), processed_img)
+    Usado tanto pela extração do arquivo completo quanto pelas tarefas por intervalo de
+    páginas do agendador (`page_scheduler`).
+    """
+    extracted_texts = []
+    memory = RasterMemoryTracker()
+    ocr_backend = ocr_backend or get_ocr_backend()
 
-        full_text = "\n".join(extracted_texts).strip()
-        if not full_text:
-            logger.error(f"Nenhum texto extraído de {pdf_path}. O PDF pode estar corrompido ou ilegível.")
-            return ""
+    for page_number, img in iter_page_images(pdf_path, dpi, context, first_page, last_page, window):
+        memory.hold(img)
+        page_digest = image_hash(img) if ocr_cache is not None else None
+        cached_text = (
+            ocr_cache.get(page_digest, ocr_config, dpi, PREPROCESS_VERSION, ocr_backend.name) if ocr_cache else None
+        )
+
+        if cached_text is not None:
+            processed_img = None
+            text = cached_text.strip()
+        else:
+            with span('preprocess', page=page_number):
+                processed_img = preprocess_image(img)
+            memory.hold(processed_img)
+            with span('ocr', page=page_number):
+                text = ocr_backend.image_to_string(processed_img, config=ocr_config).strip()
+            incr('ocr_calls')
+            if ocr_cache is not None:
+                ocr_cache.put(page_digest, ocr_config, text, dpi, PREPROCESS_VERSION, ocr_backend.name)
+
+        low_confidence = len(text) < MIN_TEXT_LENGTH
+        if low_confidence:
+            logger.warning(
+                f"OCR extraiu pouco texto na página {page_number} de {pdf_path}. Pode haver problemas na imagem."
+            )
 
-        # Salva o texto extraído em um arquivo .txt
-        output_path = output_dir_path / f"{Path(pdf_path).stem}.txt"
-        logger.info(f"Salvando texto extraído em {output_path}...")
-        try:
-            print(f"Salvando arquivo em: {output_path}")
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(full_text)
-            logger.info(f"✅ Texto extraído salvo: {output_path}")
-        except PermissionError:
-            logger.error(f"❌ Permissão negada ao tentar salvar {output_path}")
+        extracted_texts.append(text)
+        incr('ocr_pages')
+
+        # Amostra da imagem processada para depuração (gravada fora deste laço)
+        if debug_writer is not None and processed_img is not None:
+            low_confidence = low_confidence or score_page_text(text) < MIN_PAGE_QUALITY
+            debug_writer.submit(pdf_path, page_number, processed_img, low_confidence)
+
+        memory.release(img)
+        if processed_img is not None:
+            memory.release(processed_img)
+        del img, processed_img
+
+    if not extracted_texts:
+        logger.error(f"Falha na conversão de {pdf_path} para imagens. Verifique o Poppler.")
+        return []
+
+    logger.info(f"OCR de {len(extracted_texts)} páginas de {pdf_path} concluído ({memory.summary()}).")
+    return extracted_texts
+
+
+def save_ocr_text(pdf_path: str, output_dir: str, extracted_texts: list) -> str:
+    """Combina os textos das páginas e salva o .txt. Retorna "" se não houver texto ou se a escrita falhar."""
+    output_dir_path = Path(output_dir)
+    full_text = "\n".join(extracted_texts).strip()
+    if not full_text:
+        logger.error(f"Nenhum texto extraído de {pdf_path}. O PDF pode estar corrompido ou ilegível.")
+        return ""
+
+    # Salva o texto extraído em um arquivo .txt
+    output_path = output_dir_path / f"{Path(pdf_path).stem}.txt"
+    logger.info(f"Salvando texto extraído em {output_path}...")
+    try:
+        logger.debug(f"Salvando arquivo em: {output_path}")
+        write_text_atomic(output_path, full_text)
+        discard_page_map(output_path)
+        logger.info(f"✅ Texto extraído salvo: {output_path}")
+    except PermissionError:
+        logger.error(f"❌ Permissão negada ao tentar salvar {output_path}")
+        return ""
+
+    return str(output_path)
+
+
+def extract_text_from_images(
+    pdf_path: str, output_dir: str, context=None, ocr_cache=None, ocr_backend=None, debug_writer=None
+) -> str:
+    """
+    Extrai texto de PDFs com imagens usando OCR.
+
+    Se um PDFDocumentContext for informado, as páginas são renderizadas a partir do
+    documento já aberto em vez de reconvertidas pelo Poppler. Imagens de depuração só
+    são gravadas com um `debug_writer` (config `enable_debug`).
+    """
+    try:
+        # Garante que a pasta de saída existe
+        output_dir_path = Path(output_dir)
+        output_dir_path.mkdir(parents=True, exist_ok=True)
+
+        # Converte o PDF para imagens com DPI configurado e aplica OCR
+        extracted_texts = ocr_pages(
+            pdf_path, dpi=300, context=context, debug_writer=debug_writer, ocr_cache=ocr_cache, ocr_backend=ocr_backend
+        )
+        if not extracted_texts:
             return ""
 
-        return str(output_path)
+        return save_ocr_text(pdf_path, output_dir, extracted_texts)
 
     except Exception as e:
         logger.error(f"Erro no OCR: {str(e)}")
@@ -0,0 +1,260 @@
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Literal, Optional
+
+import fitz  # PyMuPDF
+
+from src.classification.structure_analyzer import NO_IMAGE_COVERAGE, page_image_coverage
+from src.extraction.ocr_processor import PREPROCESS_VERSION, ocr_config_for, ocr_pages
+from src.extraction.text_extractor import extract_pages_text, sanitize_filename
+from src.utils.document_context import PDFDocumentContext
+from src.utils.file_utils import write_text_atomic
+from src.utils.logger import setup_logger
+from src.utils.metrics import incr
+from src.utils.page_fingerprints import match_known_pages
+
+logger = setup_logger(__name__)
+
+PageRoute = Literal['text', 'ocr', 'blank']
+
+# Páginas sem texto nem imagens, mas com muitos traços vetoriais, costumam ter o texto
+# convertido em curvas (comum em catálogos exportados de ferramentas gráficas)
+MIN_VECTOR_TEXT_PATHS = 50
+# Versão dos registros do roteador no registro de impressões digitais. Separada da do
+# extrator misto, que guarda só o texto e usa outro pré-processamento.
+FINGERPRINT_VERSION = f"router-{PREPROCESS_VERSION}"
+
+
+def route_page(page: fitz.Page, page_text: str, text_threshold: int = 15) -> Dict:
+    """
+    Decide como extrair uma página a partir de sinais baratos, sem renderizar:
+
+    - 'text': a camada de texto tem pelo menos `text_threshold` caracteres;
+    - 'ocr': texto insuficiente e imagens relevantes (página digitalizada) ou texto em curvas;
+    - 'blank': sem texto útil e sem nada que o OCR possa reconhecer.
+
+    A cobertura de imagens só é calculada quando a camada de texto não basta.
+    """
+    text_chars = len(page_text.strip())
+    decision = {'route': 'text', 'text_chars': text_chars}
+    if text_chars >= text_threshold:
+        return decision
+
+    coverage = page_image_coverage(page)
+    decision['image_coverage'] = round(coverage, 3)
+    if coverage >= NO_IMAGE_COVERAGE:
+        decision['route'] = 'ocr'
+    elif text_chars == 0 and len(page.get_drawings()) >= MIN_VECTOR_TEXT_PATHS:
+        decision['route'] = 'ocr'
+    elif text_chars == 0:
+        decision['route'] = 'blank'
+    return decision
+
+
+def _ocr_runs(page_numbers: List[int]) -> List[tuple]:
+    """Agrupa páginas (1-based, em ordem) em intervalos contíguos (primeira, última)."""
+    runs = []
+    for page_number in page_numbers:
+        if runs and runs[-1][1] == page_number - 1:
+            runs[-1][1] = page_number
+        else:
+            runs.append([page_number, page_number])
+    return [tuple(run) for run in runs]
+
+
+def extract_pages_routed(
+    context: PDFDocumentContext,
+    pdf_path: str,
+    config: Dict,
+    page_indexes=None,
+    ocr_cache=None,
+    ocr_backend=None,
+    debug_writer=None,
+    page_store=None
+) -> List[Dict]:
+    """
+    Roteia cada página (ver `route_page`) e extrai o texto pelo caminho escolhido.
+    `page_indexes` (0-based) restringe o processamento a um intervalo de páginas.
+
+    Páginas 'text' usam a camada de texto (`extract_pages_text`, com troca de backend só
+    nas páginas de nota baixa); as páginas 'ocr' contíguas são reconhecidas juntas por
+    `ocr_pages` (mesmo pré-processamento, cache e motor da extração de PDFs
+    digitalizados). Assim o custo de OCR acompanha o número de páginas digitalizadas,
+    e não o total de páginas do documento.
+
+    Com `page_store` (ver `src.utils.page_fingerprints`), páginas roteadas para o OCR cuja
+    impressão digital já foi vista (ex.: páginas inalteradas de uma edição anterior do
+    catálogo) reutilizam o registro guardado, marcado com 'reused', e não passam pelo
+    OCR. Páginas de texto não recebem impressão digital: reler a camada de texto custa
+    menos que o raster de verificação.
+
+    :return: Um registro por página, em ordem: 'page' (1-based), 'route', 'text_chars',
+             'image_coverage' (quando calculada), 'text_backend'/'text_quality' (páginas
+             de texto) e 'text'.
+    """
+    text_threshold = config.get('min_text_length', 15)
+    if page_indexes is None:
+        page_indexes = range(context.page_count)
+
+    pages = []
+    for page_index in page_indexes:
+        record = {'page': page_index + 1}
+        record.update(route_page(context.page(page_index), context.page_text(page_index), text_threshold))
+        record['text'] = ''
+        pages.append(record)
+
+    ocr_indexes = [record['page'] - 1 for record in pages if record['route'] == 'ocr']
+    fingerprints, known = match_known_pages(context, ocr_indexes, page_store, FINGERPRINT_VERSION)
+    pages = [
+        dict(known[record['page'] - 1], page=record['page'], reused=True) if record['page'] - 1 in known else record
+        for record in pages
+    ]
+
+    by_number = {record['page']: record for record in pages}
+    # Camada de texto pela cadeia de backends: páginas com nota baixa tentam os seguintes
+    new_pages = [record for record in pages if not record.get('reused')]
+    text_indexes = [record['page'] - 1 for record in new_pages if record['route'] == 'text']
+    for extracted in extract_pages_text(pdf_path, context=context, page_indexes=text_indexes):
+        record = by_number[extracted['page']]
+        record.update(text=extracted['text'], text_backend=extracted['backend'], text_quality=extracted['quality'])
+
+    ocr_numbers = [record['page'] for record in new_pages if record['route'] == 'ocr']
+    ocr_config = ocr_config_for(config.get('ocr_language', 'por+eng'))
+    start_time = time.time()
+    for first_page, last_page in _ocr_runs(ocr_numbers):
+        texts = ocr_pages(
+            pdf_path, first_page=first_page, last_page=last_page, dpi=config.get('dpi', 300),
+            context=context, ocr_cache=ocr_cache, ocr_backend=ocr_backend, debug_writer=debug_writer,
+            ocr_config=ocr_config
+        )
+        for page_number, text in zip(range(first_page, last_page + 1), texts):
+            by_number[page_number]['text'] = text
+            by_number[page_number]['text_chars'] = len(text)
+
+    if page_store is not None:
+        page_store.remember(Path(pdf_path).name, (
+            (record['page'] - 1, fingerprints[record['page'] - 1],
+             {key: value for key, value in record.items() if key != 'page'})
+            for record in new_pages if record['page'] - 1 in fingerprints
+        ), FINGERPRINT_VERSION)
+
+    counts = routing_summary(pages)
+    for route, count in counts.items():
+        incr(f'pages_routed_{route}', count)
+    logger.info(
+        f"🧭 Roteamento por página de {pdf_path}: {counts['text']} texto, {counts['ocr']} OCR, "
+        f"{counts['blank']} em branco (OCR em {time.time() - start_time:.2f}s)."
+    )
+    return pages
+
+
+def routing_summary(pages: List[Dict]) -> Dict[str, int]:
+    """Quantidade de páginas por rota."""
+    counts = {'text': 0, 'ocr': 0, 'blank': 0}
+    for record in pages:
+        counts[record['route']] += 1
+    return counts
+
+
+def save_routed_text(pdf_path: str, output_dir: str, pages: List[Dict]) -> Optional[str]:
+    """
+    Salva o texto das páginas roteadas em `<nome>.txt` e as decisões por página em
+    `<nome>.pages.json` (rota, caracteres, cobertura de imagens e o intervalo
+    [char_start, char_end) de cada página no .txt). Retorna None se não houver texto.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"{sanitize_filename(Path(pdf_path).stem)}.txt"
+
+    if not any(record['text'] for record in pages):
+        logger.warning(f"⚠️ Nenhum texto extraído de {pdf_path}.")
+        return None
+
+    # Páginas unidas por "\n" sem strip global, para que os deslocamentos valham no arquivo
+    decisions = []
+    offset = 0
+    for record in pages:
+        decision = {key: value for key, value in record.items() if key != 'text'}
+        decision['char_start'] = offset
+        decision['char_end'] = offset + len(record['text'])
+        decisions.append(decision)
+        offset = decision['char_end'] + 1
+
+    metadata = {
+        'source': Path(pdf_path).name,
+        'page_count': len(pages),
+        'routes': routing_summary(pages),
+        'pages': decisions,
+    }
+    write_text_atomic(output_path, "\n".join(record['text'] for record in pages), errors='replace')
+    write_text_atomic(
+        output_path.with_suffix('.pages.json'), json.dumps(metadata, ensure_ascii=False, indent=2)
+    )
+    logger.info(f"📂 Texto extraído salvo em {output_path} (decisões por página em {output_path.stem}.pages.json)")
+    return str(output_path)
+
+
+def extract_pages_routed_range(
+    pdf_path: str,
+    first_page: int,
+    last_page: int,
+    config: Dict,
+    ocr_cache=None,
+    ocr_backend=None,
+    debug_writer=None,
+    page_store=None,
+    context: PDFDocumentContext = None
+) -> List[Dict]:
+    """
+    Roteia um intervalo de páginas (1-based, inclusivo) no `context` informado ou, sem
+    ele, abrindo (e fechando) o próprio. Tarefa independente usada pelo agendador por
+    páginas (`page_scheduler`).
+    """
+    if context is None:
+        with PDFDocumentContext(pdf_path, config, max_cached_pixmaps=0) as context:
+            return extract_pages_routed_range(
+                pdf_path, first_page, last_page, config, ocr_cache=ocr_cache, ocr_backend=ocr_backend,
+                debug_writer=debug_writer, page_store=page_store, context=context
+            )
+    last_page = min(last_page, context.page_count)
+    return extract_pages_routed(
+        context, pdf_path, config, range(first_page - 1, last_page),
+        ocr_cache=ocr_cache, ocr_backend=ocr_backend, debug_writer=debug_writer, page_store=page_store
+    )
+
+
+def extract_text_routed(
+    pdf_path: str,
+    output_dir: str,
+    config: Dict,
+    context: PDFDocumentContext = None,
+    ocr_cache=None,
+    ocr_backend=None,
+    debug_writer=None,
+    page_store=None
+) -> Optional[str]:
+    """
+    Extrai o texto do PDF decidindo página a página entre camada de texto e OCR,
+    independentemente da classificação do arquivo, e salva o .txt com as decisões.
+
+    :param context: PDFDocumentContext opcional; reaproveita o PDF já aberto na classificação.
+    :param page_store: PageFingerprintStore opcional; páginas já conhecidas reutilizam o texto guardado.
+    :return: Caminho do .txt ou None se não houver texto ou em caso de falha.
+    """
+    try:
+        owns_context = context is None
+        if owns_context:
+            context = PDFDocumentContext(pdf_path, config, max_cached_pixmaps=0)
+        try:
+            pages = extract_pages_routed(
+                context, pdf_path, config, ocr_cache=ocr_cache, ocr_backend=ocr_backend,
+                debug_writer=debug_writer, page_store=page_store
+            )
+        finally:
+            if owns_context:
+                context.close()
+        return save_routed_text(pdf_path, output_dir, pages)
+    except Exception as e:
+        logger.error(f"Erro ao extrair texto roteado de {pdf_path}: {e}")
+        return None
@@ -0,0 +1,295 @@
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.extraction.mixed_extractor import extract_pages_mixed
+from src.extraction.ocr_processor import ocr_pages
+from src.extraction.page_router import extract_pages_routed_range
+from src.utils.document_context import worker_context
+from src.utils.logger import setup_logger
+from src.utils.metrics import metrics
+from src.utils.debug_images import get_debug_writer
+from src.utils.ocr_cache import get_ocr_cache
+from src.utils.page_fingerprints import get_page_store
+from src.extraction.ocr_engine import get_ocr_backend
+
+logger = setup_logger(__name__)
+
+# Tipos cujo custo é dominado por OCR e que podem ser divididos em blocos de páginas
+SPLITTABLE_TYPES = ('image_only', 'mixed')
+# Com o roteamento por página, documentos classificados como texto também podem ter
+# centenas de páginas digitalizadas depois das primeiras e são divididos do mesmo jeito
+ROUTED_SPLITTABLE_TYPES = ('text_only', 'image_only', 'mixed')
+
+
+# Segundos por página de cada tipo enquanto o manifesto não tem histórico suficiente
+DEFAULT_SECONDS_PER_PAGE = {
+    'text_only': 0.01,
+    'tables': 0.2,
+    'mixed': 1.0,
+    'image_only': 2.0,
+}
+UNKNOWN_SECONDS_PER_PAGE = 0.5
+# Custo fixo de cada tarefa: serialização entre processos e abertura do PDF
+TASK_OVERHEAD_SECONDS = 0.05
+# Amostras de um tipo necessárias para substituir o valor padrão pela mediana medida
+MIN_HISTORY_SAMPLES = 3
+
+
+class CostModel:
+    """
+    Estima o custo de uma tarefa (em segundos) por número de páginas e tipo do PDF.
+
+    Os segundos por página de cada tipo começam em DEFAULT_SECONDS_PER_PAGE e são
+    substituídos pela mediana das execuções anteriores registradas no manifesto
+    (`from_history`), de modo que a ordem da fila acompanha o custo real da máquina.
+    """
+
+    def __init__(self, seconds_per_page: Optional[Dict[str, float]] = None):
+        self.seconds_per_page = dict(DEFAULT_SECONDS_PER_PAGE)
+        self.seconds_per_page.update(seconds_per_page or {})
+
+    @classmethod
+    def from_history(cls, samples: Iterable[Tuple[str, int, float]]) -> "CostModel":
+        """:param samples: Tuplas (tipo do PDF, páginas, segundos de extração)."""
+        per_type: Dict[str, List[float]] = {}
+        for pdf_type, pages, seconds in samples:
+            if pdf_type and pages and seconds is not None and seconds >= 0:
+                per_type.setdefault(pdf_type, []).append(seconds / pages)
+        learned = {
+            pdf_type: statistics.median(values)
+            for pdf_type, values in per_type.items() if len(values) >= MIN_HISTORY_SAMPLES
+        }
+        if learned:
+            logger.info(
+                "📈 Custo por página aprendido do histórico: "
+                + ", ".join(f"{pdf_type} {seconds:.3f}s" for pdf_type, seconds in sorted(learned.items()))
+            )
+        return cls(learned)
+
+    def page_cost(self, pdf_type: Optional[str]) -> float:
+        return self.seconds_per_page.get(pdf_type, UNKNOWN_SECONDS_PER_PAGE)
+
+    def estimate(self, pdf_type: Optional[str], pages: int) -> float:
+        return TASK_OVERHEAD_SECONDS + max(pages, 1) * self.page_cost(pdf_type)
+
+
+@dataclass
+class PageTask:
+    """
+    Unidade de trabalho do pool de processos.
+
+    Sem intervalo (`first_page` None) representa o arquivo inteiro; com intervalo,
+    um bloco de páginas (1-based, inclusivo) de um documento grande. Com `batch_paths`,
+    um lote de arquivos pequenos do mesmo tipo processados em sequência por um worker.
+    """
+    pdf_path: str
+    pdf_type: Optional[str]
+    page_count: int
+    first_page: Optional[int] = None
+    last_page: Optional[int] = None
+    chunk_index: int = 0
+    total_chunks: int = 1
+    batch_paths: Tuple[str, ...] = ()
+    estimated_seconds: Optional[float] = None
+
+    @property
+    def is_chunk(self) -> bool:
+        return self.first_page is not None
+
+    @property
+    def is_batch(self) -> bool:
+        return bool(self.batch_paths)
+
+    @property
+    def pages(self) -> int:
+        if self.is_chunk:
+            return self.last_page - self.first_page + 1
+        return max(self.page_count, 1)
+
+    @property
+    def cost(self) -> float:
+        """Custo estimado (usado para ordenar a fila, maior primeiro); em páginas sem modelo de custo."""
+        if self.estimated_seconds is not None:
+            return self.estimated_seconds
+        return self.pages
+
+
+def split_page_ranges(page_count: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Divide `page_count` páginas em intervalos (1-based, inclusivos) de até `chunk_size` páginas."""
+    chunk_size = max(1, chunk_size)
+    return [
+        (start, min(start + chunk_size - 1, page_count))
+        for start in range(1, page_count + 1, chunk_size)
+    ]
+
+
+class TaskPlanner:
+    """
+    Monta as tarefas do pool arquivo a arquivo, à medida que a classificação termina.
+
+    Arquivos de `splittable_types` com mais de `split_threshold` páginas são divididos em
+    blocos de `chunk_size` páginas; arquivos cujo custo estimado fica abaixo de
+    `batch_seconds` são agrupados em lotes do mesmo tipo, de até `batch_seconds` de custo
+    somado e `max_batch_files` arquivos (0 desativa), para diluir o custo fixo de cada
+    tarefa (serialização e IPC) em centenas de arquivos pequenos; os demais viram uma
+    tarefa de arquivo inteiro. O custo de cada tarefa vem do `cost_model` (páginas x
+    segundos por página do tipo, ver CostModel).
+
+    `add` devolve as tarefas que já podem ser despachadas (blocos, arquivos inteiros e
+    lotes completos); `flush`, ao fim da classificação, os lotes ainda incompletos.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 16,
+        split_threshold: int = 32,
+        splittable_types: Tuple[str, ...] = SPLITTABLE_TYPES,
+        cost_model: Optional[CostModel] = None,
+        batch_seconds: float = 0.0,
+        max_batch_files: int = 32
+    ):
+        self.chunk_size = chunk_size
+        self.split_threshold = split_threshold
+        self.splittable_types = splittable_types
+        self.cost_model = cost_model or CostModel()
+        self.batch_seconds = batch_seconds
+        self.max_batch_files = max_batch_files
+        self._open_batches: Dict[Optional[str], List[PageTask]] = {}
+
+    def _file_tasks(self, item: Dict) -> List[PageTask]:
+        pdf_type = item.get('pdf_type')
+        page_count = item.get('page_count') or 0
+        if pdf_type in self.splittable_types and page_count > self.split_threshold:
+            ranges = split_page_ranges(page_count, self.chunk_size)
+            logger.info(f"📑 {item['path']} dividido em {len(ranges)} blocos de até {self.chunk_size} páginas.")
+            return [
+                PageTask(
+                    item['path'], pdf_type, page_count,
+                    first_page=first_page, last_page=last_page,
+                    chunk_index=chunk_index, total_chunks=len(ranges),
+                    estimated_seconds=self.cost_model.estimate(pdf_type, last_page - first_page + 1)
+                )
+                for chunk_index, (first_page, last_page) in enumerate(ranges)
+            ]
+        return [PageTask(
+            item['path'], pdf_type, page_count, estimated_seconds=self.cost_model.estimate(pdf_type, page_count)
+        )]
+
+    def _close_batch(self, pdf_type: Optional[str]) -> List[PageTask]:
+        members = self._open_batches.pop(pdf_type, [])
+        if len(members) <= 1:
+            return members
+        return [PageTask(
+            members[0].pdf_path, pdf_type, sum(t.page_count for t in members),
+            batch_paths=tuple(t.pdf_path for t in members),
+            # O custo fixo é pago uma única vez pelo lote
+            estimated_seconds=sum(t.cost - TASK_OVERHEAD_SECONDS for t in members) + TASK_OVERHEAD_SECONDS
+        )]
+
+    def add(self, item: Dict) -> List[PageTask]:
+        """:param item: Arquivo classificado, com as chaves 'path', 'pdf_type' e 'page_count'."""
+        ready = []
+        for task in self._file_tasks(item):
+            if self.batch_seconds <= 0 or task.is_chunk or task.cost >= self.batch_seconds:
+                ready.append(task)
+                continue
+            members = self._open_batches.setdefault(task.pdf_type, [])
+            members.append(task)
+            if sum(t.cost for t in members) >= self.batch_seconds or len(members) >= self.max_batch_files:
+                ready.extend(self._close_batch(task.pdf_type))
+        return ready
+
+    def flush(self) -> List[PageTask]:
+        ready = []
+        for pdf_type in list(self._open_batches):
+            ready.extend(self._close_batch(pdf_type))
+        return ready
+
+
+def log_plan(tasks: List[PageTask]) -> None:
+    batches = [task for task in tasks if task.is_batch]
+    logger.info(
+        f"🗓️ {len(tasks)} tarefas planejadas ({sum(len(t.batch_paths) for t in batches)} arquivos pequenos "
+        f"em {len(batches)} lotes); custo estimado total {sum(t.cost for t in tasks):.1f}s, "
+        f"maior tarefa {max((t.cost for t in tasks), default=0):.1f}s."
+    )
+
+
+def extract_page_range(pdf_path: str, pdf_type: str, first_page: int, last_page: int, config: Dict) -> List:
+    """
+    Executa um bloco de páginas em um worker e retorna os textos na ordem das páginas.
+    Com `page_routing`, retorna os registros por página do roteador (texto e decisão).
+    Função de nível de módulo para poder ser enviada ao ProcessPoolExecutor.
+
+    Blocos seguidos do mesmo PDF no mesmo worker reaproveitam o documento aberto
+    (ver `worker_context`).
+    """
+    if not config.get('page_routing', True) and pdf_type not in SPLITTABLE_TYPES:
+        raise ValueError(f"Tipo de PDF '{pdf_type}' não suporta extração por intervalo de páginas")
+    dpi = config.get('dpi', 300)
+    ocr_cache = get_ocr_cache(config)
+    ocr_backend = get_ocr_backend(config)
+    debug_writer = get_debug_writer(config)
+    page_store = get_page_store(config)
+    with worker_context(pdf_path, config) as context:
+        if config.get('page_routing', True):
+            return extract_pages_routed_range(
+                pdf_path, first_page, last_page, config, ocr_cache=ocr_cache, ocr_backend=ocr_backend,
+                debug_writer=debug_writer, page_store=page_store, context=context
+            )
+        if pdf_type == 'image_only':
+            return ocr_pages(
+                pdf_path, first_page=first_page, last_page=last_page, dpi=dpi,
+                context=context, ocr_cache=ocr_cache, ocr_backend=ocr_backend, debug_writer=debug_writer
+            )
+        return extract_pages_mixed(
+            pdf_path, first_page, last_page,
+            text_threshold=config.get('min_text_length', 15),
+            ocr_language=config.get('ocr_language', 'por+eng'),
+            dpi=dpi,
+            ocr_cache=ocr_cache,
+            ocr_backend=ocr_backend,
+            page_store=page_store,
+            context=context
+        )
+
+
+def timed_page_range(
+    pdf_path: str, pdf_type: str, first_page: int, last_page: int, config: Dict
+) -> Tuple[List, float, Dict]:
+    """
+    `extract_page_range` com o tempo gasto no worker (registrado para o modelo de custo)
+    e as métricas do bloco (spans e contadores, ver `src.utils.metrics`).
+    """
+    start_time = time.time()
+    pages = extract_page_range(pdf_path, pdf_type, first_page, last_page, config)
+    return pages, time.time() - start_time, metrics.drain()
+
+
+class PageAssembler:
+    """Reúne os blocos de páginas de cada documento e devolve as páginas completas em ordem."""
+
+    def __init__(self):
+        self._chunks: Dict[str, Dict[int, List]] = {}
+
+    def add(self, task: PageTask, pages_text: List) -> Optional[List]:
+        """
+        Registra o resultado de um bloco. Retorna a lista de páginas do documento,
+        em ordem, quando todos os blocos tiverem chegado; caso contrário, None.
+        """
+        received = self._chunks.setdefault(task.pdf_path, {})
+        received[task.chunk_index] = pages_text
+        if len(received) < task.total_chunks:
+            return None
+
+        del self._chunks[task.pdf_path]
+        pages = []
+        for chunk_index in range(task.total_chunks):
+            pages.extend(received[chunk_index])
+        return pages
+
+    def discard(self, pdf_path: str) -> None:
+        """Descarta blocos já recebidos de um documento que falhou."""
+        self._chunks.pop(pdf_path, None)
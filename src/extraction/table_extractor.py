@@ -0,0 +1,263 @@
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pdfplumber
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Colunas de procedência gravadas antes das colunas da tabela
+PROVENANCE_COLUMNS = ['table_id', 'page', 'x0', 'top', 'x1', 'bottom']
+# Linhas convertidas e gravadas por vez na segunda passada
+WRITE_BATCH_ROWS = 10000
+
+# Números no formato brasileiro (1.234,56) ou simples (1234.56), com R$ opcional
+_BR_NUMBER = re.compile(r'^-?\d{1,3}(\.\d{3})+(,\d+)?$|^-?\d+,\d+$')
+_PLAIN_NUMBER = re.compile(r'^-?\d+(\.\d+)?$')
+
+
+def parse_number(value: str) -> Optional[float]:
+    """
+    Converte preços e quantidades ('R$ 1.234,56', '12,50', '40') em número.
+    Códigos com zero à esquerda ('00123') não são números: são códigos de peça.
+    """
+    text = value.replace('R$', '').replace(' ', '').replace(' ', '').strip()
+    if not text:
+        return None
+    digits = text.lstrip('-')
+    if len(digits) > 1 and digits[0] == '0' and digits[1] not in ',.':
+        return None
+    if _BR_NUMBER.match(text):
+        return float(text.replace('.', '').replace(',', '.'))
+    if _PLAIN_NUMBER.match(text):
+        return float(text)
+    return None
+
+
+def _clean_cell(cell) -> str:
+    return re.sub(r'\s+', ' ', cell).strip() if cell else ''
+
+
+def _looks_like_header(row: List[str]) -> bool:
+    """Linha de cabeçalho: maioria das células preenchida e nenhuma numérica."""
+    filled = [cell for cell in row if cell]
+    return len(filled) >= max(1, len(row) // 2) and all(parse_number(cell) is None for cell in filled)
+
+
+def _column_names(header: List[str]) -> List[str]:
+    """Nomes únicos a partir do cabeçalho (células vazias viram col_N)."""
+    names = []
+    for i, cell in enumerate(header):
+        name = cell or f'col_{i + 1}'
+        base, suffix = name, 2
+        while name in names or name in PROVENANCE_COLUMNS:
+            name = f'{base}_{suffix}'
+            suffix += 1
+        names.append(name)
+    return names
+
+
+class _ColumnTypes:
+    """Acumula, por coluna, se todos os valores são inteiros, números ou texto."""
+
+    def __init__(self):
+        self.kinds: Dict[str, str] = {}
+
+    def observe(self, column: str, value: str) -> None:
+        if not value or self.kinds.get(column) == 'string':
+            self.kinds.setdefault(column, 'int')
+            return
+        number = parse_number(value)
+        if number is None:
+            self.kinds[column] = 'string'
+        elif number.is_integer() and self.kinds.get(column, 'int') == 'int' and ',' not in value:
+            self.kinds[column] = 'int'
+        else:
+            self.kinds[column] = 'float'
+
+    def cast(self, frame: pd.DataFrame) -> pd.DataFrame:
+        for column in frame.columns:
+            if column in PROVENANCE_COLUMNS:
+                continue
+            kind = self.kinds.get(column, 'string')
+            values = frame[column].fillna('')
+            if kind == 'string':
+                frame[column] = values.astype('string').where(values != '', pd.NA)
+            else:
+                numbers = values.map(lambda v: parse_number(v) if v else None).astype('Float64')
+                frame[column] = numbers.astype('Int64') if kind == 'int' else numbers
+        return frame
+
+
+class _HeaderTracker:
+    """
+    Acompanha o cabeçalho das tabelas entre quebras de página:
+
+    - cabeçalho igual ao atual (repetido no topo da página) é descartado;
+    - linha com cara de cabeçalho inicia um novo esquema de colunas;
+    - tabela sem cabeçalho com o mesmo número de colunas continua a anterior;
+    - nos demais casos, as colunas recebem nomes genéricos (col_N).
+    """
+
+    def __init__(self):
+        self.header: Optional[List[str]] = None
+        self.columns: Optional[List[str]] = None
+        self.table_id = -1
+
+    def assign(self, rows: List[List[str]]) -> Tuple[List[str], int]:
+        """Retorna os nomes das colunas e quantas linhas iniciais são cabeçalho."""
+        first = rows[0]
+        if self.header is not None and first == self.header:
+            return self.columns, 1
+        if _looks_like_header(first) and len(rows) > 1:
+            self.header, self.columns = first, _column_names(first)
+            self.table_id += 1
+            return self.columns, 1
+        if self.columns is not None and len(first) == len(self.columns):
+            return self.columns, 0
+        self.header = None
+        self.columns = [f'col_{i + 1}' for i in range(len(first))]
+        self.table_id += 1
+        return self.columns, 0
+
+
+def iter_table_rows(pdf) -> Iterator[Dict]:
+    """
+    Percorre as tabelas do PDF página a página (pdfplumber) e gera um dicionário por
+    linha, com procedência (tabela, página, bbox da linha) e as células nomeadas.
+    O cache de cada página é liberado logo após o uso.
+    """
+    tracker = _HeaderTracker()
+    for page_number, page in enumerate(pdf.pages, start=1):
+        try:
+            for table in page.find_tables():
+                raw_rows = table.extract()
+                rows = [[_clean_cell(cell) for cell in row] for row in raw_rows]
+                rows_bbox = [row.bbox for row in table.rows]
+                if len(rows) < 1 or not any(any(row) for row in rows):
+                    continue
+                columns, skip = tracker.assign(rows)
+                for row, bbox in zip(rows[skip:], rows_bbox[skip:]):
+                    if not any(row):
+                        continue
+                    record = {
+                        'table_id': tracker.table_id, 'page': page_number,
+                        'x0': bbox[0], 'top': bbox[1], 'x1': bbox[2], 'bottom': bbox[3],
+                    }
+                    record.update(zip(columns, row))
+                    yield record
+        finally:
+            page.close()
+
+
+def resolve_format(table_format: str) -> str:
+    """Formato de saída dos conjuntos de dados: 'auto' vira Parquet se o pyarrow estiver instalado, senão CSV."""
+    if table_format != 'auto':
+        return table_format
+    try:
+        import pyarrow  # noqa: F401
+        return 'parquet'
+    except ImportError:
+        return 'csv'
+
+
+def _write_dataset(spool_path: Path, columns: List[str], types: _ColumnTypes, output_path: Path, table_format: str) -> None:
+    """Segunda passada: lê o spool em lotes, converte os tipos e grava CSV/Parquet."""
+    writer = None
+    first = True
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(spool_path, encoding='utf-8') as spool:
+            while True:
+                batch = [json.loads(line) for _, line in zip(range(WRITE_BATCH_ROWS), spool)]
+                if not batch:
+                    break
+                frame = types.cast(pd.DataFrame.from_records(batch, columns=columns))
+                if table_format == 'parquet':
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    table = pa.Table.from_pandas(frame, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(str(tmp_path), table.schema)
+                    writer.write_table(table)
+                else:
+                    frame.to_csv(tmp_path, mode='w' if first else 'a', header=first, index=False, encoding='utf-8')
+                first = False
+        if writer is not None:
+            writer.close()
+            writer = None
+        os.replace(tmp_path, output_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def extract_tables_to_dataset(
+    pdf_path: str,
+    output_dir: str,
+    context=None,
+    table_format: str = 'auto'
+) -> Optional[str]:
+    """
+    Extrai as tabelas do PDF para um único conjunto de dados por catálogo
+    (`<nome>.parquet` ou `<nome>.csv`), com colunas tipadas e procedência por linha.
+
+    As páginas são processadas em fluxo: as linhas vão para um arquivo temporário
+    (JSON por linha) enquanto os tipos das colunas são inferidos; depois o arquivo é
+    relido em lotes de `WRITE_BATCH_ROWS` linhas e gravado. Assim, listas de preços com
+    milhares de páginas nunca ficam inteiras em memória.
+
+    :param table_format: 'parquet', 'csv' ou 'auto' (Parquet se o pyarrow estiver instalado).
+    :return: Caminho do arquivo gerado ou None se não houver tabelas ou se a extração falhar.
+    """
+    output_dir_path = Path(output_dir)
+    output_dir_path.mkdir(parents=True, exist_ok=True)
+    table_format = resolve_format(table_format)
+    output_path = output_dir_path / f"{Path(pdf_path).stem}.{table_format}"
+
+    fd, spool_name = tempfile.mkstemp(prefix='tabelas_', suffix='.jsonl')
+    spool_path = Path(spool_name)
+    columns = list(PROVENANCE_COLUMNS)
+    types = _ColumnTypes()
+    row_count = 0
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as spool:
+            pdf = context.plumber if context is not None else pdfplumber.open(pdf_path)
+            try:
+                for record in iter_table_rows(pdf):
+                    for column, value in record.items():
+                        if column in PROVENANCE_COLUMNS:
+                            continue
+                        if column not in columns:
+                            columns.append(column)
+                        types.observe(column, value)
+                    spool.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    row_count += 1
+            finally:
+                if context is None:
+                    pdf.close()
+
+        if row_count == 0:
+            logger.warning(f"⚠️ Nenhuma linha de tabela extraída de {pdf_path}.")
+            return None
+
+        _write_dataset(spool_path, columns, types, output_path, table_format)
+        logger.info(
+            f"📊 {row_count} linhas de tabela de {pdf_path} salvas em {output_path} "
+            f"({len(columns) - len(PROVENANCE_COLUMNS)} colunas)."
+        )
+        return str(output_path)
+    except Exception as e:
+        logger.error(f"❌ Erro ao extrair tabelas de {pdf_path}: {e}")
+        return None
+    finally:
+        if spool_path.exists():
+            spool_path.unlink()
@@ -1,10 +1,14 @@
 from pathlib import Path
-import os
 import re
+import unicodedata
+from collections import Counter
 import fitz  # PyMuPDF
 import pdfplumber  # Extração avançada de texto
+import pypdfium2 as pdfium
 from PyPDF2 import PdfReader
+from src.utils.file_utils import discard_page_map, write_text_atomic
 from src.utils.logger import setup_logger
+from src.utils.metrics import incr, span
 
 # Caminho do log
 log_path = Path("data/output/processing.log")
@@ -21,47 +25,253 @@ def sanitize_filename(filename: str) -> str:
     sanitized = re.sub(r'[^\w\-]', '', sanitized)
     return sanitized
 
-def extract_text_pypdf2(pdf_path: str) -> str:
-    """Extrai texto usando PyPDF2. Retorna None se falhar."""
-    try:
-        with open(pdf_path, 'rb') as file:
-            reader = PdfReader(file)
-            extracted_texts = [page.extract_text() or '' for page in reader.pages]
-        full_text = "\n".join(extracted_texts).strip()
-        return full_text if full_text else None
-    except Exception as e:
-        logger.warning(f"⚠️ PyPDF2 falhou ao extrair texto de {pdf_path}: {str(e)}")
-        return None
+# Página com nota abaixo disso é extraída de novo pelo próximo backend da cadeia
+MIN_PAGE_QUALITY = 0.5
 
-def extract_text_pymupdf(pdf_path: str) -> str:
-    """Extrai texto usando PyMuPDF (fitz). Retorna None se falhar."""
-    try:
-        doc = fitz.open(pdf_path)
-        full_text = "\n".join([page.get_text("text") for page in doc]).strip()
-        return full_text if full_text else None
-    except Exception as e:
-        logger.warning(f"⚠️ PyMuPDF falhou ao extrair texto de {pdf_path}: {str(e)}")
-        return None
+# Token "com cara de palavra": letras/dígitos, com separadores internos (ABC-1000, 12,50, M8x40)
+_WORD_LIKE = re.compile(r"^[^\W_]+([-./,][^\W_]+)*$")
+_TOKEN_PUNCTUATION = '.,;:!?()[]{}"\'«»%$*'
 
-def extract_text_pdfplumber(pdf_path: str) -> str:
-    """Extrai texto usando pdfplumber como último recurso."""
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            extracted_texts = [page.extract_text() or '' for page in pdf.pages]
-        full_text = "\n".join(extracted_texts).strip()
-        return full_text if full_text else None
-    except Exception as e:
-        logger.warning(f"⚠️ pdfplumber falhou ao extrair texto de {pdf_path}: {str(e)}")
-        return None
 
-def extract_and_save_text(pdf_path: str, output_dir: str) -> str:
+def _is_garbage_char(char: str) -> bool:
+    """Caractere de substituição, de uso privado (fontes sem ToUnicode) ou de controle."""
+    if char == '\ufffd' or '\ue000' <= char <= '\uf8ff':
+        return True
+    return unicodedata.category(char) == 'Cc' and char not in '\n\r\t'
+
+
+def score_page_text(text: str) -> float:
+    """
+    Nota de 0 a 1 para o texto extraído de uma página, combinando:
+
+    - proporção de caracteres inválidos (substituição U+FFFD, uso privado, controle);
+    - proporção de espaços (letras espaçadas "C a t á l o g o" ou palavras coladas);
+    - proporção de tokens com cara de palavra (descarta "(cid:12)", símbolos soltos).
+
+    Página vazia recebe 0.
+    """
+    text = text.strip() if text else ''
+    if not text:
+        return 0.0
+
+    garbage_ratio = sum(1 for char in text if _is_garbage_char(char)) / len(text)
+    whitespace_ratio = sum(1 for char in text if char.isspace()) / len(text)
+    tokens = [token.strip(_TOKEN_PUNCTUATION) for token in text.split()]
+    tokens = [token for token in tokens if token] or ['']
+    word_ratio = sum(1 for token in tokens if _WORD_LIKE.match(token)) / len(tokens)
+    single_letters = sum(1 for token in tokens if len(token) == 1 and token.isalpha()) / len(tokens)
+
+    score = word_ratio * max(0.0, 1 - 5 * garbage_ratio)
+    if single_letters > 0.5:
+        score *= 1 - single_letters
+    if whitespace_ratio > 0.5:
+        score *= max(0.0, 2 * (1 - whitespace_ratio))
+    elif whitespace_ratio < 0.02 and len(text) > 80:
+        score *= 0.5
+    return score
+
+
+class TextBackend:
+    """
+    Leitor da camada de texto de um documento, página a página. Reaproveita os handles
+    do PDFDocumentContext quando houver; caso contrário abre (e fecha) o próprio.
+    """
+
+    name = "base"
+
+    def __init__(self, pdf_path: str, context=None):
+        self.pdf_path = pdf_path
+        self.context = context
+
+    @property
+    def page_count(self) -> int:
+        raise NotImplementedError
+
+    def page_text(self, page_index: int) -> str:
+        raise NotImplementedError
+
+    def may_have_text(self, page_index: int) -> bool:
+        """False quando nenhum outro backend teria o que extrair (ex.: página sem fontes)."""
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class PyMuPDFBackend(TextBackend):
+    name = "pymupdf"
+
+    def __init__(self, pdf_path: str, context=None):
+        super().__init__(pdf_path, context)
+        self._doc = context.doc if context is not None else fitz.open(pdf_path)
+
+    @property
+    def page_count(self) -> int:
+        return self._doc.page_count
+
+    def page_text(self, page_index: int) -> str:
+        if self.context is not None:
+            # O texto por página fica em cache no contexto (já lido na classificação)
+            return self.context.page_text(page_index)
+        return self._doc[page_index].get_text("text")
+
+    def may_have_text(self, page_index: int) -> bool:
+        return bool(self._doc[page_index].get_fonts())
+
+    def close(self) -> None:
+        if self.context is None:
+            self._doc.close()
+
+
+class PdfiumBackend(TextBackend):
+    name = "pypdfium2"
+
+    def __init__(self, pdf_path: str, context=None):
+        super().__init__(pdf_path, context)
+        self._doc = pdfium.PdfDocument(pdf_path)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._doc)
+
+    def page_text(self, page_index: int) -> str:
+        page = self._doc[page_index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+
+    def close(self) -> None:
+        self._doc.close()
+
+
+class PdfplumberBackend(TextBackend):
+    name = "pdfplumber"
+
+    def __init__(self, pdf_path: str, context=None):
+        super().__init__(pdf_path, context)
+        self._pdf = context.plumber if context is not None else pdfplumber.open(pdf_path)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pdf.pages)
+
+    def page_text(self, page_index: int) -> str:
+        page = self._pdf.pages[page_index]
+        try:
+            return page.extract_text() or ''
+        finally:
+            page.close()
+
+    def close(self) -> None:
+        if self.context is None:
+            self._pdf.close()
+
+
+class PyPDF2Backend(TextBackend):
+    name = "pypdf2"
+
+    def __init__(self, pdf_path: str, context=None):
+        super().__init__(pdf_path, context)
+        self._file = None
+        if context is not None:
+            self._reader = context.pypdf2_reader
+        else:
+            self._file = open(pdf_path, 'rb')
+            self._reader = PdfReader(self._file)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._reader.pages)
+
+    def page_text(self, page_index: int) -> str:
+        return self._reader.pages[page_index].extract_text() or ''
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+# Ordem da cadeia pelo tempo medido por página (benchmarks/bench_text_backends.py):
+# PyMuPDF (~2 ms, e o texto já fica em cache no contexto), pypdfium2 (~2 ms),
+# PyPDF2 (~8 ms) e pdfplumber (~120 ms), este só para as páginas que os outros erraram
+TEXT_BACKENDS = (PyMuPDFBackend, PdfiumBackend, PyPDF2Backend, PdfplumberBackend)
+
+
+def extract_pages_text(
+    pdf_path: str,
+    context=None,
+    page_indexes=None,
+    min_quality: float = MIN_PAGE_QUALITY,
+    backends=TEXT_BACKENDS
+) -> list:
+    """
+    Extrai a camada de texto página a página pela cadeia de backends.
+
+    Cada página recebe uma nota (`score_page_text`); só as páginas abaixo de
+    `min_quality` são lidas de novo pelo backend seguinte, sem reprocessar o documento
+    inteiro. Fica o texto de maior nota entre os backends tentados.
+
+    :param page_indexes: Páginas (0-based) a extrair; padrão: todas.
+    :return: Um registro por página, em ordem: 'page' (1-based), 'text', 'backend' e 'quality'.
+    """
+    results = {}
+    pending = None if page_indexes is None else list(page_indexes)
+
+    for backend_class in backends:
+        if pending == []:
+            break
+        try:
+            backend = backend_class(pdf_path, context=context)
+        except Exception as e:
+            logger.warning(f"⚠️ {backend_class.name} não abriu {pdf_path}: {e}")
+            continue
+
+        try:
+            if pending is None:
+                pending = list(range(backend.page_count))
+            retried = bool(results)
+            still_poor = []
+            for page_index in pending:
+                try:
+                    with span('text_extraction', page=page_index + 1):
+                        text = (backend.page_text(page_index) or '').strip()
+                    incr(f'text_pages_{backend.name}')
+                except Exception as e:
+                    logger.warning(f"⚠️ {backend.name} falhou na página {page_index + 1} de {pdf_path}: {e}")
+                    text = ''
+                quality = score_page_text(text)
+                best = results.get(page_index)
+                if best is None or quality > best['quality']:
+                    results[page_index] = {
+                        'page': page_index + 1, 'text': text, 'backend': backend.name, 'quality': round(quality, 3)
+                    }
+                if quality < min_quality and (text or backend.may_have_text(page_index)):
+                    still_poor.append(page_index)
+            if retried:
+                recovered = len(pending) - len(still_poor)
+                logger.info(
+                    f"🔁 {backend.name} reextraiu {len(pending)} página(s) de {pdf_path}; "
+                    f"{recovered} passaram na nota mínima."
+                )
+            pending = still_poor
+        finally:
+            backend.close()
+
+    return [results[page_index] for page_index in sorted(results)]
+
+def extract_and_save_text(pdf_path: str, output_dir: str, context=None) -> str:
     """
     Extrai texto de PDFs com conteúdo selecionável e salva em um arquivo .txt.
     
-    Tenta extração utilizando diferentes métodos e usa um nome de arquivo sanitizado.
+    Extrai página a página pela cadeia de backends (`extract_pages_text`) e usa um
+    nome de arquivo sanitizado.
     
     :param pdf_path: Caminho do arquivo PDF a ser processado.
     :param output_dir: Diretório onde o arquivo .txt extraído será salvo.
+    :param context: PDFDocumentContext opcional; reaproveita o PDF já aberto na classificação.
     :return: Caminho para o arquivo .txt gerado ou None em caso de falha.
     """
     try:
@@ -74,17 +284,14 @@ def extract_and_save_text(pdf_path: str, output_dir: str) -> str:
         output_path = output_path_dir / sanitized_filename
         
         logger.info(f"🔍 Iniciando extração de texto para {pdf_path}...")
-        print(f"📂 Tentando salvar em: {output_path}")
-        
-        # Tenta extrair o texto utilizando os diferentes extratores
-        extractors = [extract_text_pypdf2, extract_text_pymupdf, extract_text_pdfplumber]
-        full_text = None
+        logger.debug(f"📂 Tentando salvar em: {output_path}")
         
-        for extractor in extractors:
-            full_text = extractor(pdf_path)
-            if full_text:
-                logger.info(f"✅ {extractor.__name__} extraiu {len(full_text)} caracteres de {pdf_path}")
-                break
+        # Extrai página a página; só as páginas com nota baixa passam pelos backends seguintes
+        pages = extract_pages_text(pdf_path, context=context)
+        full_text = "\n".join(page['text'] for page in pages).strip()
+        if full_text:
+            backends = Counter(page['backend'] for page in pages if page['text'])
+            logger.info(f"✅ {len(full_text)} caracteres extraídos de {pdf_path} (páginas por backend: {dict(backends)})")
         
         if not full_text:
             logger.warning(f"⚠️ Nenhum texto extraído de {pdf_path}. Pode ser um PDF baseado em imagem.")
@@ -96,8 +303,8 @@ def extract_and_save_text(pdf_path: str, output_dir: str) -> str:
         
         # Salva o texto extraído no arquivo de saída
         try:
-            with open(output_path, 'w', encoding='utf-8', errors='replace') as f:
-                f.write(full_text)
+            write_text_atomic(output_path, full_text, errors='replace')
+            discard_page_map(output_path)
             logger.info(f"📂 Texto extraído salvo em {output_path}")
             return str(output_path)
         except OSError as e:
@@ -0,0 +1,233 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import argparse
+import os
+import re
+import time
+from itertools import repeat
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.extraction.table_extractor import resolve_format
+from src.processing.search_index import PART_CODE, read_text_pages
+from src.utils.logger import setup_logger
+from src.utils.metrics import incr, span
+
+logger = setup_logger(__name__)
+
+DEFAULT_ENTITIES_DIR = "data/output/entities"
+# Páginas por lote: o texto do lote é varrido de uma vez por cada padrão
+ENTITY_BATCH_PAGES = 1000
+
+# Unidade de venda (qualquer caixa); normalizada por _UNIT_ALIASES
+_UNITS = r"(?i:un(?:id|d)?|pe[çc]as?|p[çc]s?|cx|pct|kg|jg|par(?:es)?|rl|kit)"
+# Valor no formato brasileiro: 1.234,56 ou 12,50
+_DECIMAL = r"\d{1,3}(?:\.\d{3})+,\d{2}|\d+,\d{2}"
+# Medidas: rosca (M8, M8 x 40), diâmetro (Ø 20 mm), polegadas (3/8"), A x B (x C) com
+# unidade opcional, ou valor com unidade
+_DIMENSION = (
+    r"M\d+(?:[.,]\d+)?(?:[ \t]*[xX×][ \t]*\d+(?:[.,]\d+)?)?(?:[ \t]*mm)?"
+    r"|Ø[ \t]*\d+(?:[.,]\d+)?(?:[ \t]*mm)?"
+    r"|\d+/\d+[ \t]*(?:pol|\")"
+    r"|\d+(?:[.,]\d+)?(?:[ \t]*[xX×][ \t]*\d+(?:[.,]\d+)?){1,2}(?:[ \t]*(?:mm|cm|m|pol|\"))?"
+    r"|\d+(?:[.,]\d+)?[ \t]*(?:mm|cm|pol|\")"
+)
+# Uma linha do texto, numa única varredura do lote com `findall`: cada linha começa num "\n"
+# (o texto do lote começa com "\n" para incluir a 1ª) e gera uma tupla com os grupos abaixo,
+# vazios quando a linha não é um item. Linha de item:
+# - código no início da linha (opcionalmente depois de um índice "12." ou "3)"): a regra
+#   `PART_CODE` do índice de busca, aqui só com maiúsculas (ABC-1234, 6204-2RS, 7891234567890);
+# - descrição: as palavras seguintes até a primeira medida, número ou preço;
+# - medida e "quantidade unidade" (10 un), quando vierem logo depois;
+# - preço: "R$ 1.234,56" em qualquer posição da linha ou, sem "R$", o valor no fim da
+#   linha; a unidade pode vir em seguida ("12,50/un", "R$ 0,35 pç").
+_LINE = re.compile(
+    r"\n(?:[ \t]*(?:\d{1,3}[.)][ \t]+)?"
+    r"(?P<part_number>" + PART_CODE + r")"
+    r"(?![\w-])[ \t]*"
+    r"(?P<description>(?:(?!M\d|Ø|R\$|\d)[^\s]+[ \t]*)*)"
+    r"(?:(?P<dimension>" + _DIMENSION + r")(?!\w)[ \t]*)?"
+    r"(?:(?P<quantity>\d+)[ \t]*(?P<unit>" + _UNITS + r")\b\.?[ \t]*)?"
+    r"(?:[^\n]*?R\$[ \t]*(?P<price>" + _DECIMAL + r")(?:[ \t]*/?[ \t]*(?P<price_unit>" + _UNITS + r")\b)?"
+    r"|[^\n]*?(?<![\d.,])(?P<trailing_price>" + _DECIMAL + r")"
+    r"(?:[ \t]*/?[ \t]*(?P<trailing_unit>" + _UNITS + r")\b\.?)?[ \t]*(?=\n|$))?"
+    r"[^\n]*"
+    r"|[^\n]*)"
+)
+# Separadores removidos na forma normalizada do código (o padrão do código não aceita espaços)
+_PART_SEPARATORS = ('-', '.', '/')
+_UNIT_ALIASES = {
+    'unid': 'un', 'und': 'un', 'peças': 'pç', 'pecas': 'pç', 'peça': 'pç', 'peca': 'pç',
+    'pçs': 'pç', 'pcs': 'pç', 'pc': 'pç', 'pares': 'par',
+}
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        'page': pd.Series(dtype='int32'), 'line': pd.Series(dtype='int32'),
+        'part_number': pd.Series(dtype='string'), 'part_number_normalized': pd.Series(dtype='string'),
+        'description': pd.Series(dtype='string'), 'dimension': pd.Series(dtype='string'),
+        'quantity': pd.Series(dtype='Int32'), 'unit': pd.Series(dtype='category'),
+        'price': pd.Series(dtype='float64'),
+    })
+
+
+def _replace_all(values, old: str, new: str):
+    """`str.replace` em cada valor, via map (sem laço em Python; mais rápido que str.translate)."""
+    return map(str.replace, values, repeat(old), repeat(new))
+
+
+def _strings(column: np.ndarray) -> pd.arrays.StringArray:
+    values = pd.array(column, dtype='string')
+    values[column == ''] = pd.NA
+    return values
+
+
+def _first_present(*columns: np.ndarray) -> np.ndarray:
+    """Por linha, o primeiro valor não vazio entre as colunas."""
+    result = columns[0]
+    for column in columns[1:]:
+        result = np.where(result != '', result, column)
+    return result
+
+
+def _normalize_units(units: np.ndarray) -> pd.Categorical:
+    """Minúsculas e sinônimos (und -> un, pçs -> pç), aplicados às categorias e não a cada linha."""
+    raw = pd.Categorical(units)
+    normalized = [_UNIT_ALIASES.get(unit.lower(), unit.lower()) for unit in raw.categories]
+    categories = sorted(set(normalized) - {''})
+    # '' (sem unidade) e o código -1 viram -1; remap[-1] é a sentinela no fim do vetor
+    remap = np.array([categories.index(unit) if unit else -1 for unit in normalized] + [-1], dtype='int64')
+    return pd.Categorical.from_codes(remap[raw.codes], categories=categories)
+
+
+def _extract_batch(pages: List[Tuple[int, str]]) -> pd.DataFrame:
+    """
+    Extrai os itens de um lote de páginas com uma única varredura de `_LINE` (`findall`)
+    sobre o texto do lote, sem laço em Python por linha: o resultado tem uma tupla por
+    linha, na ordem do texto, e vira colunas NumPy filtradas pela máscara das linhas de
+    item. Página e linha de cada item saem do índice da linha no lote.
+    """
+    text = "\n" + "\n".join(page_text for _, page_text in pages)
+    columns = [np.array(column, dtype=object) for column in zip(*_LINE.findall(text))]
+    is_item = columns[0] != ''
+    line_index = np.flatnonzero(is_item)
+    if not len(line_index):
+        return _empty_frame()
+    (part_numbers, descriptions, dimensions, quantities, units, prices, price_units,
+     trailing_prices, trailing_units) = (column[is_item] for column in columns)
+
+    line_counts = np.fromiter((page_text.count('\n') + 1 for _, page_text in pages), dtype=np.int64, count=len(pages))
+    first_line = np.concatenate(([0], np.cumsum(line_counts)[:-1]))
+    page_index = np.searchsorted(first_line, line_index, side='right') - 1
+    page_numbers = np.fromiter((number for number, _ in pages), dtype=np.int32, count=len(pages))
+
+    price = _first_present(prices, trailing_prices)
+    has_price = price != ''
+    price_values = np.full(len(line_index), np.nan)
+    # "1.234,56" -> "1234.56" -> float (conversão do NumPy)
+    price_values[has_price] = np.array(
+        list(_replace_all(_replace_all(price[has_price], '.', ''), ',', '.')), dtype='float64'
+    )
+    normalized = part_numbers
+    for separator in _PART_SEPARATORS:
+        normalized = _replace_all(normalized, separator, '')
+    quantity = np.full(len(line_index), np.nan)
+    has_quantity = quantities != ''
+    quantity[has_quantity] = quantities[has_quantity].astype('float64')
+
+    return pd.DataFrame({
+        'page': page_numbers[page_index],
+        'line': (line_index - first_line[page_index] + 1).astype('int32'),
+        'part_number': _strings(part_numbers),
+        'part_number_normalized': pd.array(list(normalized), dtype='string'),
+        'description': _strings(np.array(list(map(str.rstrip, descriptions)), dtype=object)),
+        'dimension': _strings(dimensions),
+        'quantity': pd.array(quantity, dtype='Int32'),
+        # Unidade da linha ("10 un") ou a que acompanha o preço ("12,50/un")
+        'unit': _normalize_units(_first_present(units, price_units, trailing_units)),
+        'price': price_values,
+    })
+
+
+def extract_entities(pages: Iterable[Tuple[int, str]], batch_pages: int = ENTITY_BATCH_PAGES) -> pd.DataFrame:
+    """
+    Extrai os itens de catálogo das páginas (`(número, texto)`, como em `read_text_pages`):
+    uma linha por linha de item, com código (original e normalizado), descrição, medida,
+    quantidade e unidade de venda e preço.
+
+    Os padrões são pré-compilados e aplicados ao texto de `batch_pages` páginas de uma vez
+    (ver `_extract_batch`), sem laço em Python por linha do texto. O resultado é colunar e
+    compacto: unidade categórica, página/linha int32 e preço float64.
+    """
+    frames = []
+    batch: List[Tuple[int, str]] = []
+    for page in pages:
+        batch.append(page)
+        if len(batch) >= batch_pages:
+            frames.append(_extract_batch(batch))
+            batch = []
+    if batch:
+        frames.append(_extract_batch(batch))
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return _empty_frame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    result = pd.concat(frames, ignore_index=True)
+    return result.astype({'unit': 'category'})
+
+
+def extract_entities_to_dataset(txt_path: str, output_dir: str, table_format: str = 'auto') -> Optional[str]:
+    """
+    Extrai os itens do .txt de um arquivo concluído e grava `<nome>.entities.parquet`
+    (ou `.csv` sem o pyarrow, como as tabelas) em `output_dir`.
+
+    :return: Caminho do arquivo gerado ou None se não houver itens ou se a extração falhar.
+    """
+    try:
+        with span('entities'):
+            frame = extract_entities(read_text_pages(txt_path))
+            if frame.empty:
+                return None
+            output_dir_path = Path(output_dir)
+            output_dir_path.mkdir(parents=True, exist_ok=True)
+            table_format = resolve_format(table_format)
+            output_path = output_dir_path / f"{Path(txt_path).stem}.entities.{table_format}"
+            tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+            try:
+                if table_format == 'parquet':
+                    frame.to_parquet(tmp_path, index=False)
+                else:
+                    frame.to_csv(tmp_path, index=False, encoding='utf-8')
+                os.replace(tmp_path, output_path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+        incr('entities_extracted', len(frame))
+        logger.info(f"🏷️ {len(frame)} item(ns) de catálogo salvos em: {output_path}")
+        return str(output_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Falha ao extrair itens de {txt_path}: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrai itens de catálogo (código, descrição, preço) dos .txt")
+    parser.add_argument("txt_paths", nargs="+")
+    parser.add_argument("--output-dir", default=DEFAULT_ENTITIES_DIR)
+    parser.add_argument("--format", default="auto", choices=("auto", "parquet", "csv"))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for txt_path in args.txt_paths:
+        extract_entities_to_dataset(txt_path, args.output_dir, args.format)
+    print(f"🏷️ {len(args.txt_paths)} arquivo(s) em {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
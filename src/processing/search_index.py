@@ -0,0 +1,374 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+from src.utils.metrics import incr, span
+
+logger = setup_logger(__name__)
+
+DEFAULT_INDEX_PATH = "data/interim/search_index.sqlite"
+DEFAULT_TEXT_DIR = "data/output/text"
+
+MIN_NUMERIC_PART_LENGTH = 5
+# Códigos de peça: letras, dígitos e separadores (-./), com pelo menos um dígito e uma
+# letra (ABC-1234, 6204-2RS, M8X40) ou, sem letras, pelo menos 5 dígitos (7891234567890),
+# para não confundir preços e quantidades ("1.250") com códigos. Única definição da
+# regra, usada aqui (sem diferenciar maiúsculas) e nas linhas de item de entity_extractor
+PART_CODE = (
+    r"(?=[A-Z0-9./-]*\d)"
+    r"(?:(?=[A-Z0-9./-]*[A-Z])[A-Z0-9][A-Z0-9./-]{2,38}[A-Z0-9]|\d{" + str(MIN_NUMERIC_PART_LENGTH) + r",})"
+)
+_PART_TOKEN = re.compile(r"(?<![\w./-])(?:" + PART_CODE + r")(?![\w-])", re.IGNORECASE)
+_PART_SEPARATORS = re.compile(r"[\s./_-]+")
+
+# Instâncias por processo (conexão SQLite própria)
+_indexes: Dict[str, "SearchIndex"] = {}
+
+
+def normalize_part_number(value: str) -> str:
+    """Forma canônica de um código de peça: maiúsculas e sem separadores ("abc-12.34" -> "ABC1234")."""
+    return _PART_SEPARATORS.sub("", value).upper()
+
+
+def extract_part_numbers(text: str) -> Dict[str, str]:
+    """Códigos de peça do texto: {normalizado: primeira grafia encontrada}."""
+    parts = {}
+    for match in _PART_TOKEN.finditer(text):
+        token = match.group(0)
+        normalized = normalize_part_number(token)
+        # Separadores não contam: "A-1-B" não chega a 4 caracteres
+        if len(normalized) < 4:
+            continue
+        parts.setdefault(normalized, token)
+    return parts
+
+
+def read_text_pages(txt_path: str) -> List[Tuple[int, str]]:
+    """
+    Páginas de um .txt extraído. Com o roteamento por página, `<nome>.pages.json` traz o
+    intervalo de cada página no arquivo; sem ele, o texto inteiro vira a página 0. Um
+    `.pages.json` cujo intervalo final não termina no fim do texto é de outra execução e
+    é ignorado.
+    """
+    txt_path = Path(txt_path)
+    text = txt_path.read_text(encoding='utf-8', errors='replace')
+    sidecar = txt_path.with_suffix('.pages.json')
+    if sidecar.exists():
+        pages = json.loads(sidecar.read_text(encoding='utf-8'))['pages']
+        if pages and pages[-1]['char_end'] == len(text):
+            return [(page['page'], text[page['char_start']:page['char_end']]) for page in pages]
+        logger.warning(f"⚠️ {sidecar.name} não corresponde a {txt_path.name}; texto lido como uma página.")
+    return [(0, text)]
+
+
+def _fts_query(text: str) -> str:
+    """Consulta do usuário como termos entre aspas (todos obrigatórios); '*' no fim vira prefixo."""
+    terms = []
+    for term in text.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', '""')
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """
+    Índice de busca do texto extraído (SQLite):
+
+    - `page_text` guarda o texto por página (documento, número da página) e a tabela
+      FTS5 `page_fts` indexa esse conteúdo (tokenizador unicode61 sem acentos), com
+      ranking bm25 e trechos destacados;
+    - `part_numbers` é o índice de códigos de peça normalizados por página, com busca
+      exata ou por prefixo numa árvore B (sem varrer o texto).
+
+    Reindexar um documento substitui as páginas anteriores dele.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # A API indexa a partir de threads auxiliares; o lock serializa o acesso à conexão
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE,
+                source TEXT,
+                pdf_type TEXT,
+                page_count INTEGER,
+                size INTEGER,
+                mtime_ns INTEGER,
+                indexed_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS page_text (
+                id INTEGER PRIMARY KEY,
+                doc_id INTEGER NOT NULL,
+                page INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_page_text_doc ON page_text(doc_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS page_fts USING fts5(
+                text, content='page_text', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TABLE IF NOT EXISTS part_numbers (
+                part TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                page INTEGER NOT NULL,
+                raw TEXT NOT NULL,
+                PRIMARY KEY (part, doc_id, page)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_part_numbers_doc ON part_numbers(doc_id);
+            """
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _delete_document(self, doc_id: int) -> None:
+        # Tabela FTS5 de conteúdo externo: o índice é removido com o comando 'delete'
+        self._conn.execute(
+            "INSERT INTO page_fts(page_fts, rowid, text) SELECT 'delete', id, text FROM page_text WHERE doc_id = ?",
+            (doc_id,)
+        )
+        self._conn.execute("DELETE FROM page_text WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM part_numbers WHERE doc_id = ?", (doc_id,))
+
+    def add_pages(
+        self,
+        path: str,
+        pages: Iterable[Tuple[int, str]],
+        source: str = None,
+        pdf_type: str = None,
+        stat: os.stat_result = None
+    ) -> int:
+        """
+        Indexa (ou reindexa) as páginas de um documento numa única transação.
+        `path` identifica o documento (o .txt extraído). Retorna o número de páginas.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id FROM documents WHERE path = ?", (str(path),)).fetchone()
+            if row is not None:
+                self._delete_document(row['id'])
+                doc_id = row['id']
+            else:
+                doc_id = self._conn.execute("INSERT INTO documents (path) VALUES (?)", (str(path),)).lastrowid
+
+            page_count = 0
+            for page, text in pages:
+                rowid = self._conn.execute(
+                    "INSERT INTO page_text (doc_id, page, text) VALUES (?, ?, ?)", (doc_id, page, text)
+                ).lastrowid
+                self._conn.execute("INSERT INTO page_fts (rowid, text) VALUES (?, ?)", (rowid, text))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO part_numbers (part, doc_id, page, raw) VALUES (?, ?, ?, ?)",
+                    [(part, doc_id, page, raw) for part, raw in extract_part_numbers(text).items()]
+                )
+                page_count += 1
+
+            self._conn.execute(
+                "UPDATE documents SET source = ?, pdf_type = ?, page_count = ?, size = ?, mtime_ns = ?, "
+                "indexed_at = ? WHERE id = ?",
+                (
+                    source or Path(path).stem, pdf_type, page_count,
+                    stat.st_size if stat else None, stat.st_mtime_ns if stat else None, time.time(), doc_id
+                )
+            )
+        return page_count
+
+    def add_text_file(self, txt_path: str, source: str = None, pdf_type: str = None, force: bool = True) -> int:
+        """
+        Indexa um .txt extraído (páginas do `.pages.json`, quando houver). Sem `force`,
+        arquivos com o mesmo tamanho e mtime já indexados são pulados (retorna 0).
+        """
+        txt_path = Path(txt_path)
+        stat = txt_path.stat()
+        if not force:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns FROM documents WHERE path = ?", (str(txt_path),)
+                ).fetchone()
+            if row is not None and (row['size'], row['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                return 0
+        pdf_type = pdf_type or txt_path.parent.name
+        return self.add_pages(str(txt_path), read_text_pages(str(txt_path)), source, pdf_type, stat)
+
+    def remove(self, path: str) -> None:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id FROM documents WHERE path = ?", (str(path),)).fetchone()
+            if row is not None:
+                self._delete_document(row['id'])
+                self._conn.execute("DELETE FROM documents WHERE id = ?", (row['id'],))
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """Busca textual (todos os termos; 'termo*' busca por prefixo), ordenada por bm25."""
+        fts_query = _fts_query(query)
+        if not fts_query:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT d.source, d.path, d.pdf_type, p.page,
+                       snippet(page_fts, 0, '[', ']', '…', 12) AS snippet, bm25(page_fts) AS score
+                FROM page_fts
+                JOIN page_text p ON p.id = page_fts.rowid
+                JOIN documents d ON d.id = p.doc_id
+                WHERE page_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+                """,
+                (fts_query, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_part(self, part_number: str, prefix: bool = False, limit: int = 100) -> List[Dict]:
+        """Páginas que citam o código de peça (comparação pela forma normalizada)."""
+        part = normalize_part_number(part_number)
+        if not part:
+            return []
+        if prefix:
+            condition, params = "n.part >= ? AND n.part < ?", (part, part + "\uffff")
+        else:
+            condition, params = "n.part = ?", (part,)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT n.raw AS part_number, d.source, d.path, d.pdf_type, n.page
+                FROM part_numbers n JOIN documents d ON d.id = n.doc_id
+                WHERE {condition}
+                ORDER BY d.source, n.page
+                LIMIT ?
+                """,
+                (*params, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            documents, pages = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(page_count), 0) FROM documents"
+            ).fetchone()
+            parts = self._conn.execute("SELECT COUNT(DISTINCT part) FROM part_numbers").fetchone()[0]
+        return {'documents': documents, 'pages': pages, 'part_numbers': parts}
+
+    def optimize(self) -> None:
+        """Funde os segmentos do índice FTS5 (após cargas grandes)."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO page_fts(page_fts) VALUES ('optimize')")
+
+
+def get_search_index(config: Dict) -> Optional[SearchIndex]:
+    """
+    Retorna o índice de busca do processo atual conforme o config, ou None se desabilitado
+    (`enable_search_index`). O caminho vem de `search_index_path`.
+    """
+    if not config or not config.get("enable_search_index", False):
+        return None
+
+    db_path = config.get("search_index_path", DEFAULT_INDEX_PATH)
+    if db_path not in _indexes:
+        try:
+            _indexes[db_path] = SearchIndex(db_path)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Índice de busca indisponível ({db_path}): {e}")
+            return None
+    return _indexes[db_path]
+
+
+def index_result(result: Dict, config: Dict) -> int:
+    """
+    Indexa o .txt de um arquivo concluído (resultado de `processar_pdf` ou
+    `finalizar_pdf_paginado`). Falhas na indexação não afetam o processamento.
+    """
+    index = get_search_index(config)
+    if index is None or not result.get('output_path'):
+        return 0
+    try:
+        with span('indexing'):
+            pages = index.add_text_file(
+                result['output_path'], source=Path(result.get('path', result['output_path'])).name,
+                pdf_type=result.get('pdf_type')
+            )
+        incr('pages_indexed', pages)
+        return pages
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logger.warning(f"⚠️ Falha ao indexar {result['output_path']}: {e}")
+        return 0
+
+
+def build_index(index: SearchIndex, text_dir: str = DEFAULT_TEXT_DIR, force: bool = False) -> Dict:
+    """Indexa todos os .txt de `text_dir` (subpastas por tipo), pulando os já indexados."""
+    start = time.perf_counter()
+    files = pages = 0
+    for txt_path in sorted(Path(text_dir).rglob("*.txt")):
+        indexed = index.add_text_file(str(txt_path), force=force)
+        if indexed:
+            files += 1
+            pages += indexed
+    index.optimize()
+    elapsed = time.perf_counter() - start
+    logger.info(f"🔎 {files} arquivo(s), {pages} página(s) indexados em {elapsed:.2f}s.")
+    return {'files': files, 'pages': pages, 'seconds': round(elapsed, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de busca do texto extraído dos catálogos")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="arquivo SQLite do índice")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="indexa os .txt extraídos (incremental)")
+    build.add_argument("--text-dir", default=DEFAULT_TEXT_DIR)
+    build.add_argument("--force", action="store_true", help="reindexa também os arquivos inalterados")
+    search = commands.add_parser("search", help="busca textual")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    part = commands.add_parser("part", help="busca por código de peça")
+    part.add_argument("part_number")
+    part.add_argument("--prefix", action="store_true", help="códigos que começam com o valor informado")
+    part.add_argument("--limit", type=int, default=100)
+    commands.add_parser("stats", help="tamanho do índice")
+    args = parser.parse_args()
+
+    index = SearchIndex(args.index)
+    try:
+        if args.command == "build":
+            print(json.dumps(build_index(index, args.text_dir, args.force), ensure_ascii=False))
+            return
+        if args.command == "stats":
+            print(json.dumps(index.stats(), ensure_ascii=False))
+            return
+
+        start = time.perf_counter()
+        if args.command == "search":
+            results = index.search(args.query, args.limit)
+        else:
+            results = index.find_part(args.part_number, prefix=args.prefix, limit=args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for row in results:
+            page = f"p. {row['page']}" if row['page'] else "documento"
+            detail = row.get('snippet') or row.get('part_number')
+            print(f"{row['source']} ({page}): {detail}")
+        print(f"🔎 {len(results)} resultado(s) em {elapsed_ms:.1f} ms")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import hashlib
+import queue
+import re
+import threading
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from src.utils.logger import setup_logger
+from src.utils.metrics import incr, span
+
+logger = setup_logger(__name__)
+
+DEFAULT_DEBUG_DIR = "data/output/debug_images"
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_MAX_WIDTH = 1200
+DEFAULT_EVERY_N_PAGES = 10
+PNG_COMPRESSION = 6
+
+# Instâncias por processo (uma thread de escrita por worker)
+_writers: Dict[str, "DebugImageWriter"] = {}
+
+
+def document_namespace(pdf_path: str) -> str:
+    """Pasta de um documento: nome sanitizado + hash curto do caminho (PDFs homônimos não colidem)."""
+    stem = re.sub(r'[^\w\-]', '', re.sub(r'\s+', '_', Path(pdf_path).stem)) or "documento"
+    digest = hashlib.md5(str(Path(pdf_path).resolve()).encode('utf-8')).hexdigest()[:8]
+    return f"{stem}-{digest}"
+
+
+class DebugImageWriter:
+    """
+    Grava imagens de depuração (páginas pré-processadas para o OCR) numa thread própria,
+    fora do laço de OCR.
+
+    - Amostragem: só a primeira página de cada `every_n_pages` e, com `low_confidence`,
+      as páginas em que o OCR reconheceu pouco texto;
+    - Fila limitada (`queue_size`): com a fila cheia a imagem é descartada (contador
+      `debug_images_dropped`), nunca bloqueando o OCR;
+    - Cada imagem é reduzida para no máximo `max_width` pixels de largura e gravada em PNG
+      em `<base_dir>/<documento>/page_0001.png` (ver `document_namespace`).
+    """
+
+    def __init__(
+        self,
+        base_dir: str = DEFAULT_DEBUG_DIR,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_width: int = DEFAULT_MAX_WIDTH,
+        every_n_pages: int = DEFAULT_EVERY_N_PAGES,
+        low_confidence: bool = True
+    ):
+        self.base_dir = Path(base_dir)
+        self.max_width = max_width
+        self.every_n_pages = every_n_pages
+        self.low_confidence = low_confidence
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = threading.Thread(target=self._run, name="debug-image-writer", daemon=True)
+        self._thread.start()
+
+    def wants(self, page_number: int, low_confidence: bool = False) -> bool:
+        """Se a página (1-based) entra na amostra."""
+        if low_confidence and self.low_confidence:
+            return True
+        return self.every_n_pages > 0 and (page_number - 1) % self.every_n_pages == 0
+
+    def submit(self, pdf_path: str, page_number: int, image, low_confidence: bool = False) -> bool:
+        """Enfileira a imagem da página se ela entrar na amostra. Retorna True se enfileirada."""
+        if image is None or not self.wants(page_number, low_confidence):
+            return False
+        path = self.base_dir / document_namespace(pdf_path) / f"page_{page_number:04d}.png"
+        try:
+            self._queue.put_nowait((path, image))
+        except queue.Full:
+            incr('debug_images_dropped')
+            return False
+        return True
+
+    def _downscale(self, image) -> np.ndarray:
+        image = np.asarray(image)
+        width = image.shape[1]
+        if width <= self.max_width:
+            return image
+        scale = self.max_width / width
+        return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, image = item
+                with span('debug_write'):
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    cv2.imwrite(str(path), self._downscale(image), [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION])
+                incr('debug_images_written')
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao gravar imagem de depuração: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Aguarda a gravação das imagens já enfileiradas."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Grava o que estiver na fila e encerra a thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+def get_debug_writer(config: Dict) -> Optional[DebugImageWriter]:
+    """
+    Retorna o gravador de imagens de depuração do processo atual, ou None se desabilitado
+    (`enable_debug`). Opções: `debug_dir`, `debug_every_n_pages`, `debug_low_confidence`,
+    `debug_max_width` e `debug_queue_size`.
+    """
+    if not config or not config.get("enable_debug", False):
+        return None
+
+    base_dir = config.get("debug_dir", DEFAULT_DEBUG_DIR)
+    if base_dir not in _writers:
+        writer = DebugImageWriter(
+            base_dir,
+            queue_size=config.get("debug_queue_size", DEFAULT_QUEUE_SIZE),
+            max_width=config.get("debug_max_width", DEFAULT_MAX_WIDTH),
+            every_n_pages=config.get("debug_every_n_pages", DEFAULT_EVERY_N_PAGES),
+            low_confidence=config.get("debug_low_confidence", True),
+        )
+        # Finalize (e não atexit): também roda ao encerrar os workers do multiprocessing
+        Finalize(writer, writer.close, exitpriority=10)
+        _writers[base_dir] = writer
+    return _writers[base_dir]
@@ -0,0 +1,264 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+import numpy as np
+import pdfplumber
+from PyPDF2 import PdfReader
+from src.utils.logger import setup_logger
+from src.utils.metrics import incr
+
+logger = setup_logger(__name__)
+
+# Limite do cache de imagens embutidas (bytes codificados) por documento
+DEFAULT_MAX_CACHED_IMAGE_BYTES = 32 * 1024 * 1024
+# PDFs até este tamanho ficam abertos (em memória) entre tarefas do mesmo worker
+DEFAULT_WORKER_DOCUMENT_MB = 256
+
+# Documento aberto por `worker_context`, por thread (workers de processo têm uma só)
+_worker_state = threading.local()
+
+
+class _PixmapBuffer:
+    """
+    Expõe os pixels de um `fitz.Pixmap` a NumPy (`__array_interface__`) sem cópia.
+
+    O memoryview de `pix.samples_mv` não mantém o pixmap vivo. Este objeto é o `base`
+    do array (e de todas as vistas derivadas dele) e guarda a referência ao pixmap.
+    """
+
+    def __init__(self, pix: fitz.Pixmap):
+        self.pixmap = pix
+        self.__array_interface__ = {
+            'version': 3,
+            'shape': (pix.height, pix.width),
+            'typestr': '|u1',
+            'strides': (pix.stride, 1),
+            # Somente leitura: o buffer pertence ao MuPDF e pode estar no cache de pixmaps
+            'data': (pix.samples_ptr, True),
+        }
+
+
+def render_gray(page: fitz.Page, dpi: int = 300) -> np.ndarray:
+    """
+    Renderiza a página direto em cinza (1 byte por pixel) e devolve um array 2-D
+    (altura, largura) apoiado no próprio buffer do pixmap: a única cópia da página é a
+    que o MuPDF rasterizou, um terço dos bytes de um pixmap RGB.
+    """
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    return np.asarray(_PixmapBuffer(pix))
+
+
+class PDFDocumentContext:
+    """
+    Contexto de análise de um único PDF.
+
+    Abre o documento uma única vez (PyMuPDF) e guarda, sob demanda, os artefatos
+    por página usados pela classificação, detecção de tabelas e extração:
+    texto, lista de imagens, imagens embutidas e pixmaps renderizados.
+    Handles de pdfplumber e PyPDF2 também são criados apenas se forem pedidos.
+
+    Uso:
+        with PDFDocumentContext(pdf_path, config) as context:
+            classifier.classify(pdf_path, context=context)
+    """
+
+    def __init__(
+        self,
+        pdf_path: str,
+        config: Optional[Dict] = None,
+        max_cached_pixmaps: int = 2,
+        max_cached_image_bytes: int = DEFAULT_MAX_CACHED_IMAGE_BYTES,
+        in_memory: bool = False
+    ):
+        self.pdf_path = str(pdf_path)
+        self.config = config or {}
+        self.in_memory = in_memory
+        self.max_cached_pixmaps = max_cached_pixmaps
+        self.max_cached_image_bytes = max_cached_image_bytes
+        self._data: Optional[bytes] = None
+        self._doc = None
+        self._plumber = None
+        self._pypdf2_file = None
+        self._pypdf2_reader = None
+        self._text_cache: Dict[int, str] = {}
+        self._images_cache: Dict[int, List[tuple]] = {}
+        self._extracted_images: "OrderedDict[int, dict]" = OrderedDict()
+        self._extracted_image_bytes = 0
+        self._pixmap_cache: "OrderedDict[tuple, fitz.Pixmap]" = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _bytes(self) -> bytes:
+        """Conteúdo do PDF (modo `in_memory`), lido uma vez e compartilhado pelos handles."""
+        if self._data is None:
+            self._data = Path(self.pdf_path).read_bytes()
+            incr('pdf_bytes_read', len(self._data))
+        return self._data
+
+    def _open_source(self):
+        """Caminho do PDF ou, no modo `in_memory`, um buffer sobre os bytes já lidos."""
+        return io.BytesIO(self._bytes()) if self.in_memory else self.pdf_path
+
+    @property
+    def doc(self) -> fitz.Document:
+        """
+        Documento PyMuPDF, aberto na primeira utilização. Com `in_memory`, o PDF é lido
+        inteiro e aberto a partir dos bytes, sem manter o arquivo aberto (vale também
+        para `plumber` e `pypdf2_reader`).
+        """
+        if self._doc is None:
+            if self.in_memory:
+                self._doc = fitz.open(stream=self._bytes(), filetype="pdf")
+            else:
+                self._doc = fitz.open(self.pdf_path)
+                incr('pdf_bytes_read', os.path.getsize(self.pdf_path))
+        return self._doc
+
+    @property
+    def plumber(self):
+        """Handle pdfplumber, aberto apenas quando necessário (ex.: detecção de tabelas)."""
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(self._open_source())
+        return self._plumber
+
+    @property
+    def pypdf2_reader(self) -> PdfReader:
+        """Leitor PyPDF2, aberto apenas quando necessário."""
+        if self._pypdf2_reader is None:
+            source = self._open_source()
+            self._pypdf2_file = source if self.in_memory else open(source, 'rb')
+            self._pypdf2_reader = PdfReader(self._pypdf2_file)
+        return self._pypdf2_reader
+
+    @property
+    def page_count(self) -> int:
+        return len(self.doc)
+
+    def page(self, page_index: int) -> fitz.Page:
+        return self.doc[page_index]
+
+    def page_text(self, page_index: int) -> str:
+        """Texto selecionável da página (PyMuPDF), com cache."""
+        if page_index not in self._text_cache:
+            self._text_cache[page_index] = self.doc[page_index].get_text("text")
+        return self._text_cache[page_index]
+
+    def page_images(self, page_index: int) -> List[tuple]:
+        """Lista de imagens da página (`page.get_images(full=True)`), com cache."""
+        if page_index not in self._images_cache:
+            self._images_cache[page_index] = self.doc[page_index].get_images(full=True)
+        return self._images_cache[page_index]
+
+    def extract_image(self, xref: int) -> dict:
+        """
+        Imagem embutida pelo xref. Imagens repetidas entre páginas são extraídas uma vez
+        enquanto estiverem no cache, limitado a `max_cached_image_bytes` (as menos usadas
+        recentemente saem primeiro; uma imagem maior que o limite não é guardada).
+        """
+        if xref in self._extracted_images:
+            self._extracted_images.move_to_end(xref)
+            return self._extracted_images[xref]
+
+        image = self.doc.extract_image(xref)
+        size = len(image.get('image') or b'')
+        if size <= self.max_cached_image_bytes:
+            self._extracted_images[xref] = image
+            self._extracted_image_bytes += size
+            while self._extracted_image_bytes > self.max_cached_image_bytes:
+                _, evicted = self._extracted_images.popitem(last=False)
+                self._extracted_image_bytes -= len(evicted.get('image') or b'')
+        return image
+
+    def page_pixmap(self, page_index: int, dpi: int = 300) -> fitz.Pixmap:
+        """
+        Renderiza a página em RGB. Mantém apenas os `max_cached_pixmaps` mais recentes,
+        pois um pixmap de 300 DPI ocupa dezenas de MB.
+        """
+        key = (page_index, dpi)
+        if key in self._pixmap_cache:
+            self._pixmap_cache.move_to_end(key)
+            return self._pixmap_cache[key]
+
+        pix = self.doc[page_index].get_pixmap(dpi=dpi)
+        if self.max_cached_pixmaps > 0:
+            self._pixmap_cache[key] = pix
+            while len(self._pixmap_cache) > self.max_cached_pixmaps:
+                self._pixmap_cache.popitem(last=False)
+        return pix
+
+    def page_gray(self, page_index: int, dpi: int = 300) -> np.ndarray:
+        """Página em cinza para o OCR (ver `render_gray`); sem cache, cada raster é usado uma vez."""
+        return render_gray(self.doc[page_index], dpi=dpi)
+
+    def close(self) -> None:
+        """Libera todos os handles abertos e os caches."""
+        self._text_cache.clear()
+        self._images_cache.clear()
+        self._extracted_images.clear()
+        self._extracted_image_bytes = 0
+        self._pixmap_cache.clear()
+        for closer in (self._plumber, self._pypdf2_file, self._doc):
+            if closer is None:
+                continue
+            try:
+                closer.close()
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao fechar handle de {self.pdf_path}: {e}")
+        self._data = None
+        self._doc = None
+        self._plumber = None
+        self._pypdf2_file = None
+        self._pypdf2_reader = None
+
+
+def release_worker_context() -> None:
+    """Fecha o documento mantido por `worker_context` na thread atual."""
+    cached = getattr(_worker_state, 'cached', None)
+    _worker_state.cached = None
+    if cached is not None:
+        cached[1].close()
+
+
+@contextmanager
+def worker_context(pdf_path: str, config: Optional[Dict] = None):
+    """
+    Contexto para uma tarefa de intervalo de páginas num worker. Blocos do mesmo PDF que
+    caem no mesmo worker reaproveitam o documento já aberto (xref, árvore de páginas e
+    texto em cache) em vez de reabri-lo a cada bloco; um PDF diferente (ou o mesmo
+    arquivo alterado) substitui o anterior.
+
+    O contexto é aberto a partir dos bytes (`in_memory`), inclusive os handles de
+    pdfplumber e PyPDF2: nenhum handle de arquivo fica aberto entre tarefas, e o PDF pode
+    ser movido pela finalização em outro worker. PDFs maiores que `worker_document_cache_mb` são abertos e fechados a cada tarefa.
+    """
+    config = config or {}
+    stat = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+    cached = getattr(_worker_state, 'cached', None)
+    if cached is not None and cached[0] == key:
+        incr('document_context_reused')
+        context = cached[1]
+    else:
+        release_worker_context()
+        if stat.st_size > config.get('worker_document_cache_mb', DEFAULT_WORKER_DOCUMENT_MB) * 1024 * 1024:
+            with PDFDocumentContext(pdf_path, config, max_cached_pixmaps=0) as context:
+                yield context
+            return
+        context = PDFDocumentContext(pdf_path, config, max_cached_pixmaps=0, in_memory=True)
+        _worker_state.cached = (key, context)
+    try:
+        yield context
+    except BaseException:
+        # Um bloco que falhou não deixa o documento aberto para os seguintes
+        release_worker_context()
+        raise
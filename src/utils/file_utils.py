@@ -1,7 +1,36 @@
 import os
 import shutil
+from pathlib import Path
+
+from src.utils.metrics import incr, span
 
 def move_file(src: str, dst: str) -> None:
     """Move arquivo criando diretórios necessários"""
     os.makedirs(os.path.dirname(dst), exist_ok=True)
-    shutil.move(src, dst)
\ No newline at end of file
+    shutil.move(src, dst)
+
+def write_text_atomic(path, text: str, encoding: str = 'utf-8', errors: str = 'strict') -> None:
+    """
+    Grava o texto num arquivo temporário no mesmo diretório e o renomeia para o destino.
+    Uma execução interrompida nunca deixa um .txt parcial no lugar do arquivo final.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with span('write'):
+            with open(tmp_path, 'w', encoding=encoding, errors=errors) as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            incr('bytes_written', tmp_path.stat().st_size)
+            os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+def discard_page_map(txt_path) -> None:
+    """
+    Remove o `<nome>.pages.json` deixado por uma execução com roteamento por página: os
+    intervalos dele não valem para um .txt gravado sem roteamento.
+    """
+    Path(txt_path).with_suffix('.pages.json').unlink(missing_ok=True)
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_MANIFEST_PATH = "data/interim/job_manifest.sqlite"
+
+# Chaves do config que só afetam desempenho/diagnóstico, não o resultado da extração
+NON_RESULT_CONFIG_KEYS = {
+    'max_workers', 'page_chunk_size', 'parallel_page_threshold', 'enable_debug',
+    'debug_dir', 'debug_every_n_pages', 'debug_low_confidence',
+    'enable_ocr_cache', 'ocr_cache_path', 'ocr_cache_max_mb',
+    'enable_manifest', 'manifest_path', 'quarantine_unprocessable',
+    'small_file_batch_seconds', 'max_batch_files', 'tasks_per_worker', 'worker_document_cache_mb',
+    'log_level', 'log_format', 'log_file', 'log_max_mb', 'log_backup_count',
+    'enable_metrics', 'metrics_dir', 'api_max_jobs', 'api_page_chunk_size', 'api_upload_dir',
+    'api_input_dir', 'api_max_upload_mb', 'enable_search_index', 'search_index_path',
+    'enable_page_fingerprints', 'page_fingerprint_path', 'page_fingerprint_max_age_days',
+    'cpu_budget', 'memory_budget_mb', 'text_workers', 'ocr_workers', 'ocr_threads_per_worker',
+    'ocr_pool_share', 'text_worker_memory_mb', 'ocr_worker_memory_mb',
+    'watch_poll_interval', 'watch_settle_seconds', 'watch_max_queue',
+    'debug_max_width', 'debug_queue_size', 'api_keep_finished_jobs', 'entities_dir',
+}
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def config_hash(config: Dict) -> str:
+    """Hash das opções do config que influenciam o texto extraído."""
+    relevant = {k: v for k, v in sorted(config.items()) if k not in NON_RESULT_CONFIG_KEYS}
+    raw = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class JobManifest:
+    """
+    Diário persistente do processamento em lote (SQLite).
+
+    Cada arquivo é identificado pelo hash do conteúdo e pelo hash do config. O diário
+    registra classificação, extrator, saída, tempos e status ('running', 'done',
+    'failed'). Arquivos já concluídos com o mesmo conteúdo e config são pulados em
+    execuções seguintes; entradas 'running' deixadas por uma execução interrompida
+    são reprocessadas.
+
+    Os hashes de conteúdo ficam guardados por (caminho, tamanho, mtime), então uma
+    nova execução sobre um arquivo grande de PDFs já vistos não relê os arquivos.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_MANIFEST_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                content_hash TEXT NOT NULL,
+                config_hash TEXT NOT NULL,
+                file_name TEXT NOT NULL,
+                source_path TEXT,
+                status TEXT NOT NULL,
+                pdf_type TEXT,
+                extractor TEXT,
+                output_path TEXT,
+                started_at REAL,
+                finished_at REAL,
+                duration REAL,
+                timings TEXT,
+                error TEXT,
+                PRIMARY KEY (content_hash, config_hash)
+            );
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            """
+        )
+        # Manifestos criados antes do modelo de custo não têm a contagem de páginas
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if 'page_count' not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN page_count INTEGER")
+        self._conn.commit()
+        self._deferred = False
+
+    def _commit(self) -> None:
+        if not self._deferred:
+            self._conn.commit()
+
+    @contextmanager
+    def batch(self):
+        """Agrupa várias escritas numa única transação (ex.: varredura inicial de milhares de arquivos)."""
+        self._deferred = True
+        try:
+            yield self
+        finally:
+            self._deferred = False
+            self._conn.commit()
+
+    def file_hash(self, pdf_path) -> str:
+        """SHA-256 do conteúdo, reaproveitado enquanto tamanho e mtime não mudarem."""
+        path = Path(pdf_path).resolve()
+        stat = path.stat()
+        row = self._conn.execute(
+            "SELECT content_hash FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (str(path), stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row is not None:
+            return row['content_hash']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+            (str(path), stat.st_size, stat.st_mtime_ns, content_hash)
+        )
+        self._commit()
+        return content_hash
+
+    def remember_path(self, old_path, new_path) -> None:
+        """Atualiza o cache de hashes depois que o arquivo foi movido (o rename preserva o mtime)."""
+        new_path = str(Path(new_path).resolve())
+        self._conn.execute("DELETE FROM file_hashes WHERE path = ?", (new_path,))
+        self._conn.execute(
+            "UPDATE file_hashes SET path = ? WHERE path = ?", (new_path, str(Path(old_path).resolve()))
+        )
+        self._commit()
+
+    def get(self, content_hash: str, cfg_hash: str) -> Optional[Dict]:
+        row = self._conn.execute(
+            "SELECT * FROM jobs WHERE content_hash = ? AND config_hash = ?", (content_hash, cfg_hash)
+        ).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record['timings'] = json.loads(record['timings']) if record['timings'] else {}
+        return record
+
+    def completed(self, content_hash: str, cfg_hash: str) -> Optional[Dict]:
+        """Registro concluído cuja saída ainda existe em disco; None se precisar processar."""
+        record = self.get(content_hash, cfg_hash)
+        if record is None or record['status'] != 'done':
+            return None
+        if record['output_path'] and not Path(record['output_path']).exists():
+            return None
+        return record
+
+    def mark_running(self, content_hash: str, cfg_hash: str, pdf_path) -> None:
+        self._conn.execute(
+            "INSERT INTO jobs (content_hash, config_hash, file_name, source_path, status, started_at) "
+            "VALUES (?, ?, ?, ?, 'running', ?) "
+            "ON CONFLICT(content_hash, config_hash) DO UPDATE SET "
+            "file_name = excluded.file_name, source_path = excluded.source_path, status = 'running', "
+            "started_at = excluded.started_at, finished_at = NULL, duration = NULL, error = NULL",
+            (content_hash, cfg_hash, Path(pdf_path).name, str(pdf_path), time.time())
+        )
+        self._commit()
+
+    def mark_finished(self, content_hash: str, cfg_hash: str, result: Dict) -> None:
+        """
+        Registra o resultado de processar_pdf/finalizar_pdf_paginado:
+        chaves 'status', 'pdf_type', 'extractor', 'output_path', 'page_count', 'timings' e 'error'.
+        """
+        now = time.time()
+        record = self.get(content_hash, cfg_hash)
+        started_at = record['started_at'] if record and record['started_at'] else now
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, pdf_type = ?, extractor = ?, output_path = ?, page_count = ?, "
+            "finished_at = ?, duration = ?, timings = ?, error = ? "
+            "WHERE content_hash = ? AND config_hash = ?",
+            (
+                result.get('status', 'failed'), result.get('pdf_type'), result.get('extractor'),
+                result.get('output_path'), result.get('page_count'), now, now - started_at,
+                json.dumps(result.get('timings') or {}), result.get('error'),
+                content_hash, cfg_hash
+            )
+        )
+        self._commit()
+
+    def cost_samples(self, limit: int = 500) -> List[Tuple[str, int, float]]:
+        """
+        Amostras (tipo, páginas, segundos de extração) das últimas `limit` execuções
+        concluídas, para o modelo de custo do agendador. A espera na fila não entra:
+        só os tempos medidos no worker ('extract' e 'tables').
+        """
+        rows = self._conn.execute(
+            "SELECT pdf_type, page_count, timings FROM jobs "
+            "WHERE status = 'done' AND page_count > 0 AND timings IS NOT NULL "
+            "ORDER BY finished_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        samples = []
+        for row in rows:
+            timings = json.loads(row['timings'])
+            if 'extract' in timings:
+                samples.append((row['pdf_type'], row['page_count'], timings['extract'] + timings.get('tables', 0.0)))
+        return samples
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,5 +1,12 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
+from typing import Callable, Dict, List, Optional
 import sys
 
 # Adiciona um nível customizado "SUCCESS"
@@ -9,42 +16,234 @@ def success(self, message, *args, **kwargs):
         self._log(25, message, args, kwargs)
 logging.Logger.success = success
 
-def setup_logger(name: str, log_file: str = "data/output/processing.log") -> logging.Logger:
+DEFAULT_LOG_FILE = "data/output/processing.log"
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Estado do processo atual: loggers criados por setup_logger (com o arquivo de cada um),
+# handlers diretos (compartilhados por arquivo) e, com o listener ativo, os QueueHandlers
+# que os substituem (um por arquivo próprio, além do padrão)
+_logger_files: Dict[str, str] = {}
+_direct_handlers: Dict[str, List[logging.Handler]] = {}
+_queue_handler: Optional[logging.Handler] = None
+_target_queue_handlers: Dict[str, logging.Handler] = {}
+_level = logging.INFO
+_queue = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_handlers: List[logging.Handler] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro (para ingestão em ferramentas de log)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'process': record.process,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _TargetQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que leva ao listener o arquivo próprio do logger de origem."""
+
+    def __init__(self, queue, log_file: str):
+        super().__init__(queue)
+        self.log_file = log_file
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.log_file = self.log_file
+        return record
+
+
+class _RoutingFileHandler(logging.Handler):
+    """No listener: grava cada registro no arquivo do config ou no arquivo próprio do logger."""
+
+    def __init__(self, default: logging.Handler, build: Callable[[str], logging.Handler]):
+        super().__init__()
+        self.default = default
+        self.build = build
+        self.targets: Dict[str, logging.Handler] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        target = getattr(record, 'log_file', None)
+        if target is None:
+            self.default.handle(record)
+            return
+        if target not in self.targets:
+            self.targets[target] = self.build(target)
+        self.targets[target].handle(record)
+
+    def close(self) -> None:
+        for handler in (self.default, *self.targets.values()):
+            handler.close()
+        super().close()
+
+
+def _formatter(log_format: str) -> logging.Formatter:
+    return JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+
+
+def _file_handler(log_file: str, log_format: str = 'text', max_mb: float = 0, backup_count: int = 0) -> logging.Handler:
+    """Arquivo de log (cria as pastas); com `max_mb` > 0 o arquivo é rotacionado."""
+    Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+    if max_mb and max_mb > 0:
+        handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=int(max_mb * 1024 * 1024), backupCount=backup_count, encoding='utf-8'
+        )
+    else:
+        handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    handler.setFormatter(_formatter(log_format))
+    return handler
+
+
+def _build_handlers(log_file: str, log_format: str = 'text', max_mb: float = 0, backup_count: int = 0) -> List[logging.Handler]:
+    """Console (stdout) e arquivo."""
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(_formatter(log_format))
+    return [console_handler, _file_handler(log_file, log_format, max_mb, backup_count)]
+
+
+def _own_file(log_file) -> Optional[str]:
+    """Arquivo próprio do logger; None para o padrão, que segue o 'log_file' do listener."""
+    return None if Path(log_file) == Path(DEFAULT_LOG_FILE) else str(log_file)
+
+
+def _handlers_for(log_file: str) -> List[logging.Handler]:
+    if _queue_handler is not None:
+        target = _own_file(log_file)
+        if target is None:
+            return [_queue_handler]
+        if target not in _target_queue_handlers:
+            _target_queue_handlers[target] = _TargetQueueHandler(_queue_handler.queue, target)
+        return [_target_queue_handlers[target]]
+    # Sem listener: um único par de handlers por arquivo no processo, não um por módulo
+    log_file = str(log_file)
+    if log_file not in _direct_handlers:
+        _direct_handlers[log_file] = _build_handlers(log_file)
+    return _direct_handlers[log_file]
+
+
+def _apply(logger: logging.Logger, log_file: str = DEFAULT_LOG_FILE) -> None:
+    logger.setLevel(_level)
+    logger.handlers[:] = _handlers_for(log_file)
+    # Impede propagação para loggers pais
+    logger.propagate = False
+
+
+def setup_logger(name: str, log_file: str = DEFAULT_LOG_FILE) -> logging.Logger:
     """
     Configura um logger com saída para console e arquivo.
-    
+
+    Com o listener ativo (`start_logging`, no processo principal, ou
+    `configure_worker_logging`, nos workers), os registros vão para a fila e são
+    gravados por um único handler; caso contrário, são gravados diretamente.
+
     Args:
         name: Nome do logger (geralmente __name__)
-        log_file: Caminho do arquivo de log (criará pastas automaticamente)
+        log_file: Caminho do arquivo de log sem o listener (criará pastas automaticamente)
     """
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Cria diretório se não existir
-    log_path = Path(log_file)
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Formato padrão
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
-    # Handler para console (stdout)
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    
-    # Handler para arquivo (append)
-    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
-    
-    # Remove handlers antigos para evitar duplicação
-    if logger.hasHandlers():
-        logger.handlers.clear()
-    
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
-    # Impede propagação para loggers pais
-    logger.propagate = False
-    
+    _logger_files[name] = str(log_file)
+    _apply(logger, log_file)
     return logger
+
+
+def _reapply_all() -> None:
+    """Troca os handlers de todos os loggers (listener iniciado ou parado), cada um com o seu arquivo."""
+    _target_queue_handlers.clear()
+    for name, log_file in _logger_files.items():
+        _apply(logging.getLogger(name), log_file)
+
+
+def _parse_level(level) -> int:
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    return value if isinstance(value, int) else logging.INFO
+
+
+def start_logging(config: Dict = None) -> bool:
+    """
+    Inicia o listener de log do processo principal: os registros de todos os processos
+    chegam por uma fila (QueueHandler) e só a thread do QueueListener escreve no console
+    e nos arquivos. Uma thread basta (em vez de um processo à parte): os workers só fazem
+    `put` na fila e nunca esperam pela escrita.
+
+    Opções do config: 'log_level' (ex.: 'INFO'; 'DEBUG' mostra o detalhe por página),
+    'log_format' ('text' ou 'json'), 'log_file', 'log_max_mb' e 'log_backup_count'
+    (rotação do arquivo).
+
+    :return: True se o listener foi iniciado agora; False se já estava ativo.
+    """
+    global _queue, _listener, _listener_handlers, _queue_handler, _level
+    if _listener is not None:
+        return False
+    config = config or {}
+    _level = _parse_level(config.get('log_level', 'INFO'))
+    options = dict(
+        log_format=config.get('log_format', 'text'),
+        max_mb=config.get('log_max_mb', 20),
+        backup_count=config.get('log_backup_count', 5),
+    )
+    console_handler, file_handler = _build_handlers(config.get('log_file', DEFAULT_LOG_FILE), **options)
+    # Loggers com arquivo próprio (`setup_logger(..., log_file=...)`) continuam gravando nele
+    _listener_handlers = [
+        console_handler, _RoutingFileHandler(file_handler, lambda target: _file_handler(target, **options))
+    ]
+    _queue = multiprocessing.Queue(-1)
+    _listener = logging.handlers.QueueListener(_queue, *_listener_handlers, respect_handler_level=True)
+    _listener.start()
+    _queue_handler = logging.handlers.QueueHandler(_queue)
+    _reapply_all()
+    atexit.register(stop_logging)
+    return True
+
+
+def stop_logging() -> None:
+    """Esvazia a fila, encerra o listener e volta aos handlers diretos."""
+    global _queue, _listener, _listener_handlers, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener_handlers:
+        handler.close()
+    _queue.close()
+    _queue.join_thread()
+    _queue = _listener = _queue_handler = None
+    _listener_handlers = []
+    _reapply_all()
+
+
+def logging_queue():
+    """Fila e nível do listener ativo, para repassar aos workers; (None, nível) sem listener."""
+    return _queue, _level
+
+
+def configure_worker_logging(queue, level=logging.INFO) -> None:
+    """
+    Inicializador dos workers: troca os handlers de todos os loggers do processo por um
+    QueueHandler para a fila do listener. Sem fila, mantém os handlers diretos.
+    """
+    global _queue_handler, _level
+    if queue is None:
+        return
+    _level = _parse_level(level)
+    _queue_handler = logging.handlers.QueueHandler(queue)
+    _reapply_all()
+
+
+@contextmanager
+def log_listener(config: Dict = None):
+    """Mantém o listener ativo durante o bloco (se já estiver ativo, apenas o reaproveita)."""
+    started = start_logging(config)
+    try:
+        yield
+    finally:
+        if started:
+            stop_logging()
@@ -0,0 +1,121 @@
+import os
+import sys
+from typing import Optional
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Pico de memória residente (RSS) do processo atual em MB.
+    Retorna None se a plataforma não expuser essa informação.
+    """
+    try:
+        if os.name == "nt":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return None
+            return counters.PeakWorkingSetSize / (1024 * 1024)
+
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta em KB; macOS em bytes
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return peak / divisor
+    except Exception:
+        return None
+
+
+def image_nbytes(image) -> int:
+    """Bytes ocupados pelos pixels de um array NumPy ou de uma imagem PIL."""
+    if hasattr(image, "nbytes"):
+        return int(image.nbytes)
+    if hasattr(image, "size") and hasattr(image, "getbands"):
+        width, height = image.size
+        return width * height * len(image.getbands())
+    return 0
+
+
+class RasterMemoryTracker:
+    """
+    Acompanha quantos bytes de imagens rasterizadas estão vivos ao mesmo tempo
+    durante o processamento de um documento e guarda o pico.
+    """
+
+    def __init__(self):
+        self.current_bytes = 0
+        self.peak_bytes = 0
+
+    def hold(self, *images) -> None:
+        self.current_bytes += sum(image_nbytes(image) for image in images)
+        self.peak_bytes = max(self.peak_bytes, self.current_bytes)
+
+    def release(self, *images) -> None:
+        self.current_bytes = max(0, self.current_bytes - sum(image_nbytes(image) for image in images))
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_bytes / (1024 * 1024)
+
+    def summary(self) -> str:
+        rss = peak_rss_mb()
+        rss_text = f"{rss:.1f} MB" if rss is not None else "indisponível"
+        return f"pico de imagens em memória: {self.peak_mb:.1f} MB, pico de RSS do processo: {rss_text}"
+
+
+def available_memory_mb() -> Optional[float]:
+    """
+    Memória física disponível no sistema em MB (MemAvailable no Linux).
+    Retorna None se a plataforma não expuser essa informação.
+    """
+    try:
+        if os.name == "nt":
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(status)
+            if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return None
+            return status.ullAvailPhys / (1024 * 1024)
+
+        if os.path.exists("/proc/meminfo"):
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) / 1024
+            return None
+
+        # macOS e outros Unix: páginas físicas totais (sem distinguir as livres)
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / (1024 * 1024)
+    except Exception:
+        return None
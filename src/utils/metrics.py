@@ -0,0 +1,229 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_METRICS_DIR = "data/output/metrics"
+PROMETHEUS_PREFIX = "catalogos"
+
+class Metrics:
+    """
+    Registro de métricas de um processo: spans (contagem, tempo total e máximo por
+    etapa: classify, table_detection, rasterize, preprocess, ocr, text_extraction,
+    write) e contadores (chamadas de OCR, acertos de cache, bytes lidos...).
+
+    Spans medidos com `page` também são somados por página (tempo de cada etapa em
+    cada página do arquivo da tarefa), em `pages` no snapshot.
+
+    Cada worker acumula no seu próprio registro (`metrics`) e devolve um `drain()` junto
+    com o resultado da tarefa; o processo principal junta os snapshots com `merge()`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: Dict[str, list] = {}
+        self.counters: Dict[str, float] = {}
+        self.pages: Dict[int, Dict[str, float]] = {}
+
+    @contextmanager
+    def span(self, name: str, page: Optional[int] = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, page)
+
+    def observe(self, name: str, seconds: float, page: Optional[int] = None) -> None:
+        with self._lock:
+            stats = self.spans.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            if page is not None:
+                stages = self.pages.setdefault(int(page), {})
+                stages[name] = stages.get(name, 0.0) + seconds
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _snapshot(self) -> Dict:
+        snapshot = {
+            'spans': {
+                name: {'count': count, 'total_seconds': round(total, 6), 'max_seconds': round(peak, 6)}
+                for name, (count, total, peak) in self.spans.items()
+            },
+            'counters': dict(self.counters),
+        }
+        if self.pages:
+            # Chaves em texto, como ficam depois de passar pelo JSON
+            snapshot['pages'] = {
+                str(page): {name: round(seconds, 6) for name, seconds in stages.items()}
+                for page, stages in sorted(self.pages.items())
+            }
+        return snapshot
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return self._snapshot()
+
+    def drain(self) -> Dict:
+        """Snapshot seguido de reset (métricas de uma tarefa, enviadas ao processo principal)."""
+        with self._lock:
+            snapshot = self._snapshot()
+            self.spans.clear()
+            self.counters.clear()
+            self.pages.clear()
+        return snapshot
+
+    def merge(self, snapshot: Optional[Dict], pages: bool = True) -> None:
+        """Soma um snapshot; com `pages=False` (totais de vários arquivos), ignora os tempos por página."""
+        if not snapshot:
+            return
+        with self._lock:
+            for name, stats in snapshot.get('spans', {}).items():
+                current = self.spans.setdefault(name, [0, 0.0, 0.0])
+                current[0] += stats['count']
+                current[1] += stats['total_seconds']
+                current[2] = max(current[2], stats['max_seconds'])
+            for name, value in snapshot.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for page, page_stages in (snapshot.get('pages', {}) if pages else {}).items():
+                stages = self.pages.setdefault(int(page), {})
+                for name, seconds in page_stages.items():
+                    stages[name] = stages.get(name, 0.0) + seconds
+
+
+# Registro do processo atual
+metrics = Metrics()
+
+
+def span(name: str, page: Optional[int] = None):
+    """
+    Mede o bloco como um span da etapa `name` no registro do processo; com `page`
+    (1-based), também no tempo daquela página.
+    """
+    return metrics.span(name, page)
+
+
+def incr(name: str, value: float = 1) -> None:
+    metrics.incr(name, value)
+
+
+def stage_seconds(snapshot: Dict) -> Dict[str, float]:
+    """Tempo total por etapa de um snapshot."""
+    return {name: stats['total_seconds'] for name, stats in snapshot.get('spans', {}).items()}
+
+
+def prometheus_text(snapshot: Dict, gauges: Dict[str, float] = None, prefix: str = PROMETHEUS_PREFIX) -> str:
+    """Formato de texto do Prometheus (endpoint /metrics ou textfile collector)."""
+    lines = [
+        f"# HELP {prefix}_stage_seconds_total Tempo gasto por etapa do pipeline.",
+        f"# TYPE {prefix}_stage_seconds_total counter",
+    ]
+    spans = snapshot.get('spans', {})
+    for name in sorted(spans):
+        lines.append(f'{prefix}_stage_seconds_total{{stage="{name}"}} {spans[name]["total_seconds"]}')
+    lines += [
+        f"# HELP {prefix}_stage_calls_total Execuções de cada etapa (arquivos ou páginas).",
+        f"# TYPE {prefix}_stage_calls_total counter",
+    ]
+    for name in sorted(spans):
+        lines.append(f'{prefix}_stage_calls_total{{stage="{name}"}} {spans[name]["count"]}')
+    lines += [
+        f"# HELP {prefix}_stage_seconds_max Maior duração de uma execução da etapa.",
+        f"# TYPE {prefix}_stage_seconds_max gauge",
+    ]
+    for name in sorted(spans):
+        lines.append(f'{prefix}_stage_seconds_max{{stage="{name}"}} {spans[name]["max_seconds"]}')
+    for name, value in sorted(snapshot.get('counters', {}).items()):
+        metric = f"{prefix}_{name}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, value in sorted((gauges or {}).items()):
+        metric = f"{prefix}_{name}"
+        lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_run_summary(summary: Dict, metrics_dir: str = DEFAULT_METRICS_DIR) -> Path:
+    """
+    Grava o resumo da execução em `run_summary.json` (e uma cópia com data/hora) e as
+    métricas em `metrics.prom`, no formato do textfile collector do Prometheus.
+    """
+    # Importado aqui: file_utils usa este módulo para medir as escritas
+    from src.utils.file_utils import write_text_atomic
+
+    output_dir = Path(metrics_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(summary.get('started_at', time.time())))
+    write_text_atomic(output_dir / f"run_{stamp}.json", text)
+    write_text_atomic(output_dir / "run_summary.json", text)
+    gauges = {
+        'run_wall_seconds': summary.get('wall_seconds', 0),
+        'run_pages_per_second': summary.get('pages_per_second', 0),
+        'run_files': summary.get('files', 0),
+        'run_pages': summary.get('pages', 0),
+    }
+    write_text_atomic(output_dir / "metrics.prom", prometheus_text(summary['metrics'], gauges))
+    logger.info(f"📊 Resumo da execução salvo em {output_dir / 'run_summary.json'}")
+    return output_dir / "run_summary.json"
+
+
+class RunSummary:
+    """
+    Resumo de uma execução do lote: junta as métricas devolvidas pelos workers (no total
+    e por arquivo) e os resultados de cada arquivo (status, tipo e páginas). Arquivos são
+    identificados pelo caminho completo, e os tempos por página ficam só no arquivo.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.metrics = Metrics()
+        self.files: Dict[str, Dict] = {}
+        self._file_metrics: Dict[str, Metrics] = {}
+
+    def add_metrics(self, pdf_path: str, snapshot: Optional[Dict]) -> None:
+        if not snapshot:
+            return
+        self.metrics.merge(snapshot, pages=False)
+        self._file_metrics.setdefault(str(pdf_path), Metrics()).merge(snapshot)
+
+    def add_result(self, pdf_path: str, result: Dict) -> None:
+        """Registra o resultado final de um arquivo (retira as métricas do dicionário)."""
+        self.add_metrics(pdf_path, result.pop('metrics', None))
+        self.files[str(pdf_path)] = {
+            'status': result.get('status'),
+            'pdf_type': result.get('pdf_type'),
+            'pages': result.get('page_count') or 0,
+        }
+
+    def finish(self) -> Dict:
+        # Métricas do próprio processo principal (finalização de documentos em blocos, escrita)
+        self.metrics.merge(metrics.drain(), pages=False)
+        wall = time.time() - self.started_at
+        pages = sum(item['pages'] for item in self.files.values())
+        status: Dict[str, int] = {}
+        for item in self.files.values():
+            status[item['status']] = status.get(item['status'], 0) + 1
+        per_file = {}
+        for path, item in self.files.items():
+            snapshot = self._file_metrics[path].snapshot() if path in self._file_metrics else {}
+            per_file[path] = dict(item, stages=stage_seconds(snapshot), pages=snapshot.get('pages', {}))
+        return {
+            'started_at': self.started_at,
+            'finished_at': self.started_at + wall,
+            'wall_seconds': round(wall, 3),
+            'files': len(self.files),
+            'status': status,
+            'pages': pages,
+            'pages_per_second': round(pages / wall, 3) if wall > 0 else 0.0,
+            'metrics': self.metrics.snapshot(),
+            'per_file': per_file,
+        }
@@ -0,0 +1,219 @@
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src.utils.logger import setup_logger
+from src.utils.metrics import incr
+
+logger = setup_logger(__name__)
+
+DEFAULT_CACHE_PATH = "data/interim/ocr_cache.sqlite"
+DEFAULT_MAX_MB = 512
+# Acessos (last_access) acumulados em memória e gravados numa única transação
+ACCESS_FLUSH_ENTRIES = 64
+ACCESS_FLUSH_SECONDS = 30.0
+
+# Instâncias por processo (cada worker abre sua própria conexão SQLite)
+_caches: Dict[str, "OCRCache"] = {}
+
+
+def image_hash(image) -> str:
+    """MD5 dos pixels de um array NumPy, imagem PIL ou buffer de bytes."""
+    try:
+        # Arrays contíguos e buffers são lidos no lugar, sem copiar os pixels
+        return hashlib.md5(memoryview(image)).hexdigest()
+    except (TypeError, BufferError):
+        pass
+    if hasattr(image, "tobytes"):
+        data = image.tobytes()
+    else:
+        data = bytes(image)
+    return hashlib.md5(data).hexdigest()
+
+
+class OCRCache:
+    """
+    Cache persistente de resultados de OCR endereçado por conteúdo.
+
+    A chave combina o hash da imagem (imagem embutida ou página rasterizada) com a
+    configuração do OCR (idioma, psm, DPI, versão do pré-processamento e motor de OCR,
+    já que tesserocr e o executável podem usar versões diferentes do Tesseract), de modo que
+    logos, diagramas e cabeçalhos repetidos entre páginas e edições são reconhecidos
+    uma única vez. O tamanho total é limitado e as entradas menos usadas recentemente
+    são removidas primeiro.
+
+    Um acerto não escreve no banco: o horário de acesso fica pendente em memória e é
+    gravado em lote (a cada `ACCESS_FLUSH_ENTRIES` acertos ou `ACCESS_FLUSH_SECONDS`,
+    na próxima escrita e antes da remoção LRU), para que workers lendo o cache não
+    disputem o lock de escrita do SQLite a cada página.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, max_mb: float = DEFAULT_MAX_MB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._pending_access: Dict[str, float] = {}
+        self._last_access_flush = time.time()
+
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+        # WAL permite leituras concorrentes enquanto outro worker escreve
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " key TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_cache_access ON ocr_cache(last_access)")
+        self._conn.commit()
+        self._approx_bytes = self._total_bytes()
+
+    @staticmethod
+    def make_key(
+        image_digest: str, ocr_config: str, dpi: int = 0, preprocess_version: str = "", backend: str = ""
+    ) -> str:
+        raw = "|".join([image_digest, ocr_config.strip(), str(dpi), preprocess_version, str(backend)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(
+        self, image_digest: str, ocr_config: str, dpi: int = 0, preprocess_version: str = "", backend: str = ""
+    ) -> Optional[str]:
+        key = self.make_key(image_digest, ocr_config, dpi, preprocess_version, backend)
+        row = self._conn.execute("SELECT text FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            incr('ocr_cache_misses')
+            return None
+
+        self.hits += 1
+        incr('ocr_cache_hits')
+        now = time.time()
+        self._pending_access[key] = now
+        if len(self._pending_access) >= ACCESS_FLUSH_ENTRIES or now - self._last_access_flush >= ACCESS_FLUSH_SECONDS:
+            self._flush_access()
+            self._conn.commit()
+        return row[0]
+
+    def _flush_access(self) -> None:
+        """Grava os horários de acesso pendentes (sem commit; quem chama encerra a transação)."""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE ocr_cache SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+        self._last_access_flush = time.time()
+
+    def put(
+        self, image_digest: str, ocr_config: str, text: str, dpi: int = 0, preprocess_version: str = "",
+        backend: str = ""
+    ) -> None:
+        key = self.make_key(image_digest, ocr_config, dpi, preprocess_version, backend)
+        size = len(text.encode("utf-8")) + len(key)
+        self._flush_access()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO ocr_cache (key, text, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, text, size, time.time())
+        )
+        self._conn.commit()
+        self._approx_bytes += size
+        if self._approx_bytes > self.max_bytes:
+            self._evict()
+
+    def get_or_compute(
+        self,
+        image_digest: str,
+        ocr_config: str,
+        compute: Callable[[], str],
+        dpi: int = 0,
+        preprocess_version: str = "",
+        backend: str = ""
+    ) -> str:
+        text = self.get(image_digest, ocr_config, dpi, preprocess_version, backend)
+        if text is None:
+            text = compute()
+            self.put(image_digest, ocr_config, text, dpi, preprocess_version, backend)
+        return text
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Remove as entradas menos usadas recentemente até ficar em 90% do limite."""
+        # Outros workers também escrevem no banco: recalcula o total real antes de remover
+        self._flush_access()
+        self._conn.commit()
+        total = self._total_bytes()
+        target = int(self.max_bytes * 0.9)
+        if total <= self.max_bytes:
+            self._approx_bytes = total
+            return
+
+        removed = 0
+        cursor = self._conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_access ASC")
+        to_delete = []
+        for key, size in cursor:
+            if total <= target:
+                break
+            to_delete.append((key,))
+            total -= size
+            removed += 1
+        self._conn.executemany("DELETE FROM ocr_cache WHERE key = ?", to_delete)
+        self._conn.commit()
+        self._approx_bytes = total
+        logger.info(f"Cache de OCR: {removed} entradas removidas (LRU), {total / (1024 * 1024):.1f} MB em uso.")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "size_mb": self._approx_bytes / (1024 * 1024),
+        }
+
+    def close(self) -> None:
+        self._flush_access()
+        self._conn.commit()
+        self._conn.close()
+
+
+def get_ocr_cache(config: Dict) -> Optional[OCRCache]:
+    """
+    Retorna o cache de OCR do processo atual conforme o config, ou None se desabilitado
+    (`enable_ocr_cache`). Caminho e limite vêm de `ocr_cache_path` e `ocr_cache_max_mb`.
+    """
+    if not config or not config.get("enable_ocr_cache", False):
+        return None
+
+    db_path = config.get("ocr_cache_path", DEFAULT_CACHE_PATH)
+    if db_path not in _caches:
+        try:
+            _caches[db_path] = OCRCache(db_path, max_mb=config.get("ocr_cache_max_mb", DEFAULT_MAX_MB))
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache de OCR indisponível ({db_path}): {e}")
+            return None
+    return _caches[db_path]
+
+
+def cached_ocr(
+    ocr_cache: Optional[OCRCache],
+    image_digest: Optional[str],
+    ocr_config: str,
+    compute: Callable[[], str],
+    dpi: int = 0,
+    preprocess_version: str = "",
+    backend: str = ""
+) -> str:
+    """
+    Executa `compute` consultando o cache antes, quando houver cache e hash disponíveis.
+    `backend` é o nome do motor de OCR (`OCRBackend.name`) que executa `compute`.
+    """
+    if ocr_cache is None or image_digest is None:
+        return compute()
+    return ocr_cache.get_or_compute(image_digest, ocr_config, compute, dpi, preprocess_version, backend)
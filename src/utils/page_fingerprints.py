@@ -0,0 +1,188 @@
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from src.utils.job_manifest import config_hash
+from src.utils.logger import setup_logger
+from src.utils.metrics import incr, span
+
+logger = setup_logger(__name__)
+
+DEFAULT_FINGERPRINT_PATH = "data/interim/page_fingerprints.sqlite"
+DEFAULT_MAX_AGE_DAYS = 365
+# Raster de verificação: cinza em baixa resolução (poucos ms por página, mesmo digitalizada)
+FINGERPRINT_DPI = 36
+# Limite de parâmetros por consulta do SQLite
+_LOOKUP_CHUNK = 500
+
+Fingerprint = Tuple[str, str]
+
+# Instâncias por processo e por configuração (cada worker abre sua própria conexão SQLite)
+_stores: Dict[Tuple[str, str], "PageFingerprintStore"] = {}
+
+
+def page_fingerprint(page: fitz.Page, dpi: int = FINGERPRINT_DPI) -> Fingerprint:
+    """
+    Impressão digital de uma página: SHA-256 do fluxo de conteúdo e SHA-256 do raster
+    em cinza de baixa resolução. O fluxo de conteúdo muda com qualquer alteração de
+    texto ou desenho; o raster cobre o que o fluxo só referencia pelo nome (imagens,
+    formulários e fontes trocados entre edições).
+    """
+    content_hash = hashlib.sha256(page.read_contents()).hexdigest()
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    raster_hash = hashlib.sha256(pix.samples).hexdigest()
+    return content_hash, raster_hash
+
+
+class PageFingerprintStore:
+    """
+    Registro persistente das páginas já processadas, endereçado pela impressão digital.
+
+    Cada página extraída é guardada com o seu resultado (texto e, no roteamento, a
+    decisão da página) sob a chave (hash do conteúdo, hash do raster, configuração).
+    Quando uma nova edição de um catálogo chega, as páginas com impressão digital
+    conhecida reaproveitam o resultado guardado e só as páginas novas ou alteradas
+    passam pela extração e pelo OCR, de modo que o custo acompanha o tamanho da
+    diferença entre as edições. Entradas não vistas há `max_age_days` são removidas.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_FINGERPRINT_PATH, settings: str = "",
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.settings = settings
+        self.reused = 0
+        self.stored = 0
+
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+        # WAL permite leituras concorrentes enquanto outro worker escreve
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_fingerprints ("
+            " key TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL,"
+            " raster_hash TEXT NOT NULL,"
+            " record TEXT NOT NULL,"
+            " source TEXT,"
+            " page INTEGER,"
+            " last_seen REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_page_fingerprints_seen ON page_fingerprints(last_seen)")
+        self._conn.commit()
+        if max_age_days:
+            self.prune(max_age_days)
+
+    def make_key(self, fingerprint: Fingerprint, version: str = "") -> str:
+        raw = "|".join([fingerprint[0], fingerprint[1], self.settings, version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, fingerprints: Dict[int, Fingerprint], version: str = "") -> Dict[int, Dict]:
+        """
+        Resultados guardados das páginas conhecidas, por índice de página. `version`
+        identifica o extrator (ex.: a versão do pré-processamento do OCR).
+        """
+        keys = {self.make_key(fingerprint, version): page_index for page_index, fingerprint in fingerprints.items()}
+        found = {}
+        pending = list(keys)
+        for start in range(0, len(pending), _LOOKUP_CHUNK):
+            chunk = pending[start:start + _LOOKUP_CHUNK]
+            rows = self._conn.execute(
+                f"SELECT key, record FROM page_fingerprints WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for key, record in rows:
+                found[keys[key]] = json.loads(record)
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE page_fingerprints SET last_seen = ? WHERE key = ?",
+                [(now, key) for key in pending if keys[key] in found]
+            )
+            self._conn.commit()
+        self.reused += len(found)
+        return found
+
+    def remember(self, source: str, entries: Iterable[Tuple[int, Fingerprint, Dict]], version: str = "") -> None:
+        """
+        Guarda (índice da página, impressão digital, resultado) das páginas extraídas de
+        `source`. Resultados sem texto (OCR que falhou ou nada reconheceu) não são
+        guardados: a próxima execução tenta a página de novo.
+        """
+        now = time.time()
+        rows = [
+            (self.make_key(fingerprint, version), fingerprint[0], fingerprint[1],
+             json.dumps(record, ensure_ascii=False), source, page_index + 1, now)
+            for page_index, fingerprint, record in entries
+            if (record.get('text') or '').strip()
+        ]
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO page_fingerprints "
+            "(key, content_hash, raster_hash, record, source, page, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        self._conn.commit()
+        self.stored += len(rows)
+
+    def prune(self, max_age_days: float) -> int:
+        """Remove as páginas não vistas nos últimos `max_age_days` dias."""
+        cursor = self._conn.execute(
+            "DELETE FROM page_fingerprints WHERE last_seen < ?", (time.time() - max_age_days * 86400,)
+        )
+        self._conn.commit()
+        if cursor.rowcount:
+            logger.info(f"Impressões digitais de páginas: {cursor.rowcount} entradas antigas removidas.")
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def match_known_pages(
+    context, page_indexes: Iterable[int], page_store: Optional[PageFingerprintStore], version: str = ""
+) -> Tuple[Dict[int, Fingerprint], Dict[int, Dict]]:
+    """
+    Calcula a impressão digital das páginas e consulta o registro. Retorna as impressões
+    digitais (para guardar as páginas extraídas depois) e os resultados já conhecidos,
+    ambos por índice de página. Sem registro, retorna dois dicionários vazios.
+    """
+    if page_store is None:
+        return {}, {}
+    with span('fingerprint'):
+        fingerprints = {page_index: page_fingerprint(context.page(page_index)) for page_index in page_indexes}
+        known = page_store.lookup(fingerprints, version)
+    incr('pages_fingerprint_reused', len(known))
+    if known:
+        logger.info(
+            f"♻️ {len(known)} de {len(fingerprints)} páginas verificadas de {context.pdf_path} já conhecidas "
+            f"(impressão digital); só as demais serão extraídas."
+        )
+    return fingerprints, known
+
+
+def get_page_store(config: Dict) -> Optional[PageFingerprintStore]:
+    """
+    Retorna o registro de impressões digitais do processo atual conforme o config, ou
+    None se desabilitado (`enable_page_fingerprints`). Os resultados ficam separados por
+    configuração (ver `config_hash`): mudar DPI, idioma ou roteamento não reaproveita
+    páginas extraídas de outro jeito.
+    """
+    if not config or not config.get("enable_page_fingerprints", False):
+        return None
+
+    db_path = config.get("page_fingerprint_path", DEFAULT_FINGERPRINT_PATH)
+    settings = config_hash(config)
+    if (db_path, settings) not in _stores:
+        try:
+            _stores[(db_path, settings)] = PageFingerprintStore(
+                db_path, settings, max_age_days=config.get("page_fingerprint_max_age_days", DEFAULT_MAX_AGE_DAYS)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Registro de impressões digitais indisponível ({db_path}): {e}")
+            return None
+    return _stores[(db_path, settings)]
@@ -0,0 +1,134 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Literal, Optional
+
+from src.utils.logger import configure_worker_logging, logging_queue, setup_logger
+from src.utils.memory import available_memory_mb
+
+logger = setup_logger(__name__)
+
+PoolKind = Literal['text', 'ocr']
+
+# Memória típica por worker (pico de RSS): OCR segura páginas rasterizadas em 300 DPI
+DEFAULT_WORKER_MEMORY_MB = {'text': 200, 'ocr': 700}
+# Fração da memória disponível que o lote pode ocupar quando `memory_budget_mb` não é definido
+DEFAULT_MEMORY_FRACTION = 0.8
+# Fração dos orçamentos de CPU e memória reservada ao pool de OCR quando os dois pools coexistem
+DEFAULT_OCR_POOL_SHARE = 0.5
+
+
+def cpu_budget(config: Dict) -> int:
+    """Núcleos que o lote pode usar (`cpu_budget` do config ou os núcleos visíveis ao processo)."""
+    if config.get('cpu_budget'):
+        return max(1, int(config['cpu_budget']))
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def memory_budget_mb(config: Dict) -> Optional[float]:
+    """Memória que o lote pode usar (`memory_budget_mb` ou uma fração da disponível)."""
+    if config.get('memory_budget_mb'):
+        return float(config['memory_budget_mb'])
+    available = available_memory_mb()
+    return available * DEFAULT_MEMORY_FRACTION if available is not None else None
+
+
+def threads_per_worker(config: Dict, kind: PoolKind) -> int:
+    """Threads OpenMP/OpenCV de cada worker: 1 para texto; `ocr_threads_per_worker` para OCR."""
+    if kind == 'text':
+        return 1
+    return max(1, int(config.get('ocr_threads_per_worker', 1)))
+
+
+def worker_memory_mb(config: Dict, kind: PoolKind) -> float:
+    """
+    Memória típica de um worker do tipo (`text_worker_memory_mb`/`ocr_worker_memory_mb`).
+    Com `page_routing`, os arquivos do pool de texto também rasterizam para o OCR as
+    páginas sem texto, então o worker de texto é orçado como um de OCR (com 1 thread).
+    """
+    if config.get(f'{kind}_worker_memory_mb'):
+        return float(config[f'{kind}_worker_memory_mb'])
+    if kind == 'text' and config.get('page_routing', True):
+        return DEFAULT_WORKER_MEMORY_MB['ocr']
+    return DEFAULT_WORKER_MEMORY_MB[kind]
+
+
+def pool_shares(config: Dict) -> Dict[PoolKind, float]:
+    """
+    Divisão dos orçamentos de CPU e memória entre os pools de texto e de OCR, que rodam
+    ao mesmo tempo no lote (`ocr_pool_share` vai para o OCR, o restante para o texto).
+    """
+    share = config.get('ocr_pool_share')
+    share = min(max(float(DEFAULT_OCR_POOL_SHARE if share is None else share), 0.0), 1.0)
+    return {'text': 1.0 - share, 'ocr': share}
+
+
+def pool_size(config: Dict, kind: PoolKind, share: float = 1.0) -> int:
+    """
+    Número de workers de um pool, limitado por:
+
+    - CPU: núcleos do orçamento divididos pelas threads de cada worker, para que
+      workers x threads do Tesseract/OpenCV não ultrapassem os núcleos;
+    - memória: orçamento dividido pela memória típica de um worker do tipo;
+    - `text_workers`/`ocr_workers` (valor explícito) e `max_workers` (teto geral).
+
+    `share` é a fração dos orçamentos de CPU e memória destinada ao pool quando ele
+    divide a máquina com outro (ver `pool_shares`).
+    """
+    explicit = config.get(f'{kind}_workers')
+    if explicit:
+        size = int(explicit)
+    else:
+        size = int(cpu_budget(config) * share) // threads_per_worker(config, kind)
+        budget = memory_budget_mb(config)
+        if budget is not None:
+            size = min(size, int(budget * share // worker_memory_mb(config, kind)))
+
+    if config.get('max_workers'):
+        size = min(size, int(config['max_workers']))
+    return max(1, size)
+
+
+def limit_worker_threads(threads: int) -> None:
+    """
+    Limita as threads internas do worker atual. As variáveis de ambiente são herdadas
+    pelos processos do Tesseract disparados pelo pytesseract (OMP_THREAD_LIMIT).
+    """
+    for var in ("OMP_THREAD_LIMIT", "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+
+
+def _init_worker(threads: int, log_queue, log_level, initializer: Optional[Callable], initargs: tuple) -> None:
+    limit_worker_threads(threads)
+    configure_worker_logging(log_queue, log_level)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def create_pool(
+    config: Dict,
+    kind: PoolKind,
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
+    share: float = 1.0
+) -> ProcessPoolExecutor:
+    """
+    Cria o pool de processos do tipo informado com tamanho e threads limitados pelo
+    orçamento (ou pela fração `share` dele, se o pool divide a máquina com outro).
+    """
+    size = pool_size(config, kind, share)
+    threads = threads_per_worker(config, kind)
+    logger.info(f"⚙️ Pool de {kind}: {size} worker(s) x {threads} thread(s).")
+    # Os workers enviam os logs pela fila do listener do processo principal, se ativo
+    log_queue, log_level = logging_queue()
+    return ProcessPoolExecutor(
+        max_workers=size, initializer=_init_worker,
+        initargs=(threads, log_queue, log_level, initializer, initargs)
+    )
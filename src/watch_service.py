@@ -0,0 +1,271 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from src.batch_processor import config as default_config, filtrar_ja_processados, processar_pdf
+from src.processing.search_index import index_result
+from src.utils.job_manifest import DEFAULT_MANIFEST_PATH, JobManifest, config_hash
+from src.utils.logger import log_listener, setup_logger
+from src.utils.resources import create_pool, pool_size
+
+try:
+    # Notificações do sistema de arquivos (inotify/ReadDirectoryChangesW/FSEvents); sem o
+    # pacote, o serviço volta à varredura periódica
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = setup_logger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_SETTLE_SECONDS = 0.2
+
+
+def _aquecer_worker(config: Dict) -> None:
+    """
+    Inicializador dos workers: carrega as bibliotecas pesadas (cv2, fitz, pdfplumber,
+    pytesseract, configuração do Tesseract), o motor de OCR, o cache de OCR e o registro
+    de impressões digitais de páginas uma única vez, antes do primeiro PDF chegar.
+    """
+    import src.batch_processor  # noqa: F401  (importa classificação e extração)
+    from src.extraction.ocr_engine import get_ocr_backend
+    from src.utils.ocr_cache import get_ocr_cache
+    from src.utils.page_fingerprints import get_page_store
+
+    get_ocr_cache(config)
+    get_page_store(config)
+    # Com o tesserocr, os traineddata ficam carregados antes da primeira página
+    get_ocr_backend(config).warm_up(f"--oem 3 --psm 6 -l {config.get('ocr_language', 'por+eng')}")
+    logger.info(f"🔥 Worker {os.getpid()} aquecido e pronto.")
+
+
+class _AcordarNoEvento(FileSystemEventHandler):
+    """Acorda o laço do serviço assim que um arquivo é criado ou movido para a pasta."""
+
+    def __init__(self, wake: threading.Event):
+        self.wake = wake
+
+    def on_created(self, event):
+        self.wake.set()
+
+    def on_moved(self, event):
+        self.wake.set()
+
+    def on_modified(self, event):
+        self.wake.set()
+
+
+class WatchService:
+    """
+    Serviço contínuo que observa a pasta de entrada e despacha os PDFs novos para um
+    pool de workers mantido aquecido entre arquivos.
+
+    - Detecção: eventos do watchdog (dependência do projeto); sem o pacote, varredura periódica
+      (`watch_poll_interval`). Um arquivo só é despachado depois que tamanho e mtime
+      ficam estáveis por `watch_settle_seconds` (cópia concluída).
+    - Contrapressão: no máximo `watch_max_queue` arquivos em andamento; os excedentes
+      continuam na pasta de entrada até abrir vaga.
+    - Encerramento: SIGTERM/SIGINT param de aceitar arquivos novos, aguardam os que já
+      foram despachados e fecham o pool e o manifesto.
+    """
+
+    def __init__(self, input_dir: str, config: Dict):
+        self.input_dir = Path(input_dir)
+        self.config = config
+        # O tipo do PDF só é conhecido no worker: o pool é dimensionado pelo orçamento de OCR
+        self.max_workers = pool_size(config, 'ocr')
+        self.max_queue = config.get('watch_max_queue') or self.max_workers * 2
+        self.poll_interval = config.get('watch_poll_interval', DEFAULT_POLL_INTERVAL)
+        self.settle_seconds = config.get('watch_settle_seconds', DEFAULT_SETTLE_SECONDS)
+
+        self._wake = threading.Event()
+        self._stopping = False
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._observer = None
+        self._manifest: Optional[JobManifest] = None
+        self._cfg_hash = config_hash(config)
+        # caminho -> (futuro, hash do conteúdo ou None)
+        self._inflight: Dict[str, Tuple[Future, Optional[str]]] = {}
+        # caminho -> (tamanho, mtime_ns, instante em que esse estado foi visto pela primeira vez)
+        self._seen: Dict[str, Tuple[int, int, float]] = {}
+        # Arquivos que continuaram na pasta depois de processados (ex.: sem texto extraído):
+        # só voltam à fila se forem substituídos
+        self._ignored: Dict[str, Tuple[int, int]] = {}
+        self._backpressure_logged = False
+        self.processed = 0
+
+    def start(self) -> None:
+        self.input_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = create_pool(self.config, 'ocr', initializer=_aquecer_worker, initargs=(self.config,))
+        # Força a criação dos workers agora (e não no primeiro PDF)
+        for future in [self._executor.submit(os.getpid) for _ in range(self.max_workers)]:
+            future.result()
+
+        if self.config.get('enable_manifest', True):
+            self._manifest = JobManifest(self.config.get('manifest_path', DEFAULT_MANIFEST_PATH))
+
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_AcordarNoEvento(self._wake), str(self.input_dir), recursive=False)
+            self._observer.start()
+            modo = "eventos do sistema de arquivos"
+        else:
+            modo = f"varredura a cada {self.poll_interval}s"
+        logger.info(
+            f"👀 Observando {self.input_dir} ({modo}) com {self.max_workers} workers aquecidos, "
+            f"fila máxima de {self.max_queue} arquivos."
+        )
+
+    def request_stop(self, *_args) -> None:
+        """Para de aceitar arquivos novos; os já despachados terminam normalmente."""
+        if not self._stopping:
+            logger.info("🛑 Encerramento solicitado: aguardando os arquivos em andamento...")
+        self._stopping = True
+        self._wake.set()
+
+    def _stable_files(self):
+        """PDFs da pasta de entrada cuja cópia terminou, do mais antigo para o mais novo."""
+        now = time.monotonic()
+        ready = []
+        current = set()
+        try:
+            entries = list(os.scandir(self.input_dir))
+        except FileNotFoundError:
+            return ready
+
+        for entry in entries:
+            if not entry.name.lower().endswith('.pdf') or not entry.is_file():
+                continue
+            path = entry.path
+            current.add(path)
+            if path in self._inflight:
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            state = (stat.st_size, stat.st_mtime_ns)
+            if self._ignored.get(path) == state:
+                continue
+            previous = self._seen.get(path)
+            if previous is None or previous[:2] != state:
+                self._seen[path] = (*state, now)
+                continue
+            if stat.st_size > 0 and now - previous[2] >= self.settle_seconds:
+                ready.append((stat.st_mtime_ns, path))
+
+        # Esquece arquivos que saíram da pasta
+        for known in (self._seen, self._ignored):
+            for path in list(known):
+                if path not in current:
+                    del known[path]
+        return [path for _, path in sorted(ready)]
+
+    def _dispatch(self) -> None:
+        ready = self._stable_files()
+        capacity = self.max_queue - len(self._inflight)
+        if len(ready) > capacity:
+            if not self._backpressure_logged:
+                logger.warning(
+                    f"⏳ Fila cheia ({len(self._inflight)}/{self.max_queue}): "
+                    f"{len(ready) - max(capacity, 0)} arquivo(s) aguardando na pasta de entrada."
+                )
+                self._backpressure_logged = True
+            ready = ready[:max(capacity, 0)]
+        else:
+            self._backpressure_logged = False
+
+        for path in ready:
+            pdf = Path(path)
+            content_hash = None
+            if self._manifest is not None:
+                pending, hashes = filtrar_ja_processados([pdf], self._manifest, self.config)
+                if not pending:
+                    self._seen.pop(path, None)
+                    continue
+                content_hash = hashes[str(pdf)]
+
+            future = self._executor.submit(processar_pdf, path, self.config)
+            future.add_done_callback(lambda _f: self._wake.set())
+            self._inflight[path] = (future, content_hash)
+            self._seen.pop(path, None)
+            logger.info(f"📥 Despachado: {pdf.name} ({len(self._inflight)}/{self.max_queue} em andamento)")
+
+    def _collect(self) -> None:
+        for path, (future, content_hash) in list(self._inflight.items()):
+            if not future.done():
+                continue
+            del self._inflight[path]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"❌ Erro ao processar {Path(path).name}: {e}")
+                result = {'status': 'failed', 'error': str(e)}
+            self.processed += 1
+            index_result(result, self.config)
+            try:
+                stat = os.stat(path)
+                self._ignored[path] = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                pass
+
+            if self._manifest is not None and content_hash is not None:
+                self._manifest.mark_finished(content_hash, self._cfg_hash, result)
+                if result.get('destination'):
+                    self._manifest.remember_path(path, result['destination'])
+
+    def run_once(self, timeout: float = None) -> None:
+        """Uma iteração do laço: espera um evento (ou o intervalo), recolhe e despacha."""
+        if timeout is None:
+            # Com arquivos aguardando estabilizar, volta a olhar logo em seguida
+            timeout = min(self.poll_interval, self.settle_seconds) if self._seen else self.poll_interval
+        self._wake.wait(timeout)
+        self._wake.clear()
+        self._collect()
+        if not self._stopping:
+            self._dispatch()
+
+    def drain(self) -> None:
+        """Aguarda os arquivos em andamento e libera workers, observador e manifesto."""
+        while self._inflight:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            self._collect()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self._manifest is not None:
+            self._manifest.close()
+        logger.info(f"✅ Serviço encerrado ({self.processed} arquivo(s) processado(s)).")
+
+    def serve_forever(self) -> None:
+        signal.signal(signal.SIGINT, self.request_stop)
+        signal.signal(signal.SIGTERM, self.request_stop)
+        self.start()
+        try:
+            while not self._stopping:
+                self.run_once()
+        finally:
+            self.drain()
+
+
+def run_watch_service(input_dir: str = "data/input/pending", config: Dict = None) -> None:
+    config = config if config is not None else default_config
+    with log_listener(config):
+        WatchService(input_dir, config).serve_forever()
+
+
+if __name__ == "__main__":
+    print("⭐ Serviço de observação iniciado! (Ctrl+C ou SIGTERM para encerrar)")
+    run_watch_service()
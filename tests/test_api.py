@@ -0,0 +1,170 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import fitz  # PyMuPDF
+import pytest
+from fastapi.testclient import TestClient
+from src.api.app import create_app
+
+
+def _text_pdf(pages: int = 3) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((50, 72), f"Catálogo de peças - página {i + 1} - Parafuso sextavado M8", fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # As pastas de saída do pipeline são relativas ao diretório atual
+    monkeypatch.chdir(tmp_path)
+    config = {
+        'enable_manifest': False, 'enable_metrics': False, 'api_max_jobs': 2,
+        'api_page_chunk_size': 2, 'api_input_dir': str(tmp_path / "pending"),
+        'log_file': str(tmp_path / "api.log"), 'api_max_upload_mb': 1,
+    }
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with TestClient(create_app(config, executor=executor)) as client:
+            yield client
+
+
+def _wait_finished(client, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f"/jobs/{job_id}").json()
+        if status['status'] in ('done', 'failed'):
+            return status
+        time.sleep(0.05)
+    raise AssertionError("job não terminou")
+
+
+def test_upload_streams_pages_and_saves_text(api):
+    response = api.post("/jobs", files={'file': ("catálogo.pdf", _text_pdf(3), "application/pdf")})
+    assert response.status_code == 202
+    job_id = response.json()['id']
+
+    with api.stream("GET", f"/jobs/{job_id}/pages") as stream:
+        events = [json.loads(line) for line in stream.iter_lines() if line]
+
+    pages = [event for event in events if event['event'] == 'page']
+    assert sorted(page['page'] for page in pages) == [1, 2, 3]
+    assert all("Parafuso sextavado" in page['text'] for page in pages)
+    assert events[-1]['event'] == 'done'
+
+    status = _wait_finished(api, job_id)
+    assert status['pdf_type'] == 'text_only' and status['pages_done'] == 3
+    assert "página 2" in open(status['result']['output_path'], encoding='utf-8').read()
+    assert 'catalogos_api_jobs_done 1' in api.get("/metrics").text
+
+
+def test_finished_job_serves_page_text_from_output_file(api):
+    job_id = api.post("/jobs", files={'file': ("catálogo.pdf", _text_pdf(3), "application/pdf")}).json()['id']
+    assert _wait_finished(api, job_id)['status'] == 'done'
+
+    job = api.app.state.jobs.jobs[job_id]
+    assert not any('text' in event for event in job.events)
+    with api.stream("GET", f"/jobs/{job_id}/pages") as stream:
+        events = [json.loads(line) for line in stream.iter_lines() if line]
+    pages = [event for event in events if event['event'] == 'page']
+    assert sorted(page['page'] for page in pages) == [1, 2, 3]
+    assert all(f"página {page['page']} - Parafuso" in page['text'] for page in pages)
+
+
+def test_rejects_non_pdf_and_unknown_job(api):
+    response = api.post("/jobs", files={'file': ("notas.txt", b"texto", "text/plain")})
+    assert response.status_code == 400
+    assert api.get("/jobs/inexistente").status_code == 404
+    assert api.get("/health").json()['jobs_active'] == 0
+
+
+def test_register_only_accepts_files_in_input_dir(api, tmp_path):
+    (tmp_path / "pending").mkdir()
+    (tmp_path / "pending" / "catalogo.pdf").write_bytes(_text_pdf(1))
+    (tmp_path / "fora.pdf").write_bytes(_text_pdf(1))
+
+    assert api.post("/jobs/register", json={'path': str(tmp_path / "fora.pdf")}).status_code == 400
+    response = api.post("/jobs/register", json={'path': "catalogo.pdf"})
+    assert response.status_code == 202
+    assert _wait_finished(api, response.json()['id'])['status'] == 'done'
+
+
+def test_returns_429_when_job_limit_is_reached(api):
+    release = threading.Event()
+
+    def slow_classify(pdf_path, config):
+        release.wait(10)
+        return {'path': pdf_path, 'pdf_type': 'text_only', 'page_count': 1}
+
+    with patch("src.api.jobs.classificar_pdf", side_effect=slow_classify):
+        codes = [
+            api.post("/jobs", files={'file': (f"c{i}.pdf", _text_pdf(1), "application/pdf")}).status_code
+            for i in range(3)
+        ]
+        release.set()
+    assert codes == [202, 202, 429]
+
+
+def test_rejects_oversized_upload_without_keeping_it(api, tmp_path):
+    response = api.post("/jobs", files={'file': ("grande.pdf", b"%PDF-" + b"0" * (3 * 1024 * 1024), "application/pdf")})
+    assert response.status_code == 413
+    assert not any((tmp_path / "data" / "input" / "api").glob("*.pdf"))
+
+
+def _multipart_chunks(filename: str, data: bytes, consumed: list, boundary: str = "limite"):
+    """Corpo multipart em blocos (sem Content-Length); registra em `consumed` o que foi lido."""
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        'Content-Type: application/pdf\r\n\r\n'.encode(),
+        *[data[i:i + 256 * 1024] for i in range(0, len(data), 256 * 1024)],
+        f'\r\n--{boundary}--\r\n'.encode(),
+    ]
+    for part in parts:
+        consumed.append(len(part))
+        yield part
+
+
+def test_queue_full_is_rejected_before_the_body_is_read(api):
+    manager = api.app.state.jobs
+    for _ in range(manager.max_jobs):
+        manager.create_job("ocupado.pdf")
+    consumed = []
+    response = api.post(
+        "/jobs", content=_multipart_chunks("c.pdf", _text_pdf(1), consumed),
+        headers={'Content-Type': 'multipart/form-data; boundary=limite'}
+    )
+    assert response.status_code == 429
+    assert consumed == []
+
+
+def test_streamed_upload_stops_at_the_size_limit(api, tmp_path):
+    response = api.post(
+        "/jobs", content=_multipart_chunks("grande.pdf", b"%PDF-" + b"0" * (3 * 1024 * 1024), []),
+        headers={'Content-Type': 'multipart/form-data; boundary=limite'}
+    )
+    assert response.status_code == 413
+    assert not any((tmp_path / "data" / "input" / "api").glob("*.pdf"))
+    assert api.app.state.jobs.active == 0
+
+
+def test_streamed_upload_is_accepted(api):
+    response = api.post(
+        "/jobs", content=_multipart_chunks("catálogo.pdf", _text_pdf(2), []),
+        headers={'Content-Type': 'multipart/form-data; boundary=limite'}
+    )
+    assert response.status_code == 202
+    assert response.json()['filename'] == "catálogo.pdf"
+    assert _wait_finished(api, response.json()['id'])['status'] == 'done'
+
+
+def test_job_fails_even_if_pdf_cannot_be_moved(api):
+    with patch("src.api.jobs.classificar_pdf", side_effect=RuntimeError("PDF corrompido")), \
+            patch("src.api.jobs.mover_para_erros", side_effect=PermissionError("arquivo em uso")):
+        response = api.post("/jobs", files={'file': ("c.pdf", _text_pdf(1), "application/pdf")})
+        status = _wait_finished(api, response.json()['id'])
+    assert status['status'] == 'failed'
+    assert "PDF corrompido" in status['error']
@@ -0,0 +1,58 @@
+import threading
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+from src.utils.debug_images import DebugImageWriter, document_namespace, get_debug_writer
+
+
+def test_get_debug_writer_disabled_by_default():
+    assert get_debug_writer({}) is None
+    assert get_debug_writer({'enable_debug': False}) is None
+
+
+def test_samples_every_nth_page_and_low_confidence_pages(tmp_path):
+    writer = DebugImageWriter(str(tmp_path), every_n_pages=3)
+    sampled = [page for page in range(1, 8) if writer.wants(page)]
+    assert sampled == [1, 4, 7]
+    assert writer.wants(2, low_confidence=True)
+    writer.close()
+
+
+def test_writes_downscaled_png_namespaced_per_document(tmp_path):
+    writer = DebugImageWriter(str(tmp_path), max_width=100, every_n_pages=1)
+    image = np.full((400, 300), 255, dtype=np.uint8)
+    assert writer.submit("a/catalogo.pdf", 1, image)
+    assert writer.submit("b/catalogo.pdf", 1, image)
+    writer.close()
+
+    files = sorted(tmp_path.glob("*/page_0001.png"))
+    assert len(files) == 2
+    assert document_namespace("a/catalogo.pdf") != document_namespace("b/catalogo.pdf")
+    assert cv2.imread(str(files[0]), cv2.IMREAD_GRAYSCALE).shape == (133, 100)
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    writer = DebugImageWriter(str(tmp_path), queue_size=1, every_n_pages=1)
+    release = threading.Event()
+    image = np.zeros((10, 10), dtype=np.uint8)
+    with patch("src.utils.debug_images.cv2.imwrite", side_effect=lambda *args: release.wait()):
+        writer.submit("catalogo.pdf", 1, image)   # em gravação, presa no imwrite
+        results = [writer.submit("catalogo.pdf", page, image) for page in range(2, 6)]
+        release.set()
+        writer.close()
+    assert results.count(False) >= 3
+
+
+@patch("src.extraction.ocr_processor.convert_from_path")
+@patch("src.extraction.ocr_processor.pytesseract.image_to_string", return_value="Parafuso sextavado M8 x 40")
+def test_ocr_pages_sends_sampled_pages_to_writer(mock_ocr, mock_convert, tmp_path):
+    from src.extraction.ocr_engine import SubprocessBackend
+    from src.extraction.ocr_processor import ocr_pages
+    mock_convert.return_value = [np.full((50, 80), 255, dtype=np.uint8) for _ in range(3)]
+    writer = DebugImageWriter(str(tmp_path), every_n_pages=2)
+
+    ocr_pages("tests/data/fake.pdf", debug_writer=writer, ocr_backend=SubprocessBackend())
+    writer.close()
+
+    assert sorted(path.name for path in tmp_path.glob("*/*.png")) == ["page_0001.png", "page_0003.png"]
@@ -0,0 +1,113 @@
+import gc
+import os
+
+import fitz
+import numpy as np
+import pytest
+from unittest.mock import patch
+from src.utils.document_context import PDFDocumentContext, release_worker_context, worker_context
+from src.classification.text_analyzer import has_selectable_text
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    pdf_path = tmp_path / "amostra.pdf"
+    doc = fitz.open()
+    for i in range(3):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Catálogo de peças - página {i + 1}")
+    doc.save(str(pdf_path))
+    doc.close()
+    return str(pdf_path)
+
+
+def test_page_text_is_cached(sample_pdf):
+    with PDFDocumentContext(sample_pdf) as context:
+        assert context.page_count == 3
+        first = context.page_text(0)
+        assert "página 1" in first
+        with patch.object(fitz.Page, "get_text", side_effect=AssertionError("não deveria reler")):
+            assert context.page_text(0) == first
+
+
+def test_pixmap_cache_is_bounded(sample_pdf):
+    with PDFDocumentContext(sample_pdf, max_cached_pixmaps=1) as context:
+        pix = context.page_pixmap(0, dpi=36)
+        assert context.page_pixmap(0, dpi=36) is pix
+        context.page_pixmap(1, dpi=36)
+        assert context.page_pixmap(0, dpi=36) is not pix
+
+
+def test_extracted_image_cache_is_bounded_by_bytes(sample_pdf):
+    images = {xref: {'image': bytes(100)} for xref in (1, 2, 3)}
+    with PDFDocumentContext(sample_pdf, max_cached_image_bytes=250) as context:
+        with patch.object(fitz.Document, "extract_image", side_effect=lambda xref: images[xref]) as extract:
+            context.extract_image(1)
+            context.extract_image(2)
+            context.extract_image(1)
+            assert extract.call_count == 2
+            context.extract_image(3)  # passa de 250 bytes: sai o xref 2, o menos usado
+            context.extract_image(1)
+            assert extract.call_count == 3
+            context.extract_image(2)
+            assert extract.call_count == 4
+
+
+def test_page_gray_is_a_view_over_the_pixmap(sample_pdf):
+    with PDFDocumentContext(sample_pdf) as context:
+        gray = context.page_gray(0, dpi=72)
+        reference = np.frombuffer(context.page(0).get_pixmap(dpi=72, colorspace=fitz.csGRAY).samples, np.uint8)
+
+    assert gray.shape == (842, 595) and gray.dtype == np.uint8
+    assert not gray.flags.owndata and not gray.flags.writeable
+    # Vistas derivadas mantêm o pixmap vivo depois que o array original sai de escopo
+    view = np.asarray(gray)[10:][:, 5:]
+    del gray
+    gc.collect()
+    garbage = [np.full((842, 595), 7, np.uint8) for _ in range(4)]
+    assert np.array_equal(view, reference.reshape(842, 595)[10:, 5:])
+    assert view.min() < 128 < view.max()
+    del garbage
+
+
+def test_close_releases_handles(sample_pdf):
+    context = PDFDocumentContext(sample_pdf)
+    context.page_text(0)
+    context.close()
+    assert context._doc is None
+
+
+def test_has_selectable_text_with_context(sample_pdf):
+    with PDFDocumentContext(sample_pdf) as context:
+        assert has_selectable_text(sample_pdf, context=context) is True
+
+
+def test_worker_context_reuses_document_for_sibling_chunks(sample_pdf):
+    try:
+        with worker_context(sample_pdf) as first:
+            first.page_text(0)
+        with worker_context(sample_pdf) as second:
+            assert second is first
+        release_worker_context()
+        assert first._doc is None
+        # Acima do limite o documento é aberto e fechado a cada tarefa
+        with worker_context(sample_pdf, {'worker_document_cache_mb': 0}) as large:
+            large.page_text(0)
+        assert large._doc is None
+    finally:
+        release_worker_context()
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason="Requer /proc para listar os handles abertos.")
+def test_worker_context_keeps_no_file_handle_between_tasks(sample_pdf):
+    def open_paths():
+        return {os.path.realpath(os.path.join('/proc/self/fd', fd)) for fd in os.listdir('/proc/self/fd')}
+
+    try:
+        with worker_context(sample_pdf) as context:
+            # Fallbacks de texto também leem dos bytes, não do arquivo
+            assert "Catálogo" in context.plumber.pages[0].extract_text()
+            assert len(context.pypdf2_reader.pages) == 3
+        assert os.path.realpath(sample_pdf) not in open_paths()
+    finally:
+        release_worker_context()
@@ -0,0 +1,83 @@
+import json
+from unittest.mock import patch
+
+import pandas as pd
+from src.processing.entity_extractor import extract_entities, extract_entities_to_dataset
+from src.processing.search_index import extract_part_numbers
+
+PAGE = "\n".join([
+    "Catálogo de peças - seção 1",
+    "ABC-1234 Parafuso sextavado M8 x 40 R$ 12,50 (pág. 1)",
+    "12. 6204-2RS Rolamento blindado 20 x 47 x 14 mm 10 UN 1.234,56",
+    "Total do pedido 99,00",
+    "7891234567890 Filtro de óleo Ø 20 mm cx 12,00/un",
+    'XYZ.55 Arruela lisa 3/8" R$ 0,35 pç',
+])
+
+
+def test_extracts_catalog_items_per_line():
+    frame = extract_entities([(3, PAGE)])
+
+    assert frame['part_number'].tolist() == ["ABC-1234", "6204-2RS", "7891234567890", "XYZ.55"]
+    assert frame['part_number_normalized'].tolist() == ["ABC1234", "62042RS", "7891234567890", "XYZ55"]
+    assert frame['page'].tolist() == [3, 3, 3, 3]
+    assert frame['line'].tolist() == [2, 3, 5, 6]
+    assert frame['description'].tolist() == ["Parafuso sextavado", "Rolamento blindado", "Filtro de óleo", "Arruela lisa"]
+    assert frame['dimension'].tolist() == ["M8 x 40", "20 x 47 x 14 mm", "Ø 20 mm", '3/8"']
+    assert frame['price'].tolist() == [12.5, 1234.56, 12.0, 0.35]
+    assert frame['quantity'].tolist() == [pd.NA, 10, pd.NA, pd.NA]
+    assert frame['unit'].astype(object).tolist()[1:] == ["un", "un", "pç"]
+    assert pd.isna(frame['unit'].iloc[0])
+
+
+def test_item_codes_are_indexed_part_numbers():
+    frame = extract_entities([(1, PAGE)])
+    indexed = extract_part_numbers(PAGE)
+    assert set(frame['part_number_normalized']) <= set(indexed)
+
+
+def test_columns_are_compact_and_batches_are_combined():
+    pages = [(number, PAGE) for number in range(1, 6)]
+    frame = extract_entities(pages, batch_pages=2)
+
+    assert len(frame) == 20
+    assert frame['page'].tolist()[::4] == [1, 2, 3, 4, 5]
+    assert str(frame['page'].dtype) == 'int32' and str(frame['line'].dtype) == 'int32'
+    assert str(frame['unit'].dtype) == 'category'
+    assert extract_entities([(1, "Sem itens nesta página")]).empty
+
+
+def test_dataset_is_written_per_document(tmp_path):
+    txt = tmp_path / "catalogo.txt"
+    txt.write_text(f"Capa\n{PAGE}", encoding='utf-8')
+    (tmp_path / "catalogo.pages.json").write_text(json.dumps({'pages': [
+        {'page': 1, 'char_start': 0, 'char_end': 4},
+        {'page': 2, 'char_start': 5, 'char_end': 5 + len(PAGE)},
+    ]}), encoding='utf-8')
+
+    output = extract_entities_to_dataset(str(txt), str(tmp_path / "entities"), table_format='csv')
+
+    saved = pd.read_csv(output)
+    assert output.endswith("catalogo.entities.csv")
+    assert saved['page'].unique().tolist() == [2]
+    assert saved['price'].tolist() == [12.5, 1234.56, 12.0, 0.35]
+
+    empty = tmp_path / "vazio.txt"
+    empty.write_text("Sem itens", encoding='utf-8')
+    assert extract_entities_to_dataset(str(empty), str(tmp_path / "entities"), table_format='csv') is None
+
+
+def test_failed_write_leaves_no_temporary_file(tmp_path):
+    txt = tmp_path / "catalogo.txt"
+    txt.write_text(PAGE, encoding='utf-8')
+    output_dir = tmp_path / "entities"
+
+    def partial_write(path, **kwargs):
+        # Grava parte do arquivo temporário e falha (ex.: disco cheio)
+        with open(path, 'w') as tmp:
+            tmp.write("page,line\n")
+        raise OSError("disco cheio")
+
+    with patch.object(pd.DataFrame, 'to_csv', side_effect=partial_write):
+        assert extract_entities_to_dataset(str(txt), str(output_dir), table_format='csv') is None
+    assert list(output_dir.iterdir()) == []
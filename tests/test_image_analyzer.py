@@ -31,3 +31,111 @@ def test_has_text_in_images_negative():
     fake_path = "tests/data/inexistente.pdf"
     result = has_text_in_images(fake_path)
     assert result is False
+
+def _catalog_page(rotation=0.0, noisy=False, dpi=200):
+    import cv2
+    import fitz
+    import numpy as np
+    doc = fitz.open()
+    page = doc.new_page()
+    for y in range(80, 760, 18):
+        page.insert_text((50, y), "Peça ABC-1000 Parafuso sextavado M8 x 40 R$ 12,50", fontsize=10)
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width).copy()
+    doc.close()
+    if rotation:
+        h, w = gray.shape
+        M = cv2.getRotationMatrix2D((w // 2, h // 2), rotation, 1.0)
+        gray = cv2.warpAffine(gray, M, (w, h), borderValue=255)
+    if noisy:
+        noise = np.random.default_rng(1).normal(0, 25, gray.shape)
+        gray = np.clip(gray * 0.7 + 40 + noise, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+def _legacy_filters(image):
+    """Filtros do pré-processamento anterior (sem a rotação)."""
+    import cv2
+    import numpy as np
+    from src.classification.image_analyzer import get_adaptive_block_size
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    bilateral = cv2.bilateralFilter(gray, d=9, sigmaColor=75, sigmaSpace=75)
+    enhanced = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8)).apply(bilateral)
+    thresh = cv2.adaptiveThreshold(
+        cv2.medianBlur(enhanced, 3), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+        get_adaptive_block_size(gray.shape[1]), 2
+    )
+    return cv2.morphologyEx(thresh, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+
+def test_preprocess_stays_comparable_to_previous_filters():
+    from src.classification.image_analyzer import preprocess_image
+    for noisy in (False, True):
+        image = _catalog_page(noisy=noisy)
+        legacy = _legacy_filters(image)
+        assert (preprocess_image(image, options={'denoise': 'always'}) == legacy).all()
+        assert (preprocess_image(image) == legacy).mean() > 0.99
+
+def test_preprocess_skips_rotation_and_bilateral_on_clean_straight_page():
+    from src.classification.image_analyzer import preprocess_image
+    timings = {}
+    result = preprocess_image(_catalog_page()[:, :, 0], timings=timings)  # entrada 2-D
+    assert result.ndim == 2
+    assert 'rotate' not in timings
+    assert 'bilateral' not in timings
+
+def test_preprocess_runs_bilateral_on_noisy_page_and_rotates_skewed_page():
+    from src.classification.image_analyzer import preprocess_image
+    noisy, skewed = {}, {}
+    preprocess_image(_catalog_page(noisy=True), timings=noisy)
+    preprocess_image(_catalog_page(rotation=2.0), timings=skewed)
+    assert 'bilateral' in noisy
+    assert 'rotate' in skewed and 'bilateral' not in skewed
+
+def test_preprocess_skips_rotation_below_min_skew_angle():
+    from src.classification.image_analyzer import preprocess_image
+    timings = {}
+    preprocess_image(_catalog_page(rotation=2.0), options={'min_skew_angle': 5.0}, timings=timings)
+    assert 'rotate' not in timings
+
+def test_skew_estimated_on_downscaled_copy():
+    import cv2
+    from src.classification.image_analyzer import estimate_skew_angle
+    gray = cv2.cvtColor(_catalog_page(rotation=2.0), cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+    assert abs(estimate_skew_angle(small) + 2.0) < 0.3
+
+def _previous_preprocess(image):
+    """Pré-processamento anterior completo (filtros + inclinação por todos os segmentos de Hough)."""
+    import cv2
+    import numpy as np
+    morph = _legacy_filters(image)
+    lines = cv2.HoughLinesP(cv2.Canny(morph, 50, 150, apertureSize=3), 1, np.pi / 180,
+                            threshold=100, minLineLength=30, maxLineGap=5)
+    if lines is None:
+        return morph, None
+    angle = np.median([np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi
+                       for x1, y1, x2, y2 in lines.reshape(-1, 4).astype(float)])
+    h, w = morph.shape
+    M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    return cv2.warpAffine(morph, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE), angle
+
+REGRESSION_PAGES = [{}, {'noisy': True}, {'rotation': 2.0}, {'dpi': 300}]
+
+def test_legacy_options_reproduce_previous_pipeline():
+    from src.classification.image_analyzer import LEGACY_PREPROCESS_OPTIONS, preprocess_image
+    for page in REGRESSION_PAGES:
+        image = _catalog_page(**page)
+        assert (preprocess_image(image, options=LEGACY_PREPROCESS_OPTIONS) == _previous_preprocess(image)[0]).all()
+
+def test_default_route_regression_against_previous_pipeline():
+    from src.classification.image_analyzer import preprocess_image
+    for page in REGRESSION_PAGES:
+        image = _catalog_page(**page)
+        previous, angle = _previous_preprocess(image)
+        current = preprocess_image(image)
+        if abs(angle) <= 15.0:
+            # Inclinação plausível: mesmo resultado, salvo a borda da rotação
+            assert (current == previous).mean() > 0.9, page
+        else:
+            # Estimativa anterior girava a página em ±45°/±90°; fora isso, os filtros coincidem
+            assert abs(angle) in (45.0, 90.0), page
+            assert (current == _legacy_filters(image)).mean() > 0.99, page
@@ -0,0 +1,93 @@
+import os
+import pytest
+from unittest.mock import patch
+from src.utils.file_utils import write_text_atomic
+from src.utils.job_manifest import JobManifest, config_hash
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = JobManifest(str(tmp_path / "manifest.sqlite"))
+    yield manifest
+    manifest.close()
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / "catalogo.pdf"
+    path.write_bytes(b"%PDF-1.4 conteudo de teste")
+    return path
+
+
+def test_completed_only_when_done_and_output_exists(manifest, pdf_file, tmp_path):
+    content_hash = manifest.file_hash(pdf_file)
+    cfg = config_hash({'dpi': 300})
+    manifest.mark_running(content_hash, cfg, pdf_file)
+    # Execução interrompida: continua pendente
+    assert manifest.completed(content_hash, cfg) is None
+
+    output = tmp_path / "catalogo.txt"
+    output.write_text("texto")
+    manifest.mark_finished(content_hash, cfg, {
+        'status': 'done', 'pdf_type': 'text_only', 'extractor': 'extract_and_save_text',
+        'output_path': str(output), 'timings': {'extract': 0.1}
+    })
+    record = manifest.completed(content_hash, cfg)
+    assert record['pdf_type'] == 'text_only'
+    assert record['timings'] == {'extract': 0.1}
+
+    output.unlink()
+    assert manifest.completed(content_hash, cfg) is None
+
+
+def test_config_hash_ignores_performance_keys():
+    base = {'dpi': 300, 'ocr_language': 'por+eng'}
+    assert config_hash(base) == config_hash(dict(base, max_workers=4, page_chunk_size=8))
+    assert config_hash(base) != config_hash(dict(base, dpi=200))
+
+
+def test_config_hash_ignores_worker_sizing():
+    from src.batch_processor import config as default_config
+    sizing = dict(
+        cpu_budget=2, memory_budget_mb=1024, text_workers=3, ocr_workers=4, ocr_threads_per_worker=2,
+        watch_max_queue=8, debug_queue_size=4
+    )
+    assert config_hash(default_config) == config_hash(dict(default_config, **sizing))
+
+
+def test_config_hash_ignores_dispatch_keys():
+    from src.batch_processor import config as default_config
+    dispatch = dict(tasks_per_worker=8, worker_document_cache_mb=16)
+    assert config_hash(default_config) == config_hash(dict(default_config, **dispatch))
+
+
+def test_file_hash_is_reused_while_file_is_unchanged(manifest, pdf_file):
+    first = manifest.file_hash(pdf_file)
+    with patch("builtins.open", side_effect=AssertionError("não deveria reler o arquivo")):
+        assert manifest.file_hash(pdf_file) == first
+
+    pdf_file.write_bytes(b"%PDF-1.4 outro conteudo")
+    assert manifest.file_hash(pdf_file) != first
+
+
+def test_write_text_atomic_leaves_no_partial_file(tmp_path):
+    target = tmp_path / "saida.txt"
+    write_text_atomic(target, "conteúdo completo")
+    assert target.read_text(encoding="utf-8") == "conteúdo completo"
+
+    with patch("src.utils.file_utils.os.replace", side_effect=OSError("disco cheio")):
+        with pytest.raises(OSError):
+            write_text_atomic(target, "novo conteúdo")
+    assert target.read_text(encoding="utf-8") == "conteúdo completo"
+    assert os.listdir(tmp_path) == ["saida.txt"]
+
+
+def test_cost_samples_use_worker_timings(manifest, pdf_file):
+    content_hash = manifest.file_hash(pdf_file)
+    cfg = config_hash({'dpi': 300})
+    manifest.mark_running(content_hash, cfg, pdf_file)
+    manifest.mark_finished(content_hash, cfg, {
+        'status': 'done', 'pdf_type': 'tables', 'page_count': 4,
+        'timings': {'classify': 9.0, 'extract': 1.5, 'tables': 0.5}
+    })
+    assert manifest.cost_samples() == [('tables', 4, 2.0)]
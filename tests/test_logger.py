@@ -0,0 +1,65 @@
+import json
+import logging
+import multiprocessing
+
+import pytest
+from src.utils.logger import configure_worker_logging, log_listener, logging_queue, setup_logger
+
+
+def _log_from_worker(queue, level):
+    configure_worker_logging(queue, level)
+    setup_logger("teste.worker").info("mensagem do worker")
+
+
+@pytest.fixture
+def log_config(tmp_path):
+    return {'log_file': str(tmp_path / "processing.log"), 'log_format': 'json', 'log_level': 'INFO'}
+
+
+def _records(path):
+    return [json.loads(line) for line in open(path, encoding='utf-8')]
+
+
+def test_worker_records_go_through_listener(log_config):
+    with log_listener(log_config):
+        setup_logger("teste.principal").info("mensagem do principal")
+        queue, level = logging_queue()
+        process = multiprocessing.Process(target=_log_from_worker, args=(queue, level))
+        process.start()
+        process.join(30)
+
+    records = _records(log_config['log_file'])
+    messages = {r['message']: r for r in records}
+    assert "mensagem do principal" in messages
+    assert messages["mensagem do worker"]['process'] == process.pid
+    assert messages["mensagem do worker"]['logger'] == "teste.worker"
+
+
+def test_level_filters_per_page_detail(log_config):
+    with log_listener(dict(log_config, log_level='INFO')):
+        logger = setup_logger("teste.nivel")
+        logger.debug("detalhe da página 1")
+        logger.warning("aviso do documento")
+
+    messages = [r['message'] for r in _records(log_config['log_file'])]
+    assert messages == ["aviso do documento"]
+
+
+def test_listener_is_stopped_after_block(log_config):
+    with log_listener(log_config):
+        assert logging_queue()[0] is not None
+    assert logging_queue()[0] is None
+    handlers = setup_logger("teste.direto").handlers
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in handlers)
+
+
+def test_logger_keeps_its_own_file(log_config, tmp_path):
+    own_file = tmp_path / "proprio.log"
+    logger = setup_logger("teste.proprio", log_file=str(own_file))
+    with log_listener(log_config):
+        logger.info("pelo listener")
+    logger.info("direto")
+
+    own = own_file.read_text(encoding='utf-8')
+    assert "pelo listener" in own and "direto" in own
+    assert "pelo listener" not in open(log_config['log_file'], encoding='utf-8').read()
@@ -0,0 +1,80 @@
+import json
+
+from src.utils.metrics import Metrics, RunSummary, prometheus_text, stage_seconds, write_run_summary
+
+
+def test_span_counters_and_drain():
+    registry = Metrics()
+    with registry.span("ocr"):
+        pass
+    registry.observe("ocr", 0.5)
+    registry.incr("ocr_calls", 2)
+
+    snapshot = registry.drain()
+
+    assert snapshot['spans']['ocr']['count'] == 2
+    assert snapshot['spans']['ocr']['max_seconds'] >= 0.5
+    assert snapshot['counters'] == {'ocr_calls': 2}
+    assert registry.snapshot() == {'spans': {}, 'counters': {}}
+
+
+def test_merge_adds_worker_snapshots():
+    worker = Metrics()
+    worker.observe("rasterize", 0.25)
+    worker.incr("ocr_cache_hits")
+    total = Metrics()
+    total.merge(worker.snapshot())
+    total.merge(worker.snapshot())
+    total.merge(None)
+
+    snapshot = total.snapshot()
+    assert snapshot['spans']['rasterize'] == {'count': 2, 'total_seconds': 0.5, 'max_seconds': 0.25}
+    assert snapshot['counters']['ocr_cache_hits'] == 2
+    assert stage_seconds(snapshot) == {'rasterize': 0.5}
+
+
+def test_prometheus_text_format():
+    snapshot = {'spans': {'ocr': {'count': 3, 'total_seconds': 1.5, 'max_seconds': 0.7}}, 'counters': {'ocr_calls': 3}}
+    text = prometheus_text(snapshot, gauges={'run_pages': 10})
+
+    assert 'catalogos_stage_seconds_total{stage="ocr"} 1.5' in text
+    assert 'catalogos_stage_calls_total{stage="ocr"} 3' in text
+    assert 'catalogos_ocr_calls_total 3' in text
+    assert '# TYPE catalogos_run_pages gauge' in text
+    assert text.endswith("\n")
+
+
+def test_run_summary_is_written_as_json_and_prometheus(tmp_path):
+    summary = RunSummary()
+    summary.add_metrics("a.pdf", {'spans': {'classify': {'count': 1, 'total_seconds': 0.1, 'max_seconds': 0.1}}, 'counters': {}})
+    result = {'status': 'success', 'pdf_type': 'text_only', 'page_count': 4,
+              'metrics': {'spans': {'text_extraction': {'count': 4, 'total_seconds': 0.2, 'max_seconds': 0.1}}, 'counters': {}}}
+    summary.add_result("a.pdf", result)
+    assert 'metrics' not in result
+
+    run = summary.finish()
+    path = write_run_summary(run, str(tmp_path))
+
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved['files'] == 1 and saved['pages'] == 4
+    assert saved['status'] == {'success': 1}
+    assert saved['per_file']['a.pdf']['stages'] == {'classify': 0.1, 'text_extraction': 0.2}
+    assert (tmp_path / "metrics.prom").read_text(encoding='utf-8').count("catalogos_run_pages 4") == 1
+    assert len(list(tmp_path.glob("run_*.json"))) == 2
+
+
+def test_page_spans_stay_per_file_and_files_keep_full_paths():
+    worker = Metrics()
+    worker.observe("rasterize", 0.1, page=1)
+    worker.observe("ocr", 0.5, page=1)
+    worker.observe("ocr", 0.25, page=2)
+    summary = RunSummary()
+    summary.add_result("lote_a/catalogo.pdf", {'status': 'success', 'page_count': 2, 'metrics': worker.drain()})
+    summary.add_result("lote_b/catalogo.pdf", {'status': 'success', 'page_count': 1})
+
+    run = summary.finish()
+    assert set(run['per_file']) == {"lote_a/catalogo.pdf", "lote_b/catalogo.pdf"}
+    assert run['per_file']["lote_a/catalogo.pdf"]['pages'] == {'1': {'rasterize': 0.1, 'ocr': 0.5}, '2': {'ocr': 0.25}}
+    assert run['per_file']["lote_b/catalogo.pdf"]['pages'] == {}
+    assert 'pages' not in run['metrics']
+    assert run['metrics']['spans']['ocr']['count'] == 2
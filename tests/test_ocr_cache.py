@@ -0,0 +1,80 @@
+import pytest
+from src.utils.ocr_cache import OCRCache, cached_ocr, get_ocr_cache, image_hash
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr_cache.sqlite"), max_mb=1)
+    yield cache
+    cache.close()
+
+
+def test_miss_then_hit(cache):
+    assert cache.get("abc", "--psm 6 -l por+eng", dpi=300) is None
+    cache.put("abc", "--psm 6 -l por+eng", "Peça 123", dpi=300)
+    assert cache.get("abc", "--psm 6 -l por+eng", dpi=300) == "Peça 123"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_includes_ocr_config(cache):
+    cache.put("abc", "--psm 6 -l por+eng", "texto", dpi=300, preprocess_version="1")
+    assert cache.get("abc", "--psm 6 -l por+eng", dpi=200, preprocess_version="1") is None
+    assert cache.get("abc", "--psm 6 -l eng", dpi=300, preprocess_version="1") is None
+    assert cache.get("abc", "--psm 6 -l por+eng", dpi=300, preprocess_version="2") is None
+
+
+def test_key_includes_ocr_backend(cache):
+    cache.put("abc", "--psm 6 -l por+eng", "texto", dpi=300, preprocess_version="2", backend="subprocess")
+    assert cache.get("abc", "--psm 6 -l por+eng", dpi=300, preprocess_version="2", backend="tesserocr") is None
+    assert cache.get("abc", "--psm 6 -l por+eng", dpi=300, preprocess_version="2", backend="subprocess") == "texto"
+
+
+def test_cached_ocr_computes_once(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "resultado"
+
+    assert cached_ocr(cache, "h1", "cfg", compute) == "resultado"
+    assert cached_ocr(cache, "h1", "cfg", compute) == "resultado"
+    assert len(calls) == 1
+
+
+def test_lru_eviction_respects_size_limit(cache):
+    big_text = "x" * 200_000
+    for i in range(10):
+        cache.put(f"img{i}", "cfg", big_text)
+    assert cache.stats()["size_mb"] <= 1
+    # As entradas mais recentes permanecem
+    assert cache.get("img9", "cfg") == big_text
+    assert cache.get("img0", "cfg") is None
+
+
+def test_hits_do_not_write_until_flush(cache):
+    cache.put("img", "cfg", "texto")
+    cache.get("img", "cfg")
+    assert cache._conn.in_transaction is False
+    assert "img" not in cache._pending_access and len(cache._pending_access) == 1
+    cache.put("outra", "cfg", "texto")  # a próxima escrita grava os acessos pendentes
+    assert cache._pending_access == {}
+
+
+def test_pending_hits_keep_entries_out_of_lru_eviction(cache):
+    big_text = "x" * 200_000
+    for i in range(4):
+        cache.put(f"img{i}", "cfg", big_text)
+    assert cache.get("img0", "cfg") == big_text
+    for i in range(4, 6):
+        cache.put(f"img{i}", "cfg", big_text)
+    assert cache.get("img0", "cfg") == big_text
+    assert cache.get("img1", "cfg") is None
+
+
+def test_cache_disabled_by_default():
+    assert get_ocr_cache({}) is None
+
+
+def test_image_hash_accepts_bytes():
+    assert image_hash(b"abc") == image_hash(bytearray(b"abc"))
@@ -0,0 +1,95 @@
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from PIL import Image
+from src.extraction import ocr_engine
+from src.extraction.ocr_engine import (
+    SubprocessBackend, TesserocrBackend, get_ocr_backend, parse_tesseract_config, tesseract_variables
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_backends():
+    ocr_engine._backends.clear()
+    yield
+    ocr_engine._backends.clear()
+
+
+def test_parse_tesseract_config():
+    assert parse_tesseract_config("--oem 3 --psm 6 -l por+eng") == ("por+eng", 6, 3, "")
+    assert parse_tesseract_config("--psm 4") == ("eng", 4, 3, "")
+
+
+@patch("src.extraction.ocr_engine.pytesseract.image_to_string", return_value="texto")
+def test_subprocess_backend_uses_pytesseract(mock_ocr):
+    backend = SubprocessBackend()
+    assert backend.image_to_string("img", config="--psm 6") == "texto"
+    mock_ocr.assert_called_once_with("img", config="--psm 6")
+
+
+def test_falls_back_to_subprocess_without_tesserocr():
+    with patch.dict(sys.modules, {"tesserocr": None}):
+        backend = get_ocr_backend({'ocr_backend': 'auto'})
+    assert isinstance(backend, SubprocessBackend)
+    # Uma instância por processo
+    assert get_ocr_backend({'ocr_backend': 'auto'}) is backend
+
+
+def test_tesserocr_backend_reuses_engine_per_language():
+    api = MagicMock()
+    api.GetUTF8Text.return_value = "Peça ABC-123"
+    fake_tesserocr = SimpleNamespace(PyTessBaseAPI=MagicMock(return_value=api))
+
+    with patch.dict(sys.modules, {"tesserocr": fake_tesserocr}):
+        backend = get_ocr_backend({'ocr_backend': 'tesserocr'})
+        assert isinstance(backend, TesserocrBackend)
+        image = np.zeros((20, 20), dtype=np.uint8)
+        for _ in range(3):
+            assert backend.image_to_string(image, config="--oem 3 --psm 6 -l por+eng") == "Peça ABC-123"
+
+    fake_tesserocr.PyTessBaseAPI.assert_called_once()
+    assert fake_tesserocr.PyTessBaseAPI.call_args.kwargs["lang"] == "por+eng"
+    # Arrays em cinza são passados como bytes; imagens PIL continuam por SetImage
+    assert api.SetImageBytes.call_count == 3
+    assert api.SetImageBytes.call_args.args[1:] == (20, 20, 1, 20)
+    backend.image_to_string(Image.new("RGB", (20, 20)), config="--oem 3 --psm 6 -l por+eng")
+    assert api.SetImage.call_count == 1
+    backend.close()
+    api.End.assert_called_once()
+
+
+def test_tesseract_variables_from_remaining_options():
+    assert tesseract_variables("-c preserve_interword_spaces=1 --dpi 300") == (
+        (("preserve_interword_spaces", "1"), ("user_defined_dpi", "300")), ()
+    )
+    assert tesseract_variables("--user-words palavras.txt") == ((), ("--user-words palavras.txt",))
+
+
+def test_tesserocr_backend_applies_variables_per_engine():
+    apis = []
+
+    def new_api(**kwargs):
+        api = MagicMock()
+        apis.append(api)
+        return api
+
+    fake_tesserocr = SimpleNamespace(PyTessBaseAPI=MagicMock(side_effect=new_api))
+    with patch.dict(sys.modules, {"tesserocr": fake_tesserocr}):
+        backend = get_ocr_backend({'ocr_backend': 'tesserocr'})
+        image = np.zeros((20, 20), dtype=np.uint8)
+        backend.image_to_string(image, config="--psm 6 -l por -c preserve_interword_spaces=1")
+        backend.image_to_string(image, config="--psm 6 -l por")
+        with patch.object(ocr_engine.logger, "warning") as warning:
+            backend.image_to_string(image, config="--psm 6 -l por --user-patterns p.txt")
+            backend.image_to_string(image, config="--psm 6 -l por --user-patterns p.txt")
+            backend.image_to_string(image, config="--psm 6 -l por --user-words w.txt")
+
+    # Variáveis diferentes, motores diferentes: a configuração sem -c não herda a variável
+    assert len(apis) == 2
+    apis[0].SetVariable.assert_called_once_with("preserve_interword_spaces", "1")
+    apis[1].SetVariable.assert_not_called()
+    # Cada opção sem suporte é avisada uma vez
+    assert warning.call_count == 2
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 import numpy as np
 from pathlib import Path
+from src.extraction.ocr_engine import SubprocessBackend
 from src.extraction.ocr_processor import extract_text_from_images
 
 DUMMY_PDF = "tests/data/fake.pdf"
@@ -17,7 +18,7 @@ def test_extract_text_success(mock_mkdir, mock_preprocess, mock_ocr, mock_conver
     mock_ocr.return_value = "Texto detectado"
 
     output_dir = "tests/output"
-    result_path = extract_text_from_images(DUMMY_PDF, output_dir=output_dir)
+    result_path = extract_text_from_images(DUMMY_PDF, output_dir=output_dir, ocr_backend=SubprocessBackend())
 
     # Criamos a instância esperada para o arquivo de saída
     expected_output_path = Path(output_dir) / "fake.txt"
@@ -32,3 +33,52 @@ def test_extract_text_success(mock_mkdir, mock_preprocess, mock_ocr, mock_conver
 def test_extract_text_file_not_found(mock_convert):
     result = extract_text_from_images("tests/data/inexistente.pdf", output_dir="tests/output")
     assert result is None
+
+@patch("src.extraction.ocr_processor.convert_from_path")
+def test_iter_page_images_renders_in_windows(mock_convert):
+    from src.extraction.ocr_processor import iter_page_images
+    pages = [np.zeros((10, 10), dtype=np.uint8) for _ in range(5)]
+    mock_convert.side_effect = lambda path, dpi, first_page, last_page: pages[first_page - 1:last_page]
+
+    numbers = [number for number, _ in iter_page_images(DUMMY_PDF, dpi=72, window=2)]
+
+    assert numbers == [1, 2, 3, 4, 5]
+    windows = [(c.kwargs["first_page"], c.kwargs["last_page"]) for c in mock_convert.call_args_list]
+    assert windows == [(1, 2), (3, 4), (5, 6)]
+
+
+def _text_page(noisy: bool) -> np.ndarray:
+    image = np.full((400, 600), 255, dtype=np.uint8)
+    for y in range(30, 380, 25):
+        image[y:y + 8, 40:560:3] = 0
+    if noisy:
+        rng = np.random.default_rng(0)
+        image = np.clip(image * 0.6 + 50 + rng.normal(0, 25, image.shape), 0, 255).astype(np.uint8)
+    return image
+
+
+@patch("src.extraction.ocr_processor.pytesseract.image_to_string")
+def test_preprocess_does_not_call_tesseract(mock_ocr):
+    from src.extraction.ocr_processor import preprocess_image
+    preprocess_image(_text_page(noisy=False))
+    preprocess_image(_text_page(noisy=True))
+    mock_ocr.assert_not_called()
+
+
+def test_preprocess_routes_by_estimated_quality():
+    from src.extraction.ocr_processor import preprocess_image
+    clean = _text_page(noisy=False)
+    assert np.array_equal(preprocess_image(clean), clean)
+
+    binarized = preprocess_image(_text_page(noisy=True))
+    assert set(np.unique(binarized)) <= {0, 255}
+
+
+@patch("src.extraction.ocr_processor.convert_from_path")
+@patch("src.extraction.ocr_processor.pytesseract.image_to_string", return_value="Texto detectado")
+def test_one_tesseract_call_per_page(mock_ocr, mock_convert):
+    from src.extraction.ocr_processor import ocr_pages
+    mock_convert.return_value = [_text_page(noisy=False), _text_page(noisy=True)]
+    texts = ocr_pages(DUMMY_PDF, ocr_backend=SubprocessBackend())
+    assert len(texts) == 2
+    assert mock_ocr.call_count == 2
@@ -0,0 +1,142 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import fitz  # PyMuPDF
+import pytest
+from src.extraction.mixed_extractor import extract_text_mixed
+from src.extraction.page_router import extract_text_routed
+from src.utils.page_fingerprints import get_page_store, page_fingerprint
+
+
+def _scanned_png(label: str) -> bytes:
+    src = fitz.open()
+    page = src.new_page(width=200, height=100)
+    page.insert_text((10, 50), label, fontsize=14)
+    png = page.get_pixmap(dpi=72).tobytes("png")
+    src.close()
+    return png
+
+
+def _catalog(path, pages) -> str:
+    """`pages`: ('text', conteúdo) ou ('scan', rótulo da imagem), uma por página."""
+    doc = fitz.open()
+    for kind, value in pages:
+        page = doc.new_page()
+        if kind == "text":
+            page.insert_text((50, 72), value, fontsize=11)
+        else:
+            page.insert_image(page.rect, stream=_scanned_png(value))
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        'min_text_length': 15, 'dpi': 50, 'enable_page_fingerprints': True,
+        'page_fingerprint_path': str(tmp_path / "fingerprints.sqlite"),
+    }
+
+
+def test_fingerprint_sees_content_and_raster_changes(tmp_path):
+    first = _catalog(tmp_path / "a.pdf", [("text", "Parafuso M8 R$ 12,50"), ("scan", "Peça A")])
+    second = _catalog(tmp_path / "b.pdf", [("text", "Parafuso M8 R$ 12,80"), ("scan", "Peça B")])
+    with fitz.open(first) as a, fitz.open(second) as b:
+        old_text, old_scan = page_fingerprint(a[0]), page_fingerprint(a[1])
+        new_text, new_scan = page_fingerprint(b[0]), page_fingerprint(b[1])
+        assert page_fingerprint(a[0]) == old_text
+
+    assert old_text[0] != new_text[0]
+    # Mesma imagem referenciada pelo mesmo nome: só o raster muda
+    assert old_scan[0] == new_scan[0] and old_scan[1] != new_scan[1]
+
+
+def test_new_edition_only_extracts_changed_pages(tmp_path, config):
+    backend = MagicMock()
+    backend.image_to_string.side_effect = lambda image, config: f"OCR {backend.image_to_string.call_count}"
+    edition_1 = _catalog(tmp_path / "catalogo_2024.pdf", [
+        ("text", "Catálogo de peças - Parafuso sextavado M8 x 40"), ("scan", "Peça A"), ("scan", "Peça B"),
+    ])
+    edition_2 = _catalog(tmp_path / "catalogo_2025.pdf", [
+        ("text", "Catálogo de peças - Parafuso sextavado M8 x 40"), ("scan", "Peça A"),
+        ("scan", "Peça C"), ("scan", "Peça B"),
+    ])
+
+    extract_text_routed(edition_1, str(tmp_path / "out"), config, ocr_backend=backend,
+                        page_store=get_page_store(config))
+    assert backend.image_to_string.call_count == 2
+
+    txt_path = extract_text_routed(edition_2, str(tmp_path / "out"), config, ocr_backend=backend,
+                                   page_store=get_page_store(config))
+
+    # Só a página nova passou pelo OCR; as demais vieram da edição anterior, mesmo deslocadas
+    assert backend.image_to_string.call_count == 3
+    assert open(txt_path, encoding='utf-8').read().split("\n")[1:] == ["OCR 1", "OCR 3", "OCR 2"]
+    metadata = json.loads((tmp_path / "out" / "catalogo_2025.pages.json").read_text(encoding='utf-8'))
+    # A página de texto é relida da camada de texto, sem impressão digital
+    assert [page.get('reused', False) for page in metadata['pages']] == [False, True, False, True]
+    assert [page['route'] for page in metadata['pages']] == ['text', 'ocr', 'ocr', 'ocr']
+
+
+def test_results_are_kept_per_configuration(tmp_path, config):
+    backend = MagicMock()
+    backend.image_to_string.return_value = "Texto reconhecido por OCR"
+    pdf = _catalog(tmp_path / "catalogo.pdf", [("scan", "Peça A"), ("text", "Arruela lisa 3/8 R$ 0,35")])
+
+    extract_text_mixed(pdf, str(tmp_path / "out"), dpi=50, ocr_backend=backend, page_store=get_page_store(config))
+    extract_text_mixed(pdf, str(tmp_path / "out"), dpi=50, ocr_backend=backend, page_store=get_page_store(config))
+    assert backend.image_to_string.call_count == 1
+
+    other = dict(config, dpi=100)
+    extract_text_mixed(pdf, str(tmp_path / "out"), dpi=100, ocr_backend=backend, page_store=get_page_store(other))
+    assert backend.image_to_string.call_count == 2
+    assert get_page_store(dict(config, enable_page_fingerprints=False)) is None
+
+
+def test_router_does_not_reuse_mixed_extractor_pages(tmp_path, config):
+    backend = MagicMock()
+    backend.image_to_string.return_value = "Texto reconhecido por OCR"
+    pdf = _catalog(tmp_path / "catalogo.pdf", [("scan", "Peça A"), ("text", "Arruela lisa 3/8 R$ 0,35")])
+
+    extract_text_mixed(pdf, str(tmp_path / "out"), dpi=50, ocr_backend=backend, page_store=get_page_store(config))
+    extract_text_routed(pdf, str(tmp_path / "out"), config, ocr_backend=backend, page_store=get_page_store(config))
+
+    # Os registros do extrator misto não têm a decisão de rota: o roteador extrai de novo
+    assert backend.image_to_string.call_count == 2
+    metadata = json.loads((tmp_path / "out" / "catalogo.pages.json").read_text(encoding='utf-8'))
+    assert [page['route'] for page in metadata['pages']] == ['ocr', 'text']
+
+
+def test_empty_ocr_results_are_not_reused(tmp_path, config):
+    backend = MagicMock()
+    backend.image_to_string.return_value = ""
+    pdf = _catalog(tmp_path / "catalogo.pdf", [("scan", "Peça A")])
+
+    extract_text_mixed(pdf, str(tmp_path / "out"), dpi=50, ocr_backend=backend, page_store=get_page_store(config))
+    backend.image_to_string.return_value = "Peça A"
+    extract_text_mixed(pdf, str(tmp_path / "out"), dpi=50, ocr_backend=backend, page_store=get_page_store(config))
+
+    # A primeira leitura vazia não foi guardada: a página passou de novo pelo OCR
+    assert backend.image_to_string.call_count == 2
+    assert open(tmp_path / "out" / "catalogo.txt", encoding='utf-8').read() == "Peça A"
+
+
+def test_text_pages_are_not_rasterized_for_fingerprints(tmp_path, config):
+    backend = MagicMock()
+    backend.image_to_string.return_value = "Peça A"
+    pdf = _catalog(tmp_path / "catalogo.pdf", [
+        ("text", "Catálogo de peças - Parafuso sextavado M8 x 40"), ("scan", "Peça A"),
+    ])
+    fingerprinted = []
+
+    def record(page, *args, **kwargs):
+        fingerprinted.append(page.number)
+        return page_fingerprint(page, *args, **kwargs)
+
+    with patch("src.utils.page_fingerprints.page_fingerprint", side_effect=record):
+        extract_text_routed(pdf, str(tmp_path / "out"), config, ocr_backend=backend, page_store=get_page_store(config))
+        extract_text_mixed(pdf, str(tmp_path / "out"), dpi=50, ocr_backend=backend, page_store=get_page_store(config))
+
+    # Só a página digitalizada, uma vez por extrator
+    assert fingerprinted == [1, 1]
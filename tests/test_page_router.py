@@ -0,0 +1,71 @@
+import json
+from unittest.mock import MagicMock
+
+import fitz  # PyMuPDF
+import pytest
+from src.extraction.page_router import _ocr_runs, extract_text_routed, route_page
+from src.utils.document_context import PDFDocumentContext
+
+
+def _scanned_png() -> bytes:
+    src = fitz.open()
+    page = src.new_page(width=200, height=100)
+    page.insert_text((10, 50), "Peça digitalizada", fontsize=14)
+    png = page.get_pixmap(dpi=72).tobytes("png")
+    src.close()
+    return png
+
+
+@pytest.fixture
+def catalog_pdf(tmp_path):
+    """Páginas: texto, digitalizada, em branco, digitalizada, digitalizada."""
+    png = _scanned_png()
+    doc = fitz.open()
+    for kind in ("text", "scan", "blank", "scan", "scan"):
+        page = doc.new_page()
+        if kind == "text":
+            page.insert_text((50, 72), "Catálogo de peças - Parafuso sextavado M8 x 40", fontsize=11)
+        elif kind == "scan":
+            page.insert_image(page.rect, stream=png)
+    path = tmp_path / "catalogo.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_route_page_uses_text_layer_ocr_or_blank(catalog_pdf):
+    with PDFDocumentContext(catalog_pdf) as context:
+        routes = [route_page(context.page(i), context.page_text(i))['route'] for i in range(context.page_count)]
+    assert routes == ['text', 'ocr', 'blank', 'ocr', 'ocr']
+
+
+def test_ocr_runs_groups_contiguous_pages():
+    assert _ocr_runs([2, 4, 5, 9]) == [(2, 2), (4, 5), (9, 9)]
+
+
+def test_extract_text_routed_ocrs_only_scanned_pages(catalog_pdf, tmp_path):
+    backend = MagicMock()
+    backend.image_to_string.return_value = "Texto reconhecido por OCR"
+    config = {'min_text_length': 15, 'dpi': 50}
+
+    txt_path = extract_text_routed(catalog_pdf, str(tmp_path / "out"), config, ocr_backend=backend)
+
+    assert backend.image_to_string.call_count == 3
+    text = open(txt_path, encoding='utf-8').read()
+    metadata = json.loads((tmp_path / "out" / "catalogo.pages.json").read_text(encoding='utf-8'))
+    assert metadata['routes'] == {'text': 1, 'ocr': 3, 'blank': 1}
+    assert [p['route'] for p in metadata['pages']] == ['text', 'ocr', 'blank', 'ocr', 'ocr']
+    # Os deslocamentos apontam para o texto de cada página no .txt
+    first, second = metadata['pages'][0], metadata['pages'][1]
+    assert text[first['char_start']:first['char_end']].startswith("Catálogo de peças")
+    assert text[second['char_start']:second['char_end']] == "Texto reconhecido por OCR"
+
+
+def test_extract_text_routed_uses_configured_language(catalog_pdf, tmp_path):
+    backend = MagicMock()
+    backend.image_to_string.return_value = "Recognized text"
+    config = {'min_text_length': 15, 'dpi': 50, 'ocr_language': 'eng'}
+
+    extract_text_routed(catalog_pdf, str(tmp_path / "out"), config, ocr_backend=backend)
+
+    assert {call.kwargs['config'] for call in backend.image_to_string.call_args_list} == {"--psm 6 -l eng"}
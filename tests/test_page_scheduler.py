@@ -0,0 +1,84 @@
+import pytest
+from src.extraction.page_scheduler import (
+    DEFAULT_SECONDS_PER_PAGE, CostModel, PageAssembler, TaskPlanner, split_page_ranges
+)
+
+
+def plan(classified, **kwargs):
+    """Todas as tarefas dos arquivos, como o lote as recebe do TaskPlanner."""
+    planner = TaskPlanner(**kwargs)
+    return [task for item in classified for task in planner.add(item)] + planner.flush()
+
+
+def test_split_page_ranges_covers_all_pages():
+    assert split_page_ranges(10, 4) == [(1, 4), (5, 8), (9, 10)]
+    assert split_page_ranges(3, 16) == [(1, 3)]
+
+
+def test_plan_splits_only_large_ocr_documents():
+    classified = [
+        {'path': 'grande.pdf', 'pdf_type': 'image_only', 'page_count': 100},
+        {'path': 'pequeno.pdf', 'pdf_type': 'image_only', 'page_count': 5},
+        {'path': 'texto.pdf', 'pdf_type': 'text_only', 'page_count': 500},
+    ]
+    tasks = plan(classified, chunk_size=16, split_threshold=32)
+
+    chunks = [t for t in tasks if t.pdf_path == 'grande.pdf']
+    assert len(chunks) == 7
+    assert all(t.is_chunk for t in chunks)
+    assert [t for t in tasks if t.pdf_path == 'texto.pdf'][0].is_chunk is False
+
+
+def test_assembler_restores_page_order():
+    tasks = plan([{'path': 'doc.pdf', 'pdf_type': 'mixed', 'page_count': 6}], chunk_size=2, split_threshold=2)
+    assembler = PageAssembler()
+    # Blocos chegam fora de ordem
+    assert assembler.add(tasks[2], ['p5', 'p6']) is None
+    assert assembler.add(tasks[0], ['p1', 'p2']) is None
+    assert assembler.add(tasks[1], ['p3', 'p4']) == ['p1', 'p2', 'p3', 'p4', 'p5', 'p6']
+
+
+def test_cost_model_ranks_scanned_above_larger_text_documents():
+    classified = [
+        {'path': 'vetorial.pdf', 'pdf_type': 'text_only', 'page_count': 300},
+        {'path': 'digitalizado.pdf', 'pdf_type': 'image_only', 'page_count': 20},
+    ]
+    tasks = plan(classified, split_threshold=1000)
+    # O lote despacha do maior custo para o menor (LPT)
+    assert [t.pdf_path for t in sorted(tasks, key=lambda t: t.cost, reverse=True)] == ['digitalizado.pdf', 'vetorial.pdf']
+
+
+def test_cost_model_learns_from_history():
+    model = CostModel.from_history([
+        ('text_only', 10, 5.0), ('text_only', 20, 10.0), ('text_only', 5, 2.5),
+        ('mixed', 10, 1.0),  # poucas amostras: mantém o padrão
+    ])
+    assert model.page_cost('text_only') == pytest.approx(0.5)
+    assert model.page_cost('mixed') == DEFAULT_SECONDS_PER_PAGE['mixed']
+
+
+def test_small_files_are_batched_per_type():
+    classified = [{'path': f'p{i}.pdf', 'pdf_type': 'text_only', 'page_count': 2} for i in range(10)]
+    classified.append({'path': 'scan.pdf', 'pdf_type': 'image_only', 'page_count': 1})
+    tasks = plan(classified, cost_model=CostModel({'text_only': 0.1}), batch_seconds=1.0, max_batch_files=4)
+
+    batches = [t for t in tasks if t.is_batch]
+    assert sorted(len(t.batch_paths) for t in batches) == [2, 4, 4]
+    assert all(t.pdf_type == 'text_only' for t in batches)
+    # O único arquivo do seu tipo continua sozinho
+    assert [t.pdf_path for t in tasks if not t.is_batch] == ['scan.pdf']
+    batched = sorted(p for t in batches for p in t.batch_paths)
+    assert batched == sorted(f'p{i}.pdf' for i in range(10))
+
+
+def test_planner_releases_tasks_as_files_arrive():
+    planner = TaskPlanner(chunk_size=16, split_threshold=32, cost_model=CostModel({'text_only': 0.1}),
+                          batch_seconds=1.0, max_batch_files=2)
+    # Documento grande sai na hora; pequenos esperam o lote fechar
+    assert len(planner.add({'path': 'grande.pdf', 'pdf_type': 'image_only', 'page_count': 40})) == 3
+    assert planner.add({'path': 'a.pdf', 'pdf_type': 'text_only', 'page_count': 2}) == []
+    batch = planner.add({'path': 'b.pdf', 'pdf_type': 'text_only', 'page_count': 2})
+    assert [t.batch_paths for t in batch] == [('a.pdf', 'b.pdf')]
+    planner.add({'path': 'c.pdf', 'pdf_type': 'text_only', 'page_count': 2})
+    assert [t.pdf_path for t in planner.flush()] == ['c.pdf']
+    assert planner.flush() == []
@@ -54,3 +54,68 @@ def test_classify_fully_unprocessable(mock_image_text, mock_selectable):
     classifier = PDFClassifier(CONFIG)
     result = classifier.classify(DUMMY_PATH)
     assert result == "unprocessable"
+
+
+import fitz
+
+
+def _gray_pixmap(size=400):
+    src = fitz.open()
+    page = src.new_page(width=size, height=size)
+    page.draw_rect(page.rect, color=None, fill=(0.6, 0.6, 0.6))
+    return page.get_pixmap(dpi=72)
+
+
+def _build_pdf(path, kind):
+    doc = fitz.open()
+    for _ in range(3):
+        page = doc.new_page()
+        if kind in ("text", "text_with_photo"):
+            page.insert_text((72, 72), "Catálogo de peças: parafuso sextavado M8 x 40")
+        if kind == "scanned":
+            page.insert_image(page.rect, pixmap=_gray_pixmap())
+        if kind == "text_with_photo":
+            page.insert_image(fitz.Rect(72, 150, 500, 700), pixmap=_gray_pixmap())
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@patch("src.classification.pdf_classifier.has_text_in_images")
+def test_structure_tier_decides_text_only_without_ocr(mock_image_text, tmp_path):
+    pdf_path = _build_pdf(tmp_path / "texto.pdf", "text")
+    classifier = PDFClassifier(CONFIG)
+    assert classifier.classify(pdf_path) == "text_only"
+    mock_image_text.assert_not_called()
+    analysis = classifier.get_last_analysis()
+    assert analysis['tier'] == 'structure'
+    assert 'structure' in analysis['tier_timings']
+
+
+@patch("src.classification.pdf_classifier.has_text_in_images")
+def test_structure_tier_detects_scanned_pages(mock_image_text, tmp_path):
+    pdf_path = _build_pdf(tmp_path / "scan.pdf", "scanned")
+    classifier = PDFClassifier(CONFIG)
+    assert classifier.classify(pdf_path) == "image_only"
+    mock_image_text.assert_not_called()
+
+
+@patch("src.classification.pdf_classifier.has_text_in_images", return_value=True)
+def test_ocr_probe_only_on_undecided_pages(mock_image_text, tmp_path):
+    pdf_path = _build_pdf(tmp_path / "misto.pdf", "text_with_photo")
+    classifier = PDFClassifier(CONFIG)
+    assert classifier.classify(pdf_path) == "mixed"
+    assert mock_image_text.call_args.kwargs['page_indexes'] == [0, 1]
+    analysis = classifier.get_last_analysis()
+    assert analysis['tier'] == 'ocr_probe'
+    assert set(analysis['tier_timings']) == {'structure', 'ocr_probe'}
+
+
+@patch("src.classification.pdf_classifier.has_selectable_text", return_value=True)
+@patch("src.classification.pdf_classifier.has_text_in_images", return_value=False)
+def test_fast_classification_can_be_disabled(mock_image_text, mock_selectable, tmp_path):
+    pdf_path = _build_pdf(tmp_path / "texto.pdf", "text")
+    classifier = PDFClassifier(dict(CONFIG, fast_classification=False))
+    assert classifier.classify(pdf_path) == "text_only"
+    mock_image_text.assert_called_once()
+    assert classifier.get_last_analysis()['tier'] == 'full'
@@ -0,0 +1,50 @@
+import os
+from unittest.mock import patch
+
+from src.utils.resources import limit_worker_threads, pool_shares, pool_size
+
+
+@patch("src.utils.resources.available_memory_mb", return_value=64000)
+@patch("src.utils.resources.cpu_budget", return_value=32)
+def test_ocr_pool_divides_cores_by_threads(mock_cpu, mock_mem):
+    config = {'ocr_threads_per_worker': 4}
+    assert pool_size(config, 'ocr') == 8
+    assert pool_size(config, 'text') == 32
+
+
+@patch("src.utils.resources.cpu_budget", return_value=32)
+def test_pool_limited_by_memory_budget(mock_cpu):
+    config = {'memory_budget_mb': 2800, 'ocr_worker_memory_mb': 700}
+    assert pool_size(config, 'ocr') == 4
+
+
+@patch("src.utils.resources.available_memory_mb", return_value=None)
+@patch("src.utils.resources.cpu_budget", return_value=32)
+def test_explicit_sizes_and_max_workers(mock_cpu, mock_mem):
+    assert pool_size({'text_workers': 6}, 'text') == 6
+    assert pool_size({'max_workers': 3}, 'text') == 3
+    assert pool_size({'memory_budget_mb': 10}, 'ocr') == 1
+
+
+@patch("src.utils.resources.cpu_budget", return_value=16)
+def test_concurrent_pools_split_the_budget(mock_cpu):
+    config = {'memory_budget_mb': 8400, 'ocr_pool_share': 0.75, 'ocr_threads_per_worker': 2}
+    shares = pool_shares(config)
+    text, ocr = pool_size(config, 'text', shares['text']), pool_size(config, 'ocr', shares['ocr'])
+    # CPU: 4 núcleos para texto e 12 / 2 threads para OCR; memória: 2100 MB e 6300 MB
+    assert (text, ocr) == (3, 6)
+    assert text + ocr * 2 <= 16
+
+
+@patch("src.utils.resources.available_memory_mb", return_value=None)
+@patch("src.utils.resources.cpu_budget", return_value=8)
+def test_routed_text_workers_budgeted_for_ocr(mock_cpu, mock_mem):
+    assert pool_size({'memory_budget_mb': 2800}, 'text') == 4
+    assert pool_size({'memory_budget_mb': 2800, 'page_routing': False}, 'text') == 8
+
+
+def test_limit_worker_threads_sets_omp_and_opencv():
+    with patch.dict(os.environ, {}, clear=False), patch("cv2.setNumThreads") as mock_set:
+        limit_worker_threads(2)
+        assert os.environ["OMP_THREAD_LIMIT"] == "2"
+        mock_set.assert_called_once_with(2)
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+from src.processing.search_index import (
+    SearchIndex, build_index, extract_part_numbers, index_result, normalize_part_number, read_text_pages
+)
+
+
+def _write_routed(text_dir, name, pages):
+    """.txt e .pages.json como os do roteamento por página."""
+    text_dir.mkdir(parents=True, exist_ok=True)
+    decisions, offset = [], 0
+    for number, text in enumerate(pages, start=1):
+        decisions.append({'page': number, 'route': 'text', 'char_start': offset, 'char_end': offset + len(text)})
+        offset += len(text) + 1
+    (text_dir / f"{name}.txt").write_text("\n".join(pages), encoding='utf-8')
+    (text_dir / f"{name}.pages.json").write_text(json.dumps({'pages': decisions}), encoding='utf-8')
+    return text_dir / f"{name}.txt"
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.sqlite"))
+    yield index
+    index.close()
+
+
+def test_part_numbers_are_normalized():
+    assert normalize_part_number("abc-12.34") == "ABC1234"
+    parts = extract_part_numbers("Cód. ABC-1234 rolamento 6204-2RS por R$ 1.250 em 2024")
+    assert parts == {'ABC1234': 'ABC-1234', '62042RS': '6204-2RS'}
+
+
+def test_search_returns_page_level_hits(index, tmp_path):
+    txt = _write_routed(tmp_path / "text" / "text_only", "catalogo", [
+        "Parafusos sextavados zincados",
+        "Rolamento blindado 6204-2RS para motores elétricos",
+    ])
+    assert index.add_text_file(str(txt), source="catalogo.pdf") == 2
+
+    hits = index.search("eletricos rolamento")
+    assert [(hit['source'], hit['page']) for hit in hits] == [("catalogo.pdf", 2)]
+    assert "[Rolamento]" in hits[0]['snippet']
+    assert index.search("rolam*")[0]['page'] == 2
+
+    parts = index.find_part("6204 2rs")
+    assert [(part['page'], part['part_number'], part['pdf_type']) for part in parts] == [(2, "6204-2RS", "text_only")]
+    assert index.find_part("6204", prefix=True)[0]['page'] == 2
+
+
+def test_reindexing_replaces_previous_pages(index, tmp_path):
+    text_dir = tmp_path / "text" / "image_only"
+    txt = _write_routed(text_dir, "catalogo", ["Peça ABC-1000"])
+    index.add_text_file(str(txt))
+    txt = _write_routed(text_dir, "catalogo", ["Peça XYZ-2000"])
+    index.add_text_file(str(txt))
+
+    assert index.find_part("ABC-1000") == []
+    assert index.search("ABC") == []
+    assert len(index.find_part("XYZ-2000")) == 1
+    assert index.stats() == {'documents': 1, 'pages': 1, 'part_numbers': 1}
+
+
+def test_build_index_is_incremental_and_handles_plain_text(index, tmp_path):
+    text_dir = tmp_path / "text"
+    _write_routed(text_dir / "text_only", "a", ["Correia dentada HTD-800"])
+    (text_dir / "tables").mkdir(parents=True)
+    (text_dir / "tables" / "b.txt").write_text("Tabela de preços ref. QWE-55", encoding='utf-8')
+
+    assert build_index(index, str(text_dir))['files'] == 2
+    assert build_index(index, str(text_dir))['files'] == 0
+    # Sem .pages.json o documento inteiro é a página 0
+    assert index.find_part("QWE55")[0]['page'] == 0
+
+
+def test_index_result_uses_config(tmp_path):
+    txt = _write_routed(tmp_path / "text" / "mixed", "c", ["Mangueira MGR-10"])
+    result = {'path': "data/input/pending/c.pdf", 'pdf_type': 'mixed', 'output_path': str(txt)}
+
+    assert index_result(result, {'enable_search_index': False}) == 0
+    config = {'enable_search_index': True, 'search_index_path': str(tmp_path / "idx.sqlite")}
+    assert index_result(result, config) == 1
+    assert index_result({'status': 'failed'}, config) == 0
+
+
+def test_stale_page_map_is_ignored(tmp_path):
+    txt = _write_routed(tmp_path, "catalogo", ["Página um", "Página dois"])
+    assert read_text_pages(str(txt)) == [(1, "Página um"), (2, "Página dois")]
+
+    # Saída posterior sem roteamento, com o .pages.json da execução anterior ao lado
+    txt.write_text("Texto de outra extração, bem mais longo que o anterior", encoding='utf-8')
+    assert read_text_pages(str(txt)) == [(0, "Texto de outra extração, bem mais longo que o anterior")]
+
+
+def test_unrouted_save_removes_page_map(tmp_path):
+    from src.extraction.mixed_extractor import save_mixed_text
+    txt = _write_routed(tmp_path, "catalogo", ["Página um", "Página dois"])
+    save_mixed_text("catalogo.pdf", str(tmp_path), ["Texto misto"])
+    assert not (tmp_path / "catalogo.pages.json").exists()
+    assert read_text_pages(str(txt)) == [(0, "Texto misto")]
@@ -36,3 +36,68 @@ def test_has_tables_invalid_file():
 def test_has_tables_exception_handling(mock_open):
     result = has_tables_in_pdf(TEST_PDF_WITH_TABLES)
     assert result is False
+
+
+def _pdf_with_page(tmp_path, draw):
+    import fitz
+    doc = fitz.open()
+    page = doc.new_page()
+    draw(page)
+    path = tmp_path / "pagina.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def _draw_grid(page, rows=4, cols=3):
+    x0, y0, w, h = 72, 100, 120, 20
+    for r in range(rows + 1):
+        page.draw_line((x0, y0 + r * h), (x0 + cols * w, y0 + r * h))
+    for c in range(cols + 1):
+        page.draw_line((x0 + c * w, y0), (x0 + c * w, y0 + rows * h))
+    for r in range(rows):
+        for c in range(cols):
+            page.insert_text((x0 + c * w + 4, y0 + r * h + 14), f"ABC-{r}{c}", fontsize=9)
+
+
+def test_prefilter_detects_ruled_grid(tmp_path):
+    import fitz
+    from src.classification.table_detector import table_prefilter
+    path = _pdf_with_page(tmp_path, _draw_grid)
+    with fitz.open(path) as doc:
+        assert table_prefilter(doc[0]) == 'table'
+    # O localizador completo concorda
+    assert has_tables_in_pdf(path, table_hints=['ambiguous']) is True
+
+
+def test_prefilter_rules_out_pages_without_rulings(tmp_path):
+    import fitz
+    from src.classification.table_detector import table_prefilter
+
+    def text_and_frame(page):
+        page.insert_text((72, 72), "Catálogo de peças - parafusos e porcas", fontsize=12)
+        page.draw_rect(fitz.Rect(36, 36, 560, 800))
+        page.draw_line((36, 90), (560, 90))
+
+    path = _pdf_with_page(tmp_path, text_and_frame)
+    with fitz.open(path) as doc:
+        assert table_prefilter(doc[0]) == 'none'
+
+
+@patch("src.classification.table_detector.pdfplumber.open")
+def test_full_finder_runs_only_on_ambiguous_pages_and_stops_early(mock_open):
+    mock_pdf = MagicMock()
+    pages = [MagicMock(), MagicMock(), MagicMock()]
+    pages[1].extract_tables.return_value = [[["a", "b"], ["1", "2"]]]
+    mock_pdf.pages = pages
+    mock_open.return_value = mock_pdf
+
+    assert has_tables_in_pdf(TEST_PDF_WITH_TABLES, table_hints=['none', 'ambiguous', 'ambiguous']) is True
+    pages[0].extract_tables.assert_not_called()
+    pages[1].extract_tables.assert_called_once()
+    pages[2].extract_tables.assert_not_called()
+
+    # Tabela confirmada pelo pré-filtro: o pdfplumber nem é aberto
+    mock_open.reset_mock()
+    assert has_tables_in_pdf(TEST_PDF_WITH_TABLES, table_hints=['table', 'ambiguous']) is True
+    mock_open.assert_not_called()
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src.extraction.table_extractor import extract_tables_to_dataset, parse_number
+
+
+def _draw_table(page, rows, header=True, start=0):
+    x0, y0, w, h, cols = 50, 100, 150, 20, 3
+    data = [["Código", "Descrição", "Preço"]] if header else []
+    data += [[f"0{100 + start + i}", f"Parafuso M{start + i}", f"R$ 1.{start + i:03d},50"] for i in range(rows)]
+    for r in range(len(data) + 1):
+        page.draw_line((x0, y0 + r * h), (x0 + cols * w, y0 + r * h))
+    for c in range(cols + 1):
+        page.draw_line((x0 + c * w, y0), (x0 + c * w, y0 + len(data) * h))
+    for r, row in enumerate(data):
+        for c, value in enumerate(row):
+            page.insert_text((x0 + c * w + 3, y0 + r * h + 14), value, fontsize=9)
+
+
+@pytest.fixture
+def price_list(tmp_path):
+    import fitz
+    doc = fitz.open()
+    _draw_table(doc.new_page(), 5, header=True, start=0)
+    _draw_table(doc.new_page(), 4, header=True, start=5)   # cabeçalho repetido
+    _draw_table(doc.new_page(), 3, header=False, start=9)  # continuação sem cabeçalho
+    path = tmp_path / "lista de preços.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_parse_number():
+    assert parse_number("R$ 1.234,56") == 1234.56
+    assert parse_number("12,50") == 12.5
+    assert parse_number("40") == 40
+    assert parse_number("00123") is None  # código de peça
+    assert parse_number("ABC-123") is None
+
+
+@patch("src.extraction.table_extractor.WRITE_BATCH_ROWS", 4)
+def test_tables_streamed_to_typed_csv_with_provenance(price_list, tmp_path):
+    output = extract_tables_to_dataset(price_list, str(tmp_path / "tables"), table_format='csv')
+    assert output.endswith("lista de preços.csv")
+
+    df = pd.read_csv(output, dtype={'Código': str})
+    assert list(df.columns) == ['table_id', 'page', 'x0', 'top', 'x1', 'bottom', 'Código', 'Descrição', 'Preço']
+    # Cabeçalho repetido descartado e continuação sem cabeçalho anexada à mesma tabela
+    assert len(df) == 12
+    assert set(df['table_id']) == {0}
+    assert list(df['page'].value_counts().sort_index()) == [5, 4, 3]
+    assert df['Código'].iloc[0] == "0100"
+    assert df['Preço'].iloc[11] == pytest.approx(1011.5)
+    assert (df['bottom'] > df['top']).all()
+
+
+def test_pdf_without_tables_returns_none(tmp_path):
+    import fitz
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Sem tabelas")
+    path = tmp_path / "texto.pdf"
+    doc.save(str(path))
+    doc.close()
+    assert extract_tables_to_dataset(str(path), str(tmp_path / "tables"), table_format='csv') is None
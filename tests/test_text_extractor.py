@@ -1,41 +1,80 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from src.extraction.text_extractor import extract_and_save_text
+import fitz  # PyMuPDF
+from src.extraction.text_extractor import TextBackend, extract_and_save_text, extract_pages_text, score_page_text
 
 DUMMY_PDF = "tests/data/fake.pdf"
 
 
-@patch("builtins.open", new_callable=MagicMock)
-@patch("pathlib.Path.mkdir")
-@patch("src.extraction.text_extractor.extract_text_pdfplumber")
-@patch("src.extraction.text_extractor.extract_text_pymupdf")
-@patch("src.extraction.text_extractor.extract_text_pypdf2")
-def test_extract_text_success(mock_pypdf2, mock_pymupdf, mock_pdfplumber, mock_mkdir, mock_open):
-    # Simula falha nos dois primeiros extratores
-    mock_pypdf2.return_value = None
-    mock_pymupdf.return_value = None
-    mock_pdfplumber.return_value = "Texto extraído com sucesso"
+def _fake_backend(name, texts, calls):
+    """Backend de teste com textos fixos por página; registra as páginas lidas."""
+    class FakeBackend(TextBackend):
+        def __init__(self, pdf_path, context=None):
+            super().__init__(pdf_path, context)
 
-    # Corrige o problema de __name__
-    mock_pypdf2.__name__ = "extract_text_pypdf2"
-    mock_pymupdf.__name__ = "extract_text_pymupdf"
-    mock_pdfplumber.__name__ = "extract_text_pdfplumber"
+        @property
+        def page_count(self):
+            return len(texts)
 
-    result = extract_and_save_text(DUMMY_PDF, output_dir="tests/output")
+        def page_text(self, page_index):
+            calls.append((name, page_index))
+            return texts[page_index]
+
+    FakeBackend.name = name
+    return FakeBackend
+
+
+def test_score_page_text_separates_text_from_garbage():
+    assert score_page_text("Catálogo de peças\nParafuso sextavado M8 x 40 R$ 12,50 Cód. ABC-1000") > 0.9
+    assert score_page_text("(cid:12)(cid:45)(cid:3) (cid:77)(cid:12)") < 0.5
+    assert score_page_text(" ") < 0.5
+    assert score_page_text("C a t á l o g o d e p e ç a s") < 0.5
+    assert score_page_text("   ") == 0.0
+
+
+def test_fallback_only_rereads_poor_pages():
+    calls = []
+    first = _fake_backend("rapido", ["Parafuso sextavado M8", "(cid:1)(cid:2)(cid:3)", "Porca zincada M8"], calls)
+    second = _fake_backend("lento", ["x", "Arruela lisa 8 mm", "y"], calls)
+
+    pages = extract_pages_text(DUMMY_PDF, backends=(first, second))
+
+    assert calls.count(("lento", 1)) == 1
+    assert ("lento", 0) not in calls and ("lento", 2) not in calls
+    assert [page['backend'] for page in pages] == ["rapido", "lento", "rapido"]
+    assert pages[1]['text'] == "Arruela lisa 8 mm"
+
+
+def test_fallback_keeps_best_text_when_all_backends_are_poor():
+    calls = []
+    first = _fake_backend("rapido", ["Tabela de preços (cid:1)"], calls)
+    second = _fake_backend("lento", ["(cid:1)(cid:2)"], calls)
+
+    pages = extract_pages_text(DUMMY_PDF, backends=(first, second))
+
+    assert pages[0]['backend'] == "rapido"
+
+
+def test_extract_and_save_text_from_real_pdf(tmp_path):
+    pdf_path = tmp_path / "catálogo 2024.pdf"
+    doc = fitz.open()
+    doc.new_page().insert_text((50, 72), "Parafuso sextavado M8 x 40", fontsize=11)
+    doc.new_page()
+    doc.save(str(pdf_path))
+    doc.close()
+
+    result = extract_and_save_text(str(pdf_path), output_dir=str(tmp_path / "out"))
 
-    assert result is not None
-    assert mock_open.called
+    assert result.endswith("catálogo_2024.txt")
+    assert open(result, encoding='utf-8').read() == "Parafuso sextavado M8 x 40"
 
 
-@patch("src.extraction.text_extractor.extract_text_pdfplumber", return_value=None)
-@patch("src.extraction.text_extractor.extract_text_pymupdf", return_value=None)
-@patch("src.extraction.text_extractor.extract_text_pypdf2", return_value=None)
-def test_extract_text_file_not_found(mock_pypdf2, mock_pymupdf, mock_pdfplumber):
+def test_extract_text_file_not_found():
     result = extract_and_save_text("tests/data/inexistente.pdf", output_dir="tests/output")
     assert result is None
 
 
-@patch("src.extraction.text_extractor.extract_text_pypdf2", side_effect=Exception("Falha inesperada"))
-def test_extract_text_with_exception(mock_pypdf2):
+@patch("src.extraction.text_extractor.extract_pages_text", side_effect=Exception("Falha inesperada"))
+def test_extract_text_with_exception(mock_pages):
     result = extract_and_save_text(DUMMY_PDF, output_dir="tests/output")
     assert result is None
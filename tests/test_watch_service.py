@@ -0,0 +1,101 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from src.watch_service import WatchService
+
+
+@pytest.fixture
+def service_config(tmp_path):
+    return {
+        'max_workers': 2,
+        'enable_manifest': False,
+        'enable_ocr_cache': False,
+        'watch_poll_interval': 0.05,
+        'watch_settle_seconds': 0,
+        'watch_max_queue': 2,
+    }
+
+
+def _thread_pool(config, kind, initializer=None, initargs=()):
+    return ThreadPoolExecutor(config['max_workers'], initializer=initializer, initargs=initargs)
+
+
+def _mover_para_processados(pdf_path, config, pdf_type=None):
+    destination = Path(pdf_path).parent.parent / "processed" / Path(pdf_path).name
+    destination.parent.mkdir(exist_ok=True)
+    Path(pdf_path).rename(destination)
+    return {'path': pdf_path, 'status': 'done', 'destination': str(destination)}
+
+
+def _run_until(service, condition, max_iterations=200):
+    for _ in range(max_iterations):
+        if condition():
+            return
+        service.run_once(timeout=0.01)
+    raise AssertionError("condição não atingida")
+
+
+@patch("src.watch_service.Observer", None)
+@patch("src.watch_service.create_pool", _thread_pool)
+@patch("src.watch_service.processar_pdf", side_effect=_mover_para_processados)
+def test_dispatches_new_files_and_drains(mock_processar, tmp_path, service_config):
+    pending = tmp_path / "pending"
+    service = WatchService(str(pending), service_config)
+    service.start()
+
+    (pending / "a.pdf").write_bytes(b"%PDF-1.4 a")
+    (pending / "b.pdf").write_bytes(b"%PDF-1.4 b")
+    (pending / "notas.txt").write_text("ignorado")
+    _run_until(service, lambda: service.processed == 2)
+
+    service.request_stop()
+    service.drain()
+    assert mock_processar.call_count == 2
+    assert sorted(p.name for p in (tmp_path / "processed").iterdir()) == ["a.pdf", "b.pdf"]
+
+
+@patch("src.watch_service.Observer", None)
+@patch("src.watch_service.create_pool", _thread_pool)
+def test_backpressure_limits_inflight_files(tmp_path, service_config):
+    release = threading.Event()
+
+    def processar_bloqueado(pdf_path, config, pdf_type=None):
+        release.wait(5)
+        return _mover_para_processados(pdf_path, config)
+
+    pending = tmp_path / "pending"
+    service = WatchService(str(pending), service_config)
+    with patch("src.watch_service.processar_pdf", side_effect=processar_bloqueado):
+        service.start()
+        for name in ("a.pdf", "b.pdf", "c.pdf", "d.pdf"):
+            (pending / name).write_bytes(b"%PDF-1.4 " + name.encode())
+        _run_until(service, lambda: len(service._inflight) == 2)
+        service.run_once(timeout=0.01)
+        # Os excedentes continuam na pasta até abrir vaga
+        assert len(service._inflight) == 2
+
+        release.set()
+        _run_until(service, lambda: service.processed == 4)
+        service.request_stop()
+        service.drain()
+    assert not list(pending.glob("*.pdf"))
+
+
+@patch("src.watch_service.Observer", None)
+@patch("src.watch_service.create_pool", _thread_pool)
+def test_file_left_in_pending_is_not_reprocessed(tmp_path, service_config):
+    pending = tmp_path / "pending"
+    service = WatchService(str(pending), service_config)
+    sem_texto = {'status': 'no_text', 'destination': None}
+    with patch("src.watch_service.processar_pdf", return_value=sem_texto) as mock_processar:
+        service.start()
+        (pending / "vazio.pdf").write_bytes(b"%PDF-1.4 vazio")
+        _run_until(service, lambda: service.processed == 1)
+        for _ in range(5):
+            service.run_once(timeout=0.01)
+        service.request_stop()
+        service.drain()
+    assert mock_processar.call_count == 1